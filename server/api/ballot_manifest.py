@@ -12,6 +12,7 @@ from ..database import db_session, engine
 from ..models import *
 from ..auth import restrict_access, UserType, get_loggedin_user, get_support_user
 from ..worker.tasks import (
+    FILE_PROCESSING_QUEUE,
     UserError,
     background_task,
     create_background_task,
@@ -103,7 +104,7 @@ def hybrid_jurisdiction_total_ballots(jurisdiction: Jurisdiction) -> HybridPair:
     )
 
 
-@background_task
+@background_task(queue=FILE_PROCESSING_QUEUE)
 def process_ballot_manifest_file(
     election_id: str,
     jurisdiction_id: str,
@@ -282,7 +283,12 @@ def clear_ballot_manifest_file(jurisdiction: Jurisdiction):
 
     if jurisdiction.manifest_file_id:
         File.query.filter_by(id=jurisdiction.manifest_file_id).delete()
+    # Deleting the batches would cascade to delete the jurisdiction's
+    # CvrBallots row by row, so drop them all at once first
+    cvrs.clear_cvr_ballots(jurisdiction.election_id, jurisdiction.id)
     Batch.query.filter_by(jurisdiction=jurisdiction).delete()
+    # Sample sizes computed from the old manifest won't be reused
+    SampleSizeCache.query.filter_by(election_id=jurisdiction.election_id).delete()
 
 
 BALLOT_MANIFEST_FILE_NAME_PREFIX = "manifest"
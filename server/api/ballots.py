@@ -36,6 +36,7 @@ def ballot_retrieval_list(jurisdiction: Jurisdiction, round: Round) -> TextIO:
         .outerjoin(
             CvrBallot,
             and_(
+                CvrBallot.jurisdiction_id == jurisdiction.id,
                 CvrBallot.batch_id == SampledBallot.batch_id,
                 CvrBallot.ballot_position == SampledBallot.ballot_position,
             ),
@@ -233,6 +234,7 @@ def list_ballots_for_jurisdiction(
         .outerjoin(
             CvrBallot,
             and_(
+                CvrBallot.jurisdiction_id == jurisdiction.id,
                 CvrBallot.batch_id == SampledBallot.batch_id,
                 CvrBallot.ballot_position == SampledBallot.ballot_position,
             ),
@@ -288,6 +290,7 @@ def list_ballots_for_audit_board(
         .outerjoin(
             CvrBallot,
             and_(
+                CvrBallot.jurisdiction_id == jurisdiction.id,
                 CvrBallot.batch_id == SampledBallot.batch_id,
                 CvrBallot.ballot_position == SampledBallot.ballot_position,
             ),
@@ -11,6 +11,7 @@ from datetime import datetime, timezone
 import io
 from typing import TypedDict
 import uuid
+from zipfile import ZipFile
 from defusedxml.ElementTree import parse as parse_xml
 from xml.etree.ElementTree import ElementTree
 from flask import request, jsonify, session
@@ -56,7 +57,13 @@ from ..util.file import (
     unzip_files,
 )
 from ..util.hart_parse import find_xml, parse_contest_results, find_text_xml
-from ..worker.tasks import UserError, background_task, create_background_task
+from ..util.zip_archive import zip_file_names
+from ..worker.tasks import (
+    FILE_PROCESSING_QUEUE,
+    UserError,
+    background_task,
+    create_background_task,
+)
 from ..util.csv_download import csv_response, jurisdiction_timestamp_name
 from ..util.isoformat import isoformat
 from .batch_tallies import construct_contest_choice_csv_headers
@@ -151,7 +158,7 @@ def validate_choice_name_and_get_choice_id(
     return choice_id
 
 
-@background_task
+@background_task(queue=FILE_PROCESSING_QUEUE)
 def process_batch_inventory_cvr_file(
     election_id: str,
     jurisdiction_id: str,
@@ -323,14 +330,15 @@ def process_batch_inventory_cvr_file(
 
         # ZIP file with multiple CSVs
         if batch_inventory_data.cvr_file.storage_path.endswith(".zip"):
-            entry_names = unzip_files(cvr_file, working_directory)
+            zip_archive = ZipFile(cvr_file, "r")
             file_names = [
-                entry_name for entry_name in entry_names if entry_name.endswith(".csv")
+                entry_name
+                for entry_name in zip_file_names(zip_archive)
+                if entry_name.endswith(".csv")
             ]
-            cvr_file.close()
 
             cvr_and_ballots_files = separate_ess_cvr_and_ballots_files(
-                working_directory, file_names
+                zip_archive, file_names
             )
             primary_cvr_file, ballots_files = (
                 cvr_and_ballots_files["cvr_file"],
@@ -702,7 +710,7 @@ TABULATOR_STATUS_PARSE_ERROR = (
 )
 
 
-@background_task
+@background_task(queue=FILE_PROCESSING_QUEUE)
 def process_batch_inventory_tabulator_status_file(
     election_id: str,
     jurisdiction_id: str,
@@ -12,6 +12,7 @@ from ..database import db_session, engine
 from ..models import *
 from ..auth import restrict_access, UserType, get_loggedin_user, get_support_user
 from ..worker.tasks import (
+    FILE_PROCESSING_QUEUE,
     UserError,
     background_task,
     create_background_task,
@@ -67,7 +68,7 @@ def construct_contest_choice_csv_headers(
     return contest_choice_csv_headers
 
 
-@background_task
+@background_task(queue=FILE_PROCESSING_QUEUE)
 def process_batch_tallies_file(
     election_id: str,
     jurisdiction_id: str,
@@ -213,6 +214,8 @@ def validate_batch_tallies_upload(election: Election, jurisdiction: Jurisdiction
 
 def clear_batch_tallies_data(jurisdiction: Jurisdiction):
     jurisdiction.batch_tallies = None
+    # Sample sizes computed from the old tallies won't be reused
+    SampleSizeCache.query.filter_by(election_id=jurisdiction.election_id).delete()
 
 
 def reprocess_batch_tallies_file_if_uploaded(
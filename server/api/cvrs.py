@@ -1,12 +1,14 @@
-from math import floor
+from math import ceil, floor
+import hashlib
 import uuid
 import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import csv
-from defusedxml.ElementTree import parse as parse_xml
 import itertools
 import os
 import shutil
-from xml.etree.ElementTree import ElementTree
 import typing
 from typing import (
     IO,
@@ -20,22 +22,25 @@ from typing import (
     Generator,
 )
 from collections import defaultdict
+from zipfile import ZipFile
 import re
 import difflib
 import ast
 from datetime import datetime
 from flask import request, jsonify, Request, session
 from werkzeug.exceptions import BadRequest, NotFound, Conflict
-from sqlalchemy import func, and_
+from sqlalchemy import func, text, LargeBinary
 from sqlalchemy.orm import Session
 
 
 from . import api
+from .. import config
 from ..database import db_session, engine as db_engine
 from ..models import *
 from . import contests
 from ..auth import restrict_access, UserType, get_loggedin_user, get_support_user
 from ..worker.tasks import (
+    FILE_PROCESSING_QUEUE,
     UserError,
     background_task,
     create_background_task,
@@ -50,7 +55,6 @@ from ..util.file import (
     serialize_file,
     serialize_file_processing,
     timestamp_filename,
-    unzip_files,
     FileType,
 )
 from ..util.csv_download import csv_response
@@ -64,7 +68,25 @@ from ..util.csv_parse import (
     validate_not_empty,
 )
 from ..util.collections import find_first_duplicate
-from ..util.hart_parse import find_xml, parse_contest_results
+from ..util.copy_loader import PipelinedCopyLoader
+from ..util.external_sort import ExternalSorter
+from ..util.cvr_matrix import (
+    INVALID,
+    NOT_ON_BALLOT,
+    OVERVOTE,
+    UNDERVOTE,
+    ContestPresence,
+    CvrMatrix,
+    CvrMatrixBuilder,
+    batch_offsets_from_bytes,
+    contest_column_range,
+    contest_presence,
+    contest_presence_bytes,
+    contest_presence_from_bytes,
+    interpretations_from_bytes,
+)
+from ..util.hart_parse import HartCvr, parse_cvr_zip_members
+from ..util.zip_archive import ZipMember, open_zip_archive, zip_file_names
 from ..util.string import comma_join_until_limit
 from ..audit_math.suite import HybridPair
 from ..activity_log.activity_log import UploadFile, activity_base, record_activity
@@ -202,6 +224,151 @@ def cvr_contests_metadata(
     return standardized_metadata
 
 
+def num_cvr_interpretation_columns(metadata: CVR_CONTESTS_METADATA) -> int:
+    return (
+        max(
+            (
+                choice_metadata["column"]
+                for contest_metadata in metadata.values()
+                for choice_metadata in contest_metadata["choices"].values()
+            ),
+            default=-1,
+        )
+        + 1
+    )
+
+
+# CVRs processed before we started storing a CvrInterpretationMatrix only have
+# the raw CvrBallot.interpretations strings, so we build the matrix from those.
+def cvr_interpretation_matrix_from_cvr_ballots(jurisdiction: Jurisdiction) -> CvrMatrix:
+    metadata = typing_cast(
+        CVR_CONTESTS_METADATA | None, jurisdiction.cvr_contests_metadata
+    )
+    assert metadata is not None
+    builder = CvrMatrixBuilder(num_cvr_interpretation_columns(metadata))
+    cvr_ballots = CvrBallot.query.filter_by(
+        jurisdiction_id=jurisdiction.id
+    ).with_entities(CvrBallot.batch_id, CvrBallot.record_id, CvrBallot.interpretations)
+    for batch_id, record_id, interpretations in cvr_ballots.yield_per(1000):
+        builder.add(batch_id, record_id, interpretations.split(","))
+    return builder.build()
+
+
+def cvr_contest_interpretations(
+    jurisdiction: Jurisdiction, contest_name: str
+) -> tuple[list[str], CvrMatrix]:
+    """
+    Loads the CVR interpretations for a single contest in a jurisdiction.
+
+    Returns the contest's (standardized) choice names, along with a CvrMatrix
+    containing one column per choice, in the same order. Only the contest's
+    columns are read from the database.
+    """
+    metadata = cvr_contests_metadata(jurisdiction)
+    assert metadata is not None
+    choices_metadata = metadata[contest_name]["choices"]
+    choice_names = list(choices_metadata.keys())
+    columns = [
+        choice_metadata["column"] for choice_metadata in choices_metadata.values()
+    ]
+    start, end = contest_column_range(columns)
+
+    stored_matrix = (
+        CvrInterpretationMatrix.query.filter_by(cvr_file_id=jurisdiction.cvr_file_id)
+        .with_entities(
+            CvrInterpretationMatrix.num_ballots,
+            CvrInterpretationMatrix.batch_ids,
+            CvrInterpretationMatrix.batch_offsets,
+            # substring() is 1-indexed
+            func.substring(
+                CvrInterpretationMatrix.interpretations,
+                start * CvrInterpretationMatrix.num_ballots + 1,
+                (end - start) * CvrInterpretationMatrix.num_ballots,
+                type_=LargeBinary,
+            ),
+        )
+        .one_or_none()
+    )
+    if stored_matrix is None:
+        matrix = cvr_interpretation_matrix_from_cvr_ballots(jurisdiction)
+        batch_ids, batch_offsets = matrix.batch_ids, matrix.batch_offsets
+        interpretations = matrix.interpretations[:, start:end]
+    else:
+        num_ballots, batch_ids, batch_offsets_bytes, interpretations_bytes = (
+            stored_matrix
+        )
+        batch_offsets = batch_offsets_from_bytes(batch_offsets_bytes)
+        interpretations = interpretations_from_bytes(
+            interpretations_bytes, num_ballots, end - start
+        )
+
+    if columns != list(range(start, end)):
+        interpretations = interpretations[:, [column - start for column in columns]]
+
+    return choice_names, CvrMatrix(batch_ids, batch_offsets, interpretations)
+
+
+def cvr_contest_presence(
+    jurisdiction: Jurisdiction, contest_name: str
+) -> ContestPresence:
+    """
+    Loads which ballots in a jurisdiction's CVR have a contest on them, using
+    the CvrContestIndex built when the CVR file was processed.
+    """
+    # The index is keyed by the contest name in the CVR file, so undo any
+    # contest name standardization
+    contest_name_standardizations = (
+        typing_cast(
+            dict[str, str | None] | None,
+            jurisdiction.contest_name_standardizations,
+        )
+        or {}
+    )
+    cvr_contest_name = contest_name_standardizations.get(contest_name) or contest_name
+
+    stored_index = (
+        CvrContestIndex.query.filter_by(
+            cvr_file_id=jurisdiction.cvr_file_id, cvr_contest_name=cvr_contest_name
+        )
+        .join(
+            CvrInterpretationMatrix,
+            CvrInterpretationMatrix.cvr_file_id == CvrContestIndex.cvr_file_id,
+        )
+        .with_entities(
+            CvrInterpretationMatrix.num_ballots,
+            CvrInterpretationMatrix.batch_ids,
+            CvrInterpretationMatrix.batch_offsets,
+            CvrContestIndex.has_contest,
+        )
+        .one_or_none()
+    )
+    if stored_index is None:
+        _, matrix = cvr_contest_interpretations(jurisdiction, contest_name)
+        return ContestPresence(
+            matrix.batch_ids,
+            matrix.batch_offsets,
+            contest_presence(matrix.interpretations),
+        )
+
+    num_ballots, batch_ids, batch_offsets_bytes, has_contest_bytes = stored_index
+    return ContestPresence(
+        batch_ids,
+        batch_offsets_from_bytes(batch_offsets_bytes),
+        contest_presence_from_bytes(has_contest_bytes, num_ballots),
+    )
+
+
+def num_cvr_ballots(jurisdiction: Jurisdiction) -> int:
+    num_ballots = (
+        CvrInterpretationMatrix.query.filter_by(cvr_file_id=jurisdiction.cvr_file_id)
+        .with_entities(CvrInterpretationMatrix.num_ballots)
+        .scalar()
+    )
+    if num_ballots is None:
+        return CvrBallot.query.filter_by(jurisdiction_id=jurisdiction.id).count()
+    return num_ballots
+
+
 def set_total_ballots_from_cvrs(contest: Contest):
     if not are_uploaded_cvrs_valid(contest) or len(list(contest.jurisdictions)) == 0:
         return
@@ -532,7 +699,7 @@ class EssCvrFiles(TypedDict):
 
 
 def separate_ess_cvr_and_ballots_files(
-    working_directory: str, file_names: list[str]
+    zip_archive: ZipFile, file_names: list[str]
 ) -> EssCvrFiles:
     def decode_file(file: IO[bytes], file_name: str) -> TextIO:
         try:
@@ -542,10 +709,7 @@ def separate_ess_cvr_and_ballots_files(
             raise UserError(f"{file_name}: {error}") from error
 
     text_files = {
-        file_name: decode_file(
-            open(os.path.join(working_directory, file_name), "rb"),
-            file_name,
-        )
+        file_name: decode_file(zip_archive.open(file_name), file_name)
         for file_name in file_names
     }
 
@@ -636,7 +800,7 @@ def parse_ess_cvrs(
     # number). What's more, the list of ballots might be split across multiple files.
     #
     # Here's a rough outline of the process:
-    # 1. Unzip and decode the files
+    # 1. Open and decode the files in the ZIP file
     # 2. Detect and sort out which files are ballot metadata and which is the CVR data
     # 3. For each ballot file, parse the metadata into CVRBallot objects (w/o interpretations)
     # 4. For the CVR file, make two passes:
@@ -647,13 +811,12 @@ def parse_ess_cvrs(
     #   - Second, parse out the interpretations.
     # 5. Concatenate the parsed CVRBallot lists and join that to the parsed interpretation
 
+    # We read the files directly from the ZIP file rather than extracting them
     zip_file = retrieve_file_to_buffer(jurisdiction.cvr_file, working_directory)
-    file_names = unzip_files(zip_file, working_directory)
-    zip_file.close()
+    zip_archive = ZipFile(zip_file, "r")
+    file_names = zip_file_names(zip_archive)
 
-    cvr_and_ballots_files = separate_ess_cvr_and_ballots_files(
-        working_directory, file_names
-    )
+    cvr_and_ballots_files = separate_ess_cvr_and_ballots_files(zip_archive, file_names)
     cvr_file_name, cvr_file, ballots_files = (
         cvr_and_ballots_files["cvr_file_name"],
         cvr_and_ballots_files["cvr_file"],
@@ -1027,6 +1190,43 @@ def parse_scanned_ballot_information_file(
     return scanned_ballot_information_rows
 
 
+# Minimum number of CVR files to parse in each worker process, so that small
+# uploads don't pay the overhead of starting a process pool
+MIN_HART_CVR_FILES_PER_WORKER = 1000
+
+
+def parse_hart_cvr_zip_members(cvr_zip_members: list[ZipMember]) -> list[HartCvr]:
+    """
+    Parses Hart CVR XML files stored in (possibly nested) ZIP files, splitting the files into contiguous slices that are parsed in parallel by a
+    pool of worker processes. Results are returned in the same order as the
+    files.
+    """
+    num_workers = min(
+        config.HART_CVR_PARSE_WORKERS,
+        len(cvr_zip_members) // MIN_HART_CVR_FILES_PER_WORKER,
+    )
+    if num_workers <= 1:
+        return parse_cvr_zip_members(cvr_zip_members)
+
+    # Split the files into a few slices per worker, so that a slow slice doesn't
+    # hold up the whole pool
+    slice_size = ceil(len(cvr_zip_members) / (num_workers * 4))
+    cvr_zip_member_slices = [
+        cvr_zip_members[start : start + slice_size]
+        for start in range(0, len(cvr_zip_members), slice_size)
+    ]
+    # Use spawn rather than fork so that the worker processes don't inherit
+    # the background task's database connections
+    with ProcessPoolExecutor(
+        max_workers=num_workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        return [
+            hart_cvr
+            for hart_cvrs in executor.map(parse_cvr_zip_members, cvr_zip_member_slices)
+            for hart_cvr in hart_cvrs
+        ]
+
+
 def parse_hart_cvrs(
     jurisdiction: Jurisdiction,
     working_directory: str,
@@ -1053,36 +1253,37 @@ def parse_hart_cvrs(
     1. Unzip the wrapper ZIP file.
     2. Expect either [ CVR ZIP files ] or [ CVR ZIP files and CSVs ].
     3. If CSVs are found, parse them as scanned ballot information CSVs.
-    4. Unzip the CVR ZIP files.
-    5. Parse the contest and choice names. We have to do this in a separate pass since our storage
-       scheme for interpretations requires knowing all of the contest and choice names up front.
-    6. Parse the interpretations.
+    4. Parse each CVR XML file directly from the CVR ZIP files (in parallel).
+    5. Collect the contest and choice names. We have to do this before building interpretations
+       since our storage scheme for interpretations requires knowing all of the contest and choice
+       names up front.
+    6. Build the interpretations.
     """
     wrapper_zip_file = retrieve_file_to_buffer(jurisdiction.cvr_file, working_directory)
-    file_names = unzip_files(wrapper_zip_file, working_directory)
+    # Rather than extracting the ZIP files to disk, we read each file directly
+    # from the wrapper ZIP file (or the CVR ZIP files nested within it)
+    wrapper_zip_archive = ZipFile(wrapper_zip_file, "r")
+    file_names = zip_file_names(wrapper_zip_archive)
 
-    cvr_zip_files: dict[str, BinaryIO] = {}  # { file_name: file }
+    # { cvr_zip_file_name: nested_zip_names }
+    cvr_zip_files: dict[str, tuple[str, ...]] = {}
     scanned_ballot_information_files: list[BinaryIO] = []
     non_csv_zip_files = []
     for file_name in file_names:
         if file_name.lower().endswith(".zip"):
-            cvr_zip_files[file_name] = open(
-                os.path.join(working_directory, file_name), "rb"
-            )
+            cvr_zip_files[file_name] = (file_name,)
         elif file_name.lower().endswith(".csv"):
             scanned_ballot_information_files.append(
-                open(os.path.join(working_directory, file_name), "rb")
+                typing_cast(BinaryIO, wrapper_zip_archive.open(file_name))
             )
         else:
             non_csv_zip_files.append(file_name)
 
     # If there are no zip files inside the "wrapper" we assume it was not a wrapper and there was only one cvr zip file uploaded, unwrapped.
     if len(cvr_zip_files) == 0 and len(scanned_ballot_information_files) == 0:
-        wrapper_zip_file.seek(0)
-        cvr_zip_files[jurisdiction.cvr_file.name] = wrapper_zip_file
+        cvr_zip_files[jurisdiction.cvr_file.name] = ()
     else:
-        # The user submitted a wrapper zip file, so we close it and make sure it only contained zip and csv files.
-        wrapper_zip_file.close()
+        # The user submitted a wrapper zip file, so we make sure it only contained zip and csv files.
         if len(non_csv_zip_files) > 0:
             raise UserError(
                 f"Unsupported file type. Expected either a ZIP file or a CSV file, but found {comma_join_until_limit(non_csv_zip_files, 3)}."
@@ -1110,27 +1311,32 @@ def parse_hart_cvrs(
                 )
             scanned_ballot_information_by_cvr_id[cvr_id] = row
 
-    cvr_file_paths: dict[
-        tuple[str, str], str
-    ] = {}  # { (zip_file_name, file_name): file_path }
-    for cvr_zip_file_name, cvr_zip_file in cvr_zip_files.items():
-        sub_working_directory = tempfile.mkdtemp(dir=working_directory)
-        cvr_file_names = unzip_files(cvr_zip_file, sub_working_directory)
-        for cvr_file_name in cvr_file_names:
-            # Ignore extraneous files, like the WriteIn directory
-            if cvr_file_name.lower().endswith(".xml"):
-                # Don't open the files here and just prepare the paths so that they can be opened
-                # and closed one at a time later to avoid hitting "Too many open files" errors
-                cvr_file_paths[(cvr_zip_file_name, cvr_file_name)] = os.path.join(
-                    sub_working_directory, cvr_file_name
-                )
+    cvr_zip_members: list[ZipMember] = []
+    cvr_zip_file_names: list[str] = []
+    for cvr_zip_file_name, nested_zip_names in cvr_zip_files.items():
+        with open_zip_archive(
+            wrapper_zip_file.name, nested_zip_names
+        ) as cvr_zip_archive:
+            for cvr_file_name in zip_file_names(cvr_zip_archive):
+                # Ignore extraneous files, like the WriteIn directory
+                if cvr_file_name.lower().endswith(".xml"):
+                    cvr_zip_members.append(
+                        ZipMember(
+                            wrapper_zip_file.name, nested_zip_names, cvr_file_name
+                        )
+                    )
+                    cvr_zip_file_names.append(cvr_zip_file_name)
+    wrapper_zip_archive.close()
+    wrapper_zip_file.close()
+
+    # Parse each CVR file once, in parallel
+    hart_cvrs = parse_hart_cvr_zip_members(cvr_zip_members)
 
-    # Parse contests and choice names
+    # Collect contests and choice names
     # { contest_name: choice_names }
     contest_choices = defaultdict(set)
-    for cvr_file_path in cvr_file_paths.values():
-        cvr_xml = parse_xml(cvr_file_path)
-        for contest, choice_names in parse_contest_results(cvr_xml).items():
+    for hart_cvr in hart_cvrs:
+        for contest, choice_names in hart_cvr.contest_results.items():
             contest_choices[contest].update(choice_names)
 
     # Assign each choice a column index in the interpretation string
@@ -1168,9 +1374,8 @@ def parse_hart_cvrs(
         for choice_metadata in contest_metadata["choices"].values()
     )
 
-    def parse_interpretations(cvr_xml: ElementTree):
+    def parse_interpretations(contest_results: dict[str, set[str]]):
         interpretations = ["" for _ in range(max_interpretation_column + 1)]
-        contest_results = parse_contest_results(cvr_xml)
         for contest_name, voted_for_choices in contest_results.items():
             contest_metadata = contests_metadata[contest_name]
             for choice_name, choice_metadata in contest_metadata["choices"].items():
@@ -1193,12 +1398,11 @@ def parse_hart_cvrs(
     use_cvr_zip_file_names_as_tabulator_names = len(cvr_zip_files) > 1
 
     def parse_cvr_ballots() -> Iterable[CvrBallot]:
-        for (cvr_zip_file_name, cvr_file_name), cvr_file_path in cvr_file_paths.items():
+        for cvr_zip_file_name, (_, cvr_file_name), hart_cvr in zip(
+            cvr_zip_file_names, cvr_zip_members, hart_cvrs
+        ):
             cvr_zip_file_name_without_extension = cvr_zip_file_name[:-4]
-            cvr_xml = parse_xml(cvr_file_path)
-            cvr_guid = find_xml(cvr_xml, "CvrGuid").text
-            batch_number = find_xml(cvr_xml, "BatchNumber").text
-            batch_sequence = find_xml(cvr_xml, "BatchSequence").text
+            cvr_guid, batch_number, batch_sequence, contest_results = hart_cvr
 
             if use_tabulator_in_batch_key:
                 if use_cvr_zip_file_names_as_tabulator_names:
@@ -1228,7 +1432,7 @@ def parse_hart_cvrs(
                     batch=db_batch,
                     record_id=int(batch_sequence),
                     imprinted_id=imprinted_id,
-                    interpretations=parse_interpretations(cvr_xml),
+                    interpretations=parse_interpretations(contest_results),
                 )
             else:
                 if use_tabulator_in_batch_key:
@@ -1262,7 +1466,87 @@ def parse_hart_cvrs(
     return contests_metadata, parse_cvr_ballots()
 
 
-@background_task
+def tally_cvr_interpretations(
+    contests_metadata: CVR_CONTESTS_METADATA,
+    interpretations: np.ndarray,
+    invalid_rows: dict[int, list[str]],
+):
+    """
+    Adds a chunk of encoded CVR rows (see CvrMatrixBuilder) to the running
+    totals for ContestChoice.num_votes and Contest.total_ballots_cast in
+    contests_metadata.
+
+    invalid_rows holds the raw interpretations for any rows with values that
+    couldn't be encoded, which we fall back to parsing one by one.
+    """
+    contest_masks = []
+    for contest_metadata in contests_metadata.values():
+        columns = [
+            choice_metadata["column"]
+            for choice_metadata in contest_metadata["choices"].values()
+        ]
+        contest_interpretations = interpretations[:, columns]
+
+        # Skip contests not on ballot
+        on_ballot = (contest_interpretations != NOT_ON_BALLOT).all(axis=1)
+        contest_metadata["total_ballots_cast"] += int(on_ballot.sum())
+
+        # Skip ES&S overvotes/undervotes
+        countable = on_ballot & ~(
+            (contest_interpretations == OVERVOTE)
+            | (contest_interpretations == UNDERVOTE)
+        ).any(axis=1)
+        invalid = countable & (contest_interpretations == INVALID).any(axis=1)
+        contest_masks.append((columns, contest_interpretations, countable, invalid))
+
+    # Dominions CVR files sometimes contain interpretation values that can't be
+    # parsed as integers. We check the rows with invalid values in order, so
+    # that we report the same value as we would have parsing the file row by
+    # row.
+    for row in sorted(invalid_rows):
+        for contest_metadata, (columns, _, _, invalid) in zip(
+            contests_metadata.values(), contest_masks
+        ):
+            if not invalid[row]:
+                continue
+            parsed_interpretations = []
+            for column in columns:
+                interpretation = invalid_rows[row][column]
+                try:
+                    parsed_interpretations.append(int(interpretation))
+                except Exception as error:
+                    raise UserError(
+                        f"Unable to parse '{interpretation}' as an integer. "
+                        "Please export the CVR file with plain integer values."
+                    ) from error
+
+            # Values that are valid integers but out of range for the matrix
+            # (e.g. "-1" or "200") are tallied here instead
+            if sum(parsed_interpretations) > contest_metadata["votes_allowed"]:
+                continue
+            for choice_metadata, parsed_interpretation in zip(
+                contest_metadata["choices"].values(), parsed_interpretations
+            ):
+                choice_metadata["num_votes"] += parsed_interpretation
+
+    for contest_metadata, (_, contest_interpretations, countable, invalid) in zip(
+        contests_metadata.values(), contest_masks
+    ):
+        counted_interpretations = contest_interpretations[countable & ~invalid].astype(
+            np.int64
+        )
+        # Skip overvotes
+        votes = counted_interpretations.sum(axis=1)
+        num_votes = counted_interpretations[
+            votes <= contest_metadata["votes_allowed"]
+        ].sum(axis=0)
+        for choice_metadata, choice_num_votes in zip(
+            contest_metadata["choices"].values(), num_votes
+        ):
+            choice_metadata["num_votes"] += int(choice_num_votes)
+
+
+@background_task(queue=FILE_PROCESSING_QUEUE)
 def process_cvr_file(
     election_id: str,
     jurisdiction_id: str,
@@ -1279,12 +1563,6 @@ def process_cvr_file(
             shutil.rmtree(working_directory)
 
     def process() -> None:
-        # Clear out any existing CVR data from previous files (e.g., if we're
-        # overwriting a previous file). This query can sometimes be slow so we
-        # run it here in the background task instead of in the endpoint for
-        # uploading a CVR file (where we clear other CVR data).
-        clear_cvr_ballots(election_id, jurisdiction.id)
-
         # Ideally, the CVR should have the same number of ballots as the
         # manifest, so we can use that as an approximation of the file parsing
         # progress since we're streaming the file and don't know the size up front.
@@ -1308,146 +1586,146 @@ def process_cvr_file(
 
         contests_metadata, cvr_ballots = parse_cvrs()
 
-        # Store ballot rows as CvrBallots in the database. Since we may have
-        # millions of rows, we write this data into a tempfile and load it into
-        # the db using the COPY command (muuuuch faster than INSERT).
-        with tempfile.TemporaryFile(mode="w+") as ballots_tempfile:
-            ballots_csv = csv.writer(ballots_tempfile)
-            for i, cvr_ballot in enumerate(cvr_ballots):
-                if i % 1000 == 0:
-                    emit_progress(i, total_records)
-                # For hybrid audits, skip any batches that were marked as not
-                # having CVRs in the manifest
-                if (
-                    jurisdiction.election.audit_type == AuditType.HYBRID
-                    and not cvr_ballot.batch.has_cvrs
-                ):
-                    continue
-
-                ballots_csv.writerow(
-                    [
-                        cvr_ballot.batch.id,
-                        cvr_ballot.record_id,
-                        cvr_ballot.imprinted_id,
-                        cvr_ballot.interpretations,
-                    ]
-                )
-
-                # Add to our running totals for ContestChoice.num_votes and
-                # Contest.total_ballots_cast
-                interpretations = cvr_ballot.interpretations.split(",")
-                contests_on_ballot = set()
-                for contest_name, contest_metadata in contests_metadata.items():
-                    contest_interpretations = {
-                        choice_name: interpretations[choice_metadata["column"]]
-                        for choice_name, choice_metadata in contest_metadata[
-                            "choices"
-                        ].items()
-                    }
-
-                    # Skip contests not on ballot
-                    if any(
-                        interpretation == ""
-                        for interpretation in contest_interpretations.values()
-                    ):
-                        continue
-                    contests_on_ballot.add(contest_name)
-
-                    # Skip ES&S overvotes/undervotes
-                    if any(
-                        interpretation in ["o", "u"]
-                        for interpretation in contest_interpretations.values()
-                    ):
-                        continue
-
-                    # Dominions CVR files sometimes contain interpretation values that can't be
-                    # parsed as integers
-                    parsed_contest_interpretations: dict[
-                        str, int
-                    ] = {}  # { choice_name: parsed_interpretation }
-                    for choice_name, interpretation in contest_interpretations.items():
-                        try:
-                            parsed_interpretation = int(interpretation)
-                        except Exception as error:
-                            raise UserError(
-                                f"Unable to parse '{interpretation}' as an integer. "
-                                "Please export the CVR file with plain integer values."
-                            ) from error
-                        parsed_contest_interpretations[choice_name] = (
-                            parsed_interpretation
-                        )
+        # Alongside the raw interpretation strings, we store a pre-parsed,
+        # columnar copy of the interpretations for the audit math to read. As
+        # each chunk of rows is parsed, we add it to our running totals for
+        # ContestChoice.num_votes and Contest.total_ballots_cast.
+        interpretation_matrix = CvrMatrixBuilder(
+            num_cvr_interpretation_columns(contests_metadata),
+            on_chunk=lambda interpretations, invalid_rows: tally_cvr_interpretations(
+                contests_metadata, interpretations, invalid_rows
+            ),
+        )
 
-                    # Skip overvotes
-                    votes = sum(parsed_contest_interpretations.values())
-                    if votes > contest_metadata["votes_allowed"]:
-                        continue
-
-                    for (
-                        choice_name,
-                        parsed_interpretation,
-                    ) in parsed_contest_interpretations.items():
-                        contest_metadata["choices"][choice_name]["num_votes"] += (
-                            parsed_interpretation
-                        )
+        # For hybrid audits, skip any batches that were marked as not having
+        # CVRs in the manifest
+        should_skip_batches_without_cvrs = (
+            jurisdiction.election.audit_type == AuditType.HYBRID
+        )
 
-                for contest_name in contests_on_ballot:
-                    contests_metadata[contest_name]["total_ballots_cast"] += 1
+        # Each CvrBallot's ballot_position is its index within its batch in
+        # the CVR, ordering by record_id within the batch. CVR files aren't
+        # necessarily sorted that way, so we sort the rows by (batch_id,
+        # record_id) as we parse them, spilling to disk for large files, and
+        # then assign positions as we load the sorted rows.
+        # [(batch_id, record_id, imprinted_id, interpretations)]
+        sorted_ballots: ExternalSorter[tuple[str, int, str, str]] = ExternalSorter(
+            key=lambda ballot: (ballot[0], ballot[1])
+        )
+        for i, cvr_ballot in enumerate(cvr_ballots):
+            if i % 1000 == 0:
+                emit_progress(i, total_records)
+            if should_skip_batches_without_cvrs and not cvr_ballot.batch.has_cvrs:
+                continue
+
+            sorted_ballots.add(
+                (
+                    cvr_ballot.batch.id,
+                    cvr_ballot.record_id,
+                    cvr_ballot.imprinted_id,
+                    cvr_ballot.interpretations,
+                )
+            )
+            interpretation_matrix.add(
+                cvr_ballot.batch.id,
+                cvr_ballot.record_id,
+                cvr_ballot.interpretations.split(","),
+            )
 
-            jurisdiction.cvr_contests_metadata = contests_metadata
+        matrix = interpretation_matrix.build()
+        jurisdiction.cvr_contests_metadata = contests_metadata
 
-            # In order to use the COPY command, we have to get the raw psycopg2
-            # connection. Note that we use the underlying connection from the
-            # db_session, so the operation will occur within the same
-            # transaction.
-            cursor = db_session.connection().connection.cursor()
-            ballots_tempfile.seek(0)
-            try:
-                cursor.copy_expert(
-                    """
-                    COPY cvr_ballot (
+        # Store ballot rows as CvrBallots in the database. Since we may have
+        # millions of rows, we load them into the db using the COPY command
+        # (muuuuch faster than INSERT). Rows are copied in chunks on a
+        # background thread while we continue merging the sorted rows. We load
+        # them into a fresh table, which we swap in as the jurisdiction's
+        # partition of cvr_ballot once it's loaded.
+        #
+        # In order to use the COPY command, we have to get the raw psycopg2
+        # connection. Note that we use the underlying connection from the
+        # db_session, so the operation will occur within the same
+        # transaction.
+        load_table = create_cvr_ballot_load_table(jurisdiction.id)
+        cursor = db_session.connection().connection.cursor()
+        try:
+            with PipelinedCopyLoader(
+                cursor,
+                f"""
+                COPY {load_table} (
+                    jurisdiction_id,
+                    batch_id,
+                    record_id,
+                    ballot_position,
+                    imprinted_id,
+                    interpretations
+                )
+                FROM STDIN
+                WITH (
+                    FORMAT CSV,
+                    DELIMITER ','
+                )
+                """,
+            ) as ballots_loader:
+                for _, batch_ballots in itertools.groupby(
+                    sorted_ballots.sorted(), key=lambda ballot: ballot[0]
+                ):
+                    for ballot_position, (
                         batch_id,
                         record_id,
                         imprinted_id,
-                        interpretations
-                    )
-                    FROM STDIN
-                    WITH (
-                        FORMAT CSV,
-                        DELIMITER ','
-                    )
-                    """,
-                    ballots_tempfile,
-                )
-            except Exception as exc:
-                raise exc
-            finally:
-                cursor.close()
-
-        # Assign ballot_position for each CvrBallot by counting each ballot's
-        # index within the batch in the CVR, ordering by record_id within the
-        # batch
-        ballot_position = (
-            CvrBallot.query.join(Batch)
-            .filter_by(jurisdiction_id=jurisdiction.id)
-            .with_entities(
-                CvrBallot.batch_id,
-                CvrBallot.record_id,
-                func.row_number()
-                .over(partition_by=CvrBallot.batch_id, order_by=CvrBallot.record_id)
-                .label("ballot_position"),
+                        interpretations,
+                    ) in enumerate(batch_ballots, start=1):
+                        ballots_loader.write_row(
+                            [
+                                jurisdiction.id,
+                                batch_id,
+                                record_id,
+                                ballot_position,
+                                imprinted_id,
+                                interpretations,
+                            ]
+                        )
+                ballots_loader.finish()
+        finally:
+            cursor.close()
+
+        # Clear out any existing CVR data from previous files (e.g., if we're
+        # overwriting a previous file) and swap in the newly loaded ballots.
+        # Since this all happens in one transaction, other queries see either
+        # the old ballots or the new ones.
+        clear_cvr_ballots(election_id, jurisdiction.id)
+        attach_cvr_ballot_partition(jurisdiction.id, load_table)
+
+        db_session.add(
+            CvrInterpretationMatrix(
+                cvr_file_id=jurisdiction.cvr_file_id,
+                jurisdiction_id=jurisdiction.id,
+                num_ballots=matrix.num_ballots,
+                num_columns=matrix.num_columns,
+                batch_ids=matrix.batch_ids,
+                batch_offsets=matrix.batch_offsets_bytes(),
+                interpretations=matrix.interpretations_bytes(),
             )
-            .subquery()
         )
-        db_session.execute(
-            CvrBallot.__table__.update()
-            .values(ballot_position=ballot_position.c.ballot_position)
-            .where(
-                and_(
-                    CvrBallot.batch_id == ballot_position.c.batch_id,
-                    CvrBallot.record_id == ballot_position.c.record_id,
+        for cvr_contest_name, contest_metadata in contests_metadata.items():
+            has_contest = contest_presence(
+                matrix.interpretations[
+                    :,
+                    [
+                        choice_metadata["column"]
+                        for choice_metadata in contest_metadata["choices"].values()
+                    ],
+                ]
+            )
+            db_session.add(
+                CvrContestIndex(
+                    cvr_file_id=jurisdiction.cvr_file_id,
+                    jurisdiction_id=jurisdiction.id,
+                    cvr_contest_name=cvr_contest_name,
+                    has_contest=contest_presence_bytes(has_contest),
                 )
             )
-        )
 
         contests.set_contest_metadata(jurisdiction.election)
 
@@ -1505,6 +1783,8 @@ def validate_cvr_upload(
 
 def clear_cvr_contests_metadata(jurisdiction: Jurisdiction):
     jurisdiction.cvr_contests_metadata = None
+    # Sample sizes computed from the old CVRs won't be reused
+    SampleSizeCache.query.filter_by(election_id=jurisdiction.election_id).delete()
 
 
 def finalize_cvr_upload(
@@ -1528,18 +1808,79 @@ def finalize_cvr_upload(
     )
 
 
-@background_task
-def clear_cvr_ballots(election_id: str, jurisdiction_id: str):
-    # Note that this query can be slow due to the query planner sometimes
-    # choosing to not use the relevant index on CvrBallot.batch_id. So it should
-    # only be run in background tasks.
-    CvrBallot.query.filter(
-        CvrBallot.batch_id.in_(
-            Batch.query.filter_by(jurisdiction_id=jurisdiction_id)
-            .with_entities(Batch.id)
-            .subquery()
+# Each jurisdiction's CvrBallots are stored in their own partition of the
+# cvr_ballot table. Jurisdiction ids aren't necessarily valid table names, so we
+# name the partition using a hash of the id.
+def cvr_ballot_partition_name(jurisdiction_id: str) -> str:
+    return f"cvr_ballot_{hashlib.md5(jurisdiction_id.encode()).hexdigest()}"
+
+
+def create_cvr_ballot_load_table(jurisdiction_id: str) -> str:
+    """
+    Creates an empty, standalone table with the same columns as cvr_ballot to
+    load a jurisdiction's CvrBallots into. Once loaded, it should be swapped in
+    as the jurisdiction's partition using attach_cvr_ballot_partition.
+    """
+    load_table = f"{cvr_ballot_partition_name(jurisdiction_id)}_load"
+    db_session.execute(
+        text(f"CREATE TABLE {load_table} (LIKE cvr_ballot INCLUDING DEFAULTS)")
+    )
+    return load_table
+
+
+def attach_cvr_ballot_partition(jurisdiction_id: str, load_table: str):
+    # The jurisdiction's existing partition (if any) must have already been
+    # dropped using clear_cvr_ballots.
+    partition = cvr_ballot_partition_name(jurisdiction_id)
+    jurisdiction_id_literal = "'" + jurisdiction_id.replace("'", "''") + "'"
+    # Build the constraints that cvr_ballot will expect the partition to have
+    # before attaching it. That way, attaching reuses them instead of
+    # validating the partition while holding a lock on cvr_ballot. The check
+    # constraint lets Postgres skip scanning the partition to check that it
+    # only contains rows for this jurisdiction.
+    db_session.execute(
+        text(
+            f"""
+            ALTER TABLE {load_table}
+                ADD CONSTRAINT cvr_ballot_load_jurisdiction_id_check
+                    CHECK (jurisdiction_id = {jurisdiction_id_literal}),
+                ADD PRIMARY KEY (batch_id, record_id, jurisdiction_id),
+                ADD UNIQUE (batch_id, ballot_position, jurisdiction_id),
+                ADD FOREIGN KEY (batch_id)
+                    REFERENCES batch (id) ON DELETE CASCADE,
+                ADD FOREIGN KEY (jurisdiction_id)
+                    REFERENCES jurisdiction (id) ON DELETE CASCADE
+            """
         )
-    ).delete(synchronize_session=False)
+    )
+    db_session.execute(text(f"ALTER TABLE {load_table} RENAME TO {partition}"))
+    db_session.execute(
+        text(
+            f"ALTER TABLE cvr_ballot ATTACH PARTITION {partition}"
+            f" FOR VALUES IN ({jurisdiction_id_literal})"
+        )
+    )
+    db_session.execute(
+        text(
+            f"ALTER TABLE {partition}"
+            " DROP CONSTRAINT cvr_ballot_load_jurisdiction_id_check"
+        )
+    )
+
+
+@background_task(queue=FILE_PROCESSING_QUEUE)
+def clear_cvr_ballots(election_id: str, jurisdiction_id: str):
+    # Rather than deleting the jurisdiction's CvrBallots row by row, we detach
+    # and drop its whole partition, which is quick no matter how many ballots
+    # it has.
+    partition = cvr_ballot_partition_name(jurisdiction_id)
+    if db_session.execute(
+        text("SELECT to_regclass(:partition)"), dict(partition=partition)
+    ).scalar():
+        db_session.execute(text(f"ALTER TABLE cvr_ballot DETACH PARTITION {partition}"))
+        db_session.execute(text(f"DROP TABLE {partition}"))
+    CvrInterpretationMatrix.query.filter_by(jurisdiction_id=jurisdiction_id).delete()
+    CvrContestIndex.query.filter_by(jurisdiction_id=jurisdiction_id).delete()
 
 
 @api.route(
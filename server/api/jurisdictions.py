@@ -23,6 +23,7 @@ from .ballot_manifest import hybrid_jurisdiction_total_ballots
 from .contests import set_contest_metadata
 from .standardized_contests import process_standardized_contests_file
 from ..worker.tasks import (
+    FILE_PROCESSING_QUEUE,
     background_task,
     create_background_task,
 )
@@ -62,7 +63,7 @@ JURISDICTIONS_COLUMNS = [
 ]
 
 
-@background_task
+@background_task(queue=FILE_PROCESSING_QUEUE)
 def process_jurisdictions_file(election_id: str):
     election = Election.query.get(election_id)
     jurisdictions_file = retrieve_file(election.jurisdictions_file)
@@ -191,9 +192,7 @@ def serialize_jurisdiction(
         file = serialize_file(jurisdiction.cvr_file)
         processing = serialize_file_processing(jurisdiction.cvr_file)
         num_cvr_ballots = (
-            CvrBallot.query.join(Batch)
-            .filter_by(jurisdiction_id=jurisdiction.id)
-            .count()
+            CvrBallot.query.filter_by(jurisdiction_id=jurisdiction.id).count()
             if (not round_status)
             and processing
             and processing["status"] == ProcessingStatus.PROCESSED
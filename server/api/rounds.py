@@ -1,16 +1,19 @@
+import logging
+import time
 import uuid
 from datetime import datetime
+from typing import Callable
 from flask import jsonify, request
 from jsonschema import validate
 from werkzeug.exceptions import BadRequest, Conflict
-from sqlalchemy import and_, func, not_
+from sqlalchemy import and_, func, not_, tuple_
+from sqlalchemy.dialects import postgresql
 
 
 from . import api
 from ..database import db_session
 from ..models import *
 from .shared import (
-    BallotDraw,
     SampleSize,
     active_targeted_contests,
     batch_tallies,
@@ -33,7 +36,7 @@ from .shared import (
 )
 from ..auth import restrict_access, UserType
 from ..util.isoformat import isoformat
-from ..util.collections import group_by
+from ..util.collections import chunked
 from ..audit_math import (
     ballot_polling,
     macro,
@@ -56,6 +59,15 @@ from ..activity_log import (
 from ..feature_flags import is_enabled_automatically_end_audit_after_one_round
 from ..util.get_json import safe_get_json_dict
 
+logger = logging.getLogger("arlo.rounds")
+
+# Number of rows to insert per statement when writing a sample to the db
+BULK_INSERT_CHUNK_SIZE = 5000
+# The phases of draw_sample_ballots that we report progress on: drawing the
+# sample, loading previously sampled ballots, inserting new sampled ballots,
+# and inserting the sampled ballot draws
+DRAW_SAMPLE_BALLOTS_PHASES = 4
+
 
 def is_round_ready_to_finish(election: Election, round: Round) -> bool:
     # For batch audits, check that all jurisdictions with sampled batches this
@@ -323,7 +335,7 @@ def calculate_risk_measurements(election: Election, round: Round):
 
 
 @background_task
-def draw_sample(round_id: str, election_id: str):
+def draw_sample(round_id: str, election_id: str, emit_progress):
     round = Round.query.filter_by(id=round_id, election_id=election_id).one()
     election = round.election
 
@@ -342,12 +354,24 @@ def draw_sample(round_id: str, election_id: str):
     if election.audit_type == AuditType.BATCH_COMPARISON:
         draw_sample_batches(election, round, contest_sample_sizes)
     elif election.audit_type in [AuditType.BALLOT_POLLING, AuditType.BALLOT_COMPARISON]:
-        draw_sample_ballots(election, round, contest_sample_sizes)
+        draw_sample_ballots(
+            election, round, contest_sample_sizes, emit_progress=emit_progress
+        )
     else:
         assert election.audit_type == AuditType.HYBRID
-        draw_sample_ballots(election, round, contest_sample_sizes, filter_has_cvrs=True)
         draw_sample_ballots(
-            election, round, contest_sample_sizes, filter_has_cvrs=False
+            election,
+            round,
+            contest_sample_sizes,
+            filter_has_cvrs=True,
+            emit_progress=emit_progress,
+        )
+        draw_sample_ballots(
+            election,
+            round,
+            contest_sample_sizes,
+            filter_has_cvrs=False,
+            emit_progress=emit_progress,
         )
 
 
@@ -366,6 +390,23 @@ def draw_sample_batches(
         )
         db_session.add(sampled_batch_draw)
 
+    # Record the last ticket number drawn for each batch, so the next round's
+    # sample can continue the batch's ticket numbers from there
+    last_tickets = {
+        (batch_draw["batch_id"], batch_draw["contest_id"]): batch_draw["ticket_number"]
+        for batch_draw in sample
+        if batch_draw["ticket_number"] != EXTRA_TICKET_NUMBER
+    }
+    for (batch_id, contest_id), ticket_number in last_tickets.items():
+        db_session.add(
+            SampledBatchLastTicket(
+                batch_id=batch_id,
+                round_id=round.id,
+                contest_id=contest_id,
+                ticket_number=ticket_number,
+            )
+        )
+
 
 def draw_sample_ballots(
     election: Election,
@@ -377,18 +418,18 @@ def draw_sample_ballots(
     # Batch.has_cvrs. Since Batch.has_cvrs is None for all other audit types,
     # the default filter is None.
     filter_has_cvrs: bool | None = None,
+    *,
+    emit_progress: Callable[[int, int], None],
 ):
-    sample = compute_sample_ballots(election, contest_sample_sizes, filter_has_cvrs)
-
-    # Group all sample draws by ballot
-    sample_draws_by_ballot: dict[tuple[str, int], list[BallotDraw]] = group_by(
-        sample,
-        key=lambda sample_draw: (
-            sample_draw["batch_id"],
-            sample_draw["ballot_position"],
-        ),
+    start_time = time.perf_counter()
+    emit_progress(0, DRAW_SAMPLE_BALLOTS_PHASES)
+    sample = compute_sample_ballots(
+        election, contest_sample_sizes, filter_has_cvrs, save_frontier=True
     )
 
+    phase_timings = {"draw": time.perf_counter() - start_time}
+    emit_progress(1, DRAW_SAMPLE_BALLOTS_PHASES)
+
     # Record which ballots are sampled in the db.
     # Note that a ballot may be sampled more than once (within a round or
     # across multiple rounds). We create one SampledBallot for each real-world
@@ -396,29 +437,97 @@ def draw_sample_ballots(
     # SampledBallotDraw. That way we can ensure that we don't need to actually
     # look at a real-world ballot that we've already audited, even if it gets
     # sampled again.
-    for ballot_key, sample_draws in sample_draws_by_ballot.items():
-        batch_id, ballot_position = ballot_key
-
-        sampled_ballot = SampledBallot.query.filter_by(
-            batch_id=batch_id, ballot_position=ballot_position
-        ).first()
-        if not sampled_ballot:
-            sampled_ballot = SampledBallot(
-                id=str(uuid.uuid4()),
-                batch_id=batch_id,
-                ballot_position=ballot_position,
-                status=BallotStatus.NOT_AUDITED,
+    #
+    # Since samples can be large, we write the rows in bulk rather than
+    # loading/adding each ballot through the ORM. First, load all of the
+    # ballots already sampled in previous rounds.
+    phase_start_time = time.perf_counter()
+    sampled_ballot_ids: dict[tuple[str, int], str] = {
+        (batch_id, ballot_position): ballot_id
+        for ballot_id, batch_id, ballot_position in SampledBallot.query.join(Batch)
+        .join(Jurisdiction)
+        .filter_by(election_id=election.id)
+        .with_entities(
+            SampledBallot.id, SampledBallot.batch_id, SampledBallot.ballot_position
+        )
+    }
+    phase_timings["load_sampled_ballots"] = time.perf_counter() - phase_start_time
+    emit_progress(2, DRAW_SAMPLE_BALLOTS_PHASES)
+
+    # Insert the newly sampled ballots
+    phase_start_time = time.perf_counter()
+    new_ballot_keys = sorted(
+        {
+            (sample_draw["batch_id"], sample_draw["ballot_position"])
+            for sample_draw in sample
+        }
+        - sampled_ballot_ids.keys()
+    )
+    new_ballots = [
+        dict(
+            id=str(uuid.uuid4()),
+            batch_id=batch_id,
+            ballot_position=ballot_position,
+            status=BallotStatus.NOT_AUDITED,
+        )
+        for batch_id, ballot_position in new_ballot_keys
+    ]
+    conflicting_ballot_keys = set(new_ballot_keys)
+    for chunk in chunked(new_ballots, BULK_INSERT_CHUNK_SIZE):
+        inserted_ballots = db_session.execute(
+            postgresql.insert(SampledBallot.__table__)
+            .values(chunk)
+            .on_conflict_do_nothing(index_elements=["batch_id", "ballot_position"])
+            .returning(
+                SampledBallot.id, SampledBallot.batch_id, SampledBallot.ballot_position
             )
-            db_session.add(sampled_ballot)
+        )
+        for ballot_id, batch_id, ballot_position in inserted_ballots:
+            sampled_ballot_ids[(batch_id, ballot_position)] = ballot_id
+            conflicting_ballot_keys.remove((batch_id, ballot_position))
+    # We run with the election's task lock held, so no one else should be
+    # sampling these ballots, but just in case, use the existing ballots.
+    if conflicting_ballot_keys:
+        sampled_ballot_ids.update(
+            {
+                (batch_id, ballot_position): ballot_id
+                for ballot_id, batch_id, ballot_position in SampledBallot.query.filter(
+                    tuple_(SampledBallot.batch_id, SampledBallot.ballot_position).in_(
+                        list(conflicting_ballot_keys)
+                    )
+                ).with_entities(
+                    SampledBallot.id,
+                    SampledBallot.batch_id,
+                    SampledBallot.ballot_position,
+                )
+            }
+        )
+    phase_timings["insert_sampled_ballots"] = time.perf_counter() - phase_start_time
+    emit_progress(3, DRAW_SAMPLE_BALLOTS_PHASES)
+
+    # Insert a draw for every time each ballot was sampled
+    phase_start_time = time.perf_counter()
+    sampled_ballot_draws = [
+        dict(
+            ballot_id=sampled_ballot_ids[
+                (sample_draw["batch_id"], sample_draw["ballot_position"])
+            ],
+            round_id=round.id,
+            contest_id=sample_draw["contest_id"],
+            ticket_number=sample_draw["ticket_number"],
+        )
+        for sample_draw in sample
+    ]
+    for chunk in chunked(sampled_ballot_draws, BULK_INSERT_CHUNK_SIZE):
+        db_session.execute(postgresql.insert(SampledBallotDraw.__table__).values(chunk))
+    phase_timings["insert_sampled_ballot_draws"] = (
+        time.perf_counter() - phase_start_time
+    )
+    emit_progress(4, DRAW_SAMPLE_BALLOTS_PHASES)
 
-        for sample_draw in sample_draws:
-            sampled_ballot_draw = SampledBallotDraw(
-                ballot_id=sampled_ballot.id,
-                round_id=round.id,
-                contest_id=sample_draw["contest_id"],
-                ticket_number=sample_draw["ticket_number"],
-            )
-            db_session.add(sampled_ballot_draw)
+    logger.info(
+        f"DRAW_SAMPLE_BALLOTS {dict(round_id=round.id, num_draws=len(sample), num_new_ballots=len(new_ballots), phase_timings=phase_timings)}"
+    )
 
 
 def create_selected_sample_sizes_schema(audit_type: AuditType):
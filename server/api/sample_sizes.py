@@ -1,7 +1,10 @@
 from datetime import datetime, timedelta
+import hashlib
+import json
 from typing import cast as typing_cast
 from collections import Counter, defaultdict
 from flask import jsonify
+from sqlalchemy.dialects.postgresql import insert
 from werkzeug.exceptions import BadRequest
 
 
@@ -19,7 +22,11 @@ from ..audit_math import (
 )
 from ..audit_math.ballot_polling import SampleSizeOption
 from . import rounds
-from .cvrs import validate_uploaded_cvrs, hybrid_contest_choice_vote_counts
+from .cvrs import (
+    hybrid_contest_choice_vote_counts,
+    num_cvr_ballots,
+    validate_uploaded_cvrs,
+)
 from .ballot_manifest import hybrid_contest_total_ballots, all_manifests_uploaded
 from ..worker.tasks import (
     serialize_background_task,
@@ -73,12 +80,8 @@ def validate_hybrid_manifests_and_cvrs(contest: Contest):
         )
 
     manifest_ballots = hybrid_contest_total_ballots(contest)
-    cvr_ballots = (
-        CvrBallot.query.join(Batch)
-        .join(Jurisdiction)
-        .join(Jurisdiction.contests)
-        .filter_by(id=contest.id)
-        .count()
+    cvr_ballots = sum(
+        num_cvr_ballots(jurisdiction) for jurisdiction in contest.jurisdictions
     )
     if manifest_ballots.cvr < cvr_ballots:
         raise UserError(
@@ -119,6 +122,66 @@ def validate_hybrid_manifests_and_cvrs(contest: Contest):
         )
 
 
+def sample_size_fingerprint(election: Election, contest: Contest) -> str | None:
+    """
+    Returns a fingerprint of all of the inputs that a contest's sample size
+    options (and the validations that run before computing them) depend on:
+    the audit settings, the contest tallies, the jurisdictions' files and
+    batch tallies, and the sample results and sizes from previous rounds.
+
+    Returns None while a round is in progress, since the sample results are
+    still changing.
+    """
+    if any(round.ended_at is None for round in election.rounds):
+        return None
+
+    def file_state(file: File | None):
+        return file and (
+            file.id,
+            file.task and file.task.completed_at,
+            file.task and file.task.error,
+        )
+
+    inputs = dict(
+        audit_type=election.audit_type,
+        audit_math_type=election.audit_math_type,
+        risk_limit=election.risk_limit,
+        contest=dict(
+            id=contest.id,
+            total_ballots_cast=contest.total_ballots_cast,
+            num_winners=contest.num_winners,
+            votes_allowed=contest.votes_allowed,
+            choices=sorted((choice.id, choice.num_votes) for choice in contest.choices),
+        ),
+        jurisdictions=[
+            dict(
+                id=jurisdiction.id,
+                manifest=file_state(jurisdiction.manifest_file),
+                manifest_num_ballots=jurisdiction.manifest_num_ballots,
+                cvrs=file_state(jurisdiction.cvr_file),
+                contest_name_standardizations=jurisdiction.contest_name_standardizations,
+                contest_choice_name_standardizations=jurisdiction.contest_choice_name_standardizations,
+                batch_tallies_file=file_state(jurisdiction.batch_tallies_file),
+                batch_tallies=jurisdiction.batch_tallies,
+            )
+            for jurisdiction in sorted(contest.jurisdictions, key=lambda j: j.id)
+        ],
+        rounds=[
+            (round.id, round.round_num, round.ended_at) for round in election.rounds
+        ],
+    )
+    # Ballot polling math uses the sample results and round sizes directly.
+    # For other audit types, the results are fixed once each round has ended.
+    if election.audit_type == AuditType.BALLOT_POLLING:
+        inputs["sample_results"] = rounds.contest_results_by_round(contest)
+        inputs["samples_not_found"] = samples_not_found_by_round(contest)
+        inputs["round_sizes"] = rounds.round_sizes(contest)
+
+    return hashlib.sha256(
+        json.dumps(inputs, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
 def sample_size_options(election: Election) -> dict[str, dict[str, SampleSizeOption]]:
     if not election.contests:
         raise UserError("Cannot compute sample sizes until contests are set")
@@ -211,9 +274,31 @@ def sample_size_options(election: Election) -> dict[str, dict[str, SampleSizeOpt
                 }
             }
 
+    def cached_sample_sizes_for_contest(contest: Contest):
+        fingerprint = sample_size_fingerprint(election, contest)
+        if fingerprint is None:
+            return sample_sizes_for_contest(contest)
+
+        cached = SampleSizeCache.query.get((contest.id, fingerprint))
+        if cached:
+            return cached.sample_size_options
+
+        options = sample_sizes_for_contest(contest)
+        db_session.execute(
+            insert(SampleSizeCache.__table__)
+            .values(
+                election_id=election.id,
+                contest_id=contest.id,
+                fingerprint=fingerprint,
+                sample_size_options=options,
+            )
+            .on_conflict_do_nothing()
+        )
+        return options
+
     try:
         return {
-            contest.id: sample_sizes_for_contest(contest)
+            contest.id: cached_sample_sizes_for_contest(contest)
             for contest in rounds.active_targeted_contests(election)
         }
     except ValueError as exc:
@@ -1,10 +1,11 @@
 from collections import defaultdict
 import random
-from typing import TypedDict
+from typing import Sequence, TypedDict
 from sqlalchemy import and_, func, literal
 from sqlalchemy.orm import joinedload, load_only
 
 
+from ..database import db_session
 from ..models import *
 from ..audit_math import (
     ballot_polling_types,
@@ -15,8 +16,13 @@ from ..audit_math import (
     supersimple,
 )
 from ..util.collections import group_by
+from ..util.cvr_matrix import NOT_ON_BALLOT, decode_interpretation
 from .ballot_manifest import CountingGroup, hybrid_contest_total_ballots
-from .cvrs import cvr_contests_metadata, hybrid_contest_choice_vote_counts
+from .cvrs import (
+    cvr_contest_interpretations,
+    cvr_contest_presence,
+    hybrid_contest_choice_vote_counts,
+)
 from ..feature_flags import (
     is_enabled_sample_extra_batches_by_counting_group,
     is_enabled_sample_extra_batches_to_ensure_one_per_jurisdiction,
@@ -304,59 +310,70 @@ def round_sizes(contest: Contest) -> ballot_polling_types.BALLOT_POLLING_ROUND_S
 def cvrs_for_contest(contest: Contest) -> sampler_contest.CVRS:
     cvrs: sampler_contest.CVRS = {}
 
-    ballot_interpretations = (
-        CvrBallot.query.join(Batch)
+    sampled_ballots = (
+        SampledBallot.query.join(Batch)
         .join(Jurisdiction)
         .join(Jurisdiction.contests)
         .filter_by(id=contest.id)
-        .join(
-            SampledBallot,
-            and_(
-                CvrBallot.batch_id == SampledBallot.batch_id,
-                CvrBallot.ballot_position == SampledBallot.ballot_position,
-            ),
+        .with_entities(
+            Jurisdiction.id,
+            SampledBallot.id,
+            SampledBallot.batch_id,
+            SampledBallot.ballot_position,
         )
-        .values(Jurisdiction.id, SampledBallot.id, CvrBallot.interpretations)
+        .all()
+    )
+    sampled_ballots_by_jurisdiction = group_by(
+        sampled_ballots, key=lambda sampled_ballot: sampled_ballot[0]
     )
 
-    metadata_by_jurisdictions = {
-        jurisdiction.id: cvr_contests_metadata(jurisdiction)
-        for jurisdiction in contest.jurisdictions
-    }
-
-    for jurisdiction_id, ballot_key, interpretations_str in ballot_interpretations:
-        metadata = metadata_by_jurisdictions[jurisdiction_id]
-        assert metadata is not None
-        choices_metadata = metadata[contest.name]["choices"]
-
-        # interpretations is the raw CVR string: 1,0,0,1,0,1,0. We need to
-        # pick out the interpretation for each contest choice. We saved the
-        # column index for each choice when we parsed the CVR.
-        interpretations = interpretations_str.split(",")
-        choice_interpretations = {
-            choice_name: interpretations[choice_metadata["column"]]
-            for choice_name, choice_metadata in choices_metadata.items()
-        }
-
-        # If the interpretations are empty, it means the contest wasn't
-        # on the ballot, so we should skip this contest entirely for
-        # this ballot.
-        if all(
-            interpretation == "" for interpretation in choice_interpretations.values()
+    for jurisdiction in contest.jurisdictions:
+        jurisdiction_sampled_ballots = sampled_ballots_by_jurisdiction.get(
+            jurisdiction.id
+        )
+        if (
+            not jurisdiction_sampled_ballots
+            or jurisdiction.cvr_contests_metadata is None
         ):
-            cvrs[ballot_key] = {}
-        else:
-            # Parse each choice's interpretation. We use the main list of
-            # contest choices since each jurisdiction's CVR may only record
-            # a subset of the choices (e.g. in ES&S/Hart). If there's a
-            # choice we don't have a CVR interpretation for, we can assume
-            # it didn't get voted for and set its interpretation to 0.
-            cvrs[ballot_key] = {
-                contest.id: {
-                    choice.id: choice_interpretations.get(choice.name, "0")
-                    for choice in contest.choices
+            continue
+
+        # Load the pre-parsed CVR interpretations for just this contest's
+        # choices, then pick out the rows for the sampled ballots.
+        choice_names, matrix = cvr_contest_interpretations(jurisdiction, contest.name)
+        rows = matrix.rows(
+            (batch_id, ballot_position)
+            for _, _, batch_id, ballot_position in jurisdiction_sampled_ballots
+        )
+
+        for (_, ballot_key, _, _), row in zip(jurisdiction_sampled_ballots, rows):
+            # Sampled ballots that aren't in the CVR don't get a CVR
+            if row == -1:
+                continue
+            row_interpretations = matrix.interpretations[row]
+
+            # If the interpretations are empty, it means the contest wasn't
+            # on the ballot, so we should skip this contest entirely for
+            # this ballot.
+            if (row_interpretations == NOT_ON_BALLOT).all():
+                cvrs[ballot_key] = {}
+            else:
+                choice_interpretations = {
+                    choice_name: decode_interpretation(int(interpretation))
+                    for choice_name, interpretation in zip(
+                        choice_names, row_interpretations
+                    )
+                }
+                # Parse each choice's interpretation. We use the main list of
+                # contest choices since each jurisdiction's CVR may only record
+                # a subset of the choices (e.g. in ES&S/Hart). If there's a
+                # choice we don't have a CVR interpretation for, we can assume
+                # it didn't get voted for and set its interpretation to 0.
+                cvrs[ballot_key] = {
+                    contest.id: {
+                        choice.id: choice_interpretations.get(choice.name, "0")
+                        for choice in contest.choices
+                    }
                 }
-            }
 
     return cvrs
 
@@ -671,12 +688,32 @@ def compute_sample_batches_for_contest(
         .with_entities(Jurisdiction.name, Batch.name)
     )
 
+    # Continue each previously sampled batch's ticket numbers from its last
+    # ticket (taking the latest round it was sampled in). If any previously
+    # sampled batch is missing a last ticket (e.g. it was sampled before we
+    # started recording them), let the sampler regenerate all the tickets.
+    last_tickets: dict[sampler.BatchKey, str] = {
+        (jurisdiction_name, batch_name): ticket_number
+        for jurisdiction_name, batch_name, ticket_number in (
+            SampledBatchLastTicket.query.filter_by(contest_id=contest.id)
+            .join(Batch)
+            .join(Jurisdiction)
+            .join(Round)
+            .order_by(Round.round_num)
+            .with_entities(
+                Jurisdiction.name, Batch.name, SampledBatchLastTicket.ticket_number
+            )
+        )
+    }
+    has_last_tickets = set(previously_sampled_batch_keys) <= last_tickets.keys()
+
     sample = sampler.draw_ppeb_sample(
         str(election.random_seed),
         sampler_contest.from_db_contest(contest),
         contest_sample_size["size"],
         previously_sampled_batch_keys,
         batch_tallies(contest),
+        last_tickets=last_tickets if has_last_tickets else None,
     )
 
     sample_batches = [
@@ -877,6 +914,10 @@ def compute_sample_ballots(
     # Batch.has_cvrs. Since Batch.has_cvrs is None for all other audit types,
     # the default filter is None.
     filter_has_cvrs: bool | None = None,
+    # Whether to save the sampler's state after drawing, so that the next
+    # round's sample can be drawn starting from there. This should only be set
+    # when drawing a round's sample (e.g. not for sample previews).
+    save_frontier: bool = False,
 ) -> list[BallotDraw]:
     participating_jurisdictions = {
         jurisdiction
@@ -914,59 +955,25 @@ def compute_sample_ballots(
 
         if election.audit_math_type == AuditMathType.CARD_STYLE_DATA:
             # The sampling pool will be all ballots in the audit with the contest
-            manifest: dict[tuple[str, str | None, str], list[int]] = defaultdict(
+            manifest: dict[tuple[str, str | None, str], Sequence[int]] = defaultdict(
                 list  # { batch_key: [ballot_position] }
             )
             # Filter down to only ballots in jurisdictions with the contest, and then
             # filter to ballots that have a CVR interpretation for the contest
-            ballots_in_jurisdictions_with_contest = (
-                CvrBallot.query.join(Batch)
-                .join(Jurisdiction)
-                .join(Jurisdiction.contests)
-                .filter(
-                    Contest.id == contest.id,
-                )
-                .with_entities(
-                    Jurisdiction.id,
-                    CvrBallot.batch_id,
-                    CvrBallot.ballot_position,
-                    CvrBallot.interpretations,
-                )
-                .order_by(CvrBallot.batch_id, CvrBallot.ballot_position)
-            )
-            metadata_by_jurisdictions = {
-                jurisdiction.id: cvr_contests_metadata(jurisdiction)
-                for jurisdiction in contest.jurisdictions
-            }
-            for (
-                jurisdiction_id,
-                batch_id,
-                ballot_position,
-                interpretations_str,
-            ) in ballots_in_jurisdictions_with_contest.yield_per(100):
-                metadata = metadata_by_jurisdictions[jurisdiction_id]
-                assert metadata is not None
-                choices_metadata = metadata[contest.name]["choices"]
-                # interpretations is the raw CVR string: 1,0,0,1,0,1,0. We need to
-                # pick out the interpretation for each contest choice to see if
-                # any are non-empty, indicating the ballot has the contest
-                interpretations = interpretations_str.split(",")
-                choice_interpretations = [
-                    interpretations[choice_metadata["column"]]
-                    for choice_metadata in choices_metadata.values()
-                ]
-
-                # If the interpretations are empty, it means the contest wasn't
-                # on the ballot, so we don't add it to the manifest
-                if all(
-                    interpretation == "" for interpretation in choice_interpretations
-                ):
+            for jurisdiction in contest.jurisdictions:
+                if jurisdiction.cvr_contests_metadata is None:
                     continue
-                manifest[batch_id_to_key[batch_id]].append(ballot_position)
+                presence = cvr_contest_presence(jurisdiction, contest.name)
+                for batch_index, batch_id in enumerate(presence.batch_ids):
+                    ballot_positions = presence.ballot_positions(batch_index)
+                    if len(ballot_positions) > 0:
+                        # Convert to Python ints so the sampler hashes the
+                        # ballot positions the same way as before
+                        manifest[batch_id_to_key[batch_id]] = ballot_positions.tolist()
         else:
             # The sampling pool will be all ballots in the audit
             manifest = {
-                batch_id_to_key[batch.id]: list(range(1, batch.num_ballots + 1))
+                batch_id_to_key[batch.id]: range(1, batch.num_ballots + 1)
                 for jurisdiction in contest.jurisdictions
                 for batch in jurisdiction.batches
                 if batch.has_cvrs == filter_has_cvrs
@@ -979,17 +986,43 @@ def compute_sample_ballots(
         else:
             sample_size_num = sample_size["sizeNonCvr"]
 
+        # In hybrid audits, sample without replacement for the non-CVR
+        # ballots, and with replacement for the CVR ballots.
+        # All other audit types sample with replacement.
+        with_replacement = True if filter_has_cvrs is None else filter_has_cvrs
+
+        # If we saved the sampler's frontier after drawing the previous round's
+        # sample from the same seed and manifest, resume from there.
+        ballot_pool = {None: "ALL", True: "CVR", False: "NON_CVR"}[filter_has_cvrs]
+        fingerprint = sampler.manifest_fingerprint(
+            str(election.random_seed), manifest, with_replacement
+        )
+        frontier_cache = SampleFrontierCache.query.get((contest.id, ballot_pool))
+        frontier = (
+            sampler.load_frontier(frontier_cache.frontier)
+            if frontier_cache and frontier_cache.fingerprint == fingerprint
+            else None
+        )
+
         # Do the math! i.e. compute the actual sample
-        sample = sampler.draw_sample(
+        sample, next_frontier = sampler.draw_sample_from_frontier(
             str(election.random_seed),
             dict(manifest),
             sample_size_num,
             num_previously_sampled,
-            # In hybrid audits, sample without replacement for the non-CVR
-            # ballots, and with replacement for the CVR ballots.
-            # All other audit types sample with replacement.
-            with_replacement=(True if filter_has_cvrs is None else filter_has_cvrs),
+            with_replacement=with_replacement,
+            frontier=frontier,
         )
+
+        if save_frontier:
+            if frontier_cache is None:
+                frontier_cache = SampleFrontierCache(
+                    contest_id=contest.id, ballot_pool=ballot_pool
+                )
+                db_session.add(frontier_cache)
+            frontier_cache.fingerprint = fingerprint
+            frontier_cache.frontier = next_frontier
+
         return [
             BallotDraw(
                 batch_id=batch_key_to_id[batch_key],
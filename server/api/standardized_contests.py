@@ -12,6 +12,7 @@ from ..database import db_session
 from ..models import *
 from .contests import set_contest_metadata
 from ..worker.tasks import (
+    FILE_PROCESSING_QUEUE,
     UserError,
     background_task,
     create_background_task,
@@ -49,7 +50,7 @@ STANDARDIZED_CONTEST_COLUMNS = [
 STANDARDIZED_CONTESTS_FILE_NAME_PREFIX = "standardized_contests"
 
 
-@background_task
+@background_task(queue=FILE_PROCESSING_QUEUE)
 def process_standardized_contests_file(election_id: str):
     election = Election.query.get(election_id)
     standardized_contests_file = retrieve_file(election.standardized_contests_file)
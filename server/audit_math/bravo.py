@@ -11,6 +11,7 @@ from decimal import Decimal
 from collections import defaultdict
 import logging
 from typing import TypedDict
+import numpy as np
 from scipy import stats
 
 from .sampler_contest import Contest
@@ -250,18 +251,10 @@ def bravo_sample_sizes(
     # Get a guarantee. (Perhaps contrary to intuition, using
     # math.ceil instead of math.floor can lead to a
     # larger sample.)
-    test_stat = Decimal(0)
-    while test_stat.is_nan() or (
-        test_stat < threshold
-        # In extreme cases, the test_stat never reaches the threshold (or at least doesn't do so in
-        # a reasonable amount of time). This second check prevents this loop from hanging in those
-        # cases.
-        and size < total_ballots
-    ):
-        x_c = Decimal(stats.binom.ppf(1.0 - p_completion, size, float(p_w2)))
-        test_stat = x_c * plus + (size - x_c) * minus
-        if test_stat.is_nan() or test_stat < threshold:
-            size += 1
+    if size < total_ballots:
+        size = first_size_reaching_threshold(
+            size, threshold, plus, minus, p_w2, p_completion, total_ballots
+        )
 
     # The preceding fussiness notwithstanding, we use a simple
     # adjustment to account for "other" votes beyond p_w and p_r.
@@ -271,6 +264,73 @@ def bravo_sample_sizes(
     return size_adj
 
 
+# Number of sizes to check at once when searching for the first size that
+# reaches the threshold. Doubles with each block checked, up to the max.
+SIZE_SEARCH_BLOCK_SIZE = 8
+MAX_SIZE_SEARCH_BLOCK_SIZE = 65536
+
+
+def first_size_reaching_threshold(
+    size: int,
+    threshold: Decimal,
+    plus: Decimal,
+    minus: Decimal,
+    p_w2: Decimal,
+    p_completion: float,
+    total_ballots: int,
+) -> int:
+    """
+    Starting from size (which must be less than total_ballots), find the
+    smallest size at which the test statistic at the 1 - p_completion quantile
+    reaches the threshold, or total_ballots if it doesn't reach it before then.
+
+    The test statistic isn't monotone in the size (it drops by |minus|
+    whenever the quantile stays the same), so we can't bisect without
+    possibly skipping the first size that reaches the threshold. Instead, we
+    scan sizes in order, a (growing) block at a time, using a float
+    approximation of the test statistic to skip sizes that are clearly below
+    the threshold. Sizes that are close to or over the threshold are checked
+    with the same Decimal arithmetic as always, so the result is exactly the
+    same as checking each size one by one.
+    """
+    quantile = 1.0 - p_completion
+    threshold_float, plus_float, minus_float = (
+        float(threshold),
+        float(plus),
+        float(minus),
+    )
+    block_size = SIZE_SEARCH_BLOCK_SIZE
+    while True:
+        sizes = np.arange(size, size + block_size)
+        x_cs = stats.binom.ppf(quantile, sizes, float(p_w2))
+        test_stats = x_cs * plus_float + (sizes - x_cs) * minus_float
+        # Allow plenty of room for float rounding error
+        tolerance = 1e-9 * (1 + np.abs(sizes))
+        # Sizes where the quantile is nan are skipped. Otherwise, stop at the
+        # first size that might reach the threshold, or the last one before
+        # total_ballots.
+        (stop_indexes,) = np.nonzero(
+            ~np.isnan(x_cs)
+            & (
+                ~(test_stats < threshold_float - tolerance)
+                | (sizes + 1 >= total_ballots)
+            )
+        )
+        if len(stop_indexes) == 0:
+            size += block_size
+            block_size = min(2 * block_size, MAX_SIZE_SEARCH_BLOCK_SIZE)
+            continue
+
+        size = int(sizes[stop_indexes[0]])
+        x_c = Decimal(x_cs[stop_indexes[0]])
+        test_stat = x_c * plus + (size - x_c) * minus
+        if test_stat >= threshold:
+            return size
+        if size + 1 >= total_ballots:
+            return size + 1
+        size += 1
+
+
 def expected_prob(
     alpha: Decimal, p_w: Decimal, p_r: Decimal, sample_w: int, sample_r: int, asn: int
 ) -> float:
@@ -11,7 +11,9 @@ publication).
 """
 
 from decimal import Decimal, ROUND_CEILING
+from functools import cached_property
 import math
+import numpy as np
 from typing import TypeVar, TypedDict
 from .sampler_contest import Contest
 
@@ -281,6 +283,149 @@ def compute_max_error(
     return error
 
 
+class MaxErrorIndex:
+    """
+    Precomputes the maximum possible error (see compute_max_error) of every
+    batch for a contest, along with U and the unauditable ballots, so they can
+    be shared by the sampler and the risk math without recomputing them for
+    each batch.
+
+    The max errors are computed exactly the same way as compute_max_error, but
+    across all batches at once: each batch's max error is the largest of
+    (v_wp - v_lp + b_cp) / V_wl across candidate pairs, which we find with
+    NumPy by comparing the integer numerators and denominators. Only the
+    distinct max errors (usually few, since many batches have the same
+    tallies) are then converted to Decimals, so that U and the sampling
+    weights are identical to computing them batch by batch.
+
+    batch_keys is the order of the batches in reported_results, which
+    weights is aligned with.
+    """
+
+    def __init__(
+        self, reported_results: dict[BatchKey, BatchResults], contest: Contest
+    ):
+        self.batch_keys = list(reported_results.keys())
+        self.batch_indexes = {
+            batch_key: index for index, batch_key in enumerate(self.batch_keys)
+        }
+        self.unauditable_ballots = compute_unauditable_ballots(
+            reported_results, contest
+        )
+
+        candidates = list(contest.candidates.keys())
+        candidate_indexes = {
+            candidate: index for index, candidate in enumerate(candidates)
+        }
+        has_contest = np.array(
+            [contest.name in results for results in reported_results.values()],
+            dtype=bool,
+        )
+        votes = np.zeros((len(self.batch_keys), len(candidates)), dtype=np.int64)
+        ballots = np.zeros(len(self.batch_keys), dtype=np.int64)
+        for index, results in enumerate(reported_results.values()):
+            if contest.name in results:
+                contest_results = results[contest.name]
+                votes[index] = [
+                    contest_results.get(candidate, 0) for candidate in candidates
+                ]
+                ballots[index] = contest_results["ballots"]
+
+        # For each candidate pair (or threshold), the numerator of the max
+        # error for each batch and the denominator V_wl
+        pairs: list[tuple[np.ndarray, int]] = []
+        for winner in contest.margins["winners"]:
+            for loser in contest.margins["losers"]:
+                V_wl = contest.candidates[winner] - contest.candidates[loser]
+                pairs.append(
+                    (
+                        votes[:, candidate_indexes[winner]]
+                        - votes[:, candidate_indexes[loser]]
+                        + ballots,
+                        V_wl,
+                    )
+                )
+        if contest.is_subject_to_runoff:
+            valid_votes = sum(contest.candidates.values())
+            batch_totals = votes.sum(axis=1)
+            for winner in contest.margins["winners"]:
+                w_total = contest.candidates[winner]
+                w_batch = votes[:, candidate_indexes[winner]]
+                if w_total > valid_votes - w_total:
+                    numerators = w_batch - (batch_totals - w_batch) + ballots
+                    V_wl = 2 * w_total - valid_votes
+                else:
+                    numerators = (batch_totals - w_batch) - w_batch + ballots
+                    V_wl = valid_votes - 2 * w_total
+                pairs.append((numerators, V_wl))
+
+        # Conservatively assume that any pending or unauditable ballots would
+        # be tallied as votes for the loser, reducing the reported margin.
+        pairs = [
+            (numerators, V_wl - contest.pending_ballots - self.unauditable_ballots)
+            for numerators, V_wl in pairs
+        ]
+
+        # Find the largest numerator / V_wl for each batch, starting from 0/1
+        max_numerators = np.zeros(len(self.batch_keys), dtype=np.int64)
+        max_denominators = np.ones(len(self.batch_keys), dtype=np.int64)
+        for numerators, V_wl in pairs:
+            if V_wl <= 0:
+                continue
+            is_larger = numerators * max_denominators > max_numerators * V_wl
+            max_numerators[is_larger] = numerators[is_larger]
+            max_denominators[is_larger] = V_wl
+        max_numerators[~has_contest] = 0
+        max_denominators[~has_contest] = 1
+
+        # Any pair with no margin means every batch with the contest could be
+        # infinitely wrong. We mark those batches with a denominator of 0.
+        if any(V_wl <= 0 for _, V_wl in pairs):
+            max_numerators[has_contest] = 1
+            max_denominators[has_contest] = 0
+
+        unique_fractions, self.max_error_codes = np.unique(
+            np.stack([max_numerators, max_denominators], axis=1),
+            axis=0,
+            return_inverse=True,
+        )
+        self.max_error_codes = self.max_error_codes.reshape(-1)
+        self.unique_max_errors: list[Decimal] = [
+            (
+                Decimal("inf")
+                if denominator == 0
+                else (
+                    Decimal(int(numerator)) / Decimal(int(denominator))
+                    if numerator > 0
+                    else Decimal(0.0)
+                )
+            )
+            for numerator, denominator in unique_fractions
+        ]
+
+        # Sum in batch order, so the rounding matches summing batch by batch
+        self.U = Decimal(0.0)
+        for code in self.max_error_codes.tolist():
+            self.U += self.unique_max_errors[code]
+
+    def max_error(self, batch_key: BatchKey) -> Decimal:
+        return self.unique_max_errors[
+            self.max_error_codes[self.batch_indexes[batch_key]]
+        ]
+
+    @cached_property
+    def weights(self) -> np.ndarray:
+        """
+        Each batch's probability of being sampled (its max error / U), aligned
+        with batch_keys.
+        """
+        unique_weights = np.array(
+            [float(max_error / self.U) for max_error in self.unique_max_errors],
+            dtype=np.float64,
+        )
+        return unique_weights[self.max_error_codes]
+
+
 def compute_U(
     reported_results: dict[BatchKey, BatchResults],
     contest: Contest,
@@ -307,12 +452,7 @@ def compute_U(
     Outputs:
         U - the sum of the maximum possible overstatement for each batch
     """
-    unauditable_ballots = compute_unauditable_ballots(reported_results, contest)
-    U = Decimal(0.0)
-    for batch in reported_results:
-        U += compute_max_error(reported_results[batch], contest, unauditable_ballots)
-
-    return U
+    return MaxErrorIndex(reported_results, contest).U
 
 
 def get_sample_sizes(
@@ -322,6 +462,7 @@ def get_sample_sizes(
     sample_results: dict[BatchKey, BatchResults],
     ticket_numbers: dict[str, BatchKey],
     combined_batches: list[set[BatchKey]],
+    max_error_index: MaxErrorIndex | None = None,
 ) -> int:
     """
     Computes a sample size expected to confirm the election result
@@ -351,6 +492,8 @@ def get_sample_sizes(
         combined_batches - a list of combined batches, where each combined batch
                            is a set of the sub-batch keys (may include
                            non-sampled batches)
+        max_error_index  - optionally, a MaxErrorIndex already built for
+                           reported_results and contest
 
     Outputs:
         sample_size - sample size (currently a single integer value)
@@ -361,7 +504,9 @@ def get_sample_sizes(
     if len(reported_results) == len(sample_results):
         raise ValueError("All ballots have already been counted!")
 
-    U = compute_U(reported_results, contest)
+    if max_error_index is None:
+        max_error_index = MaxErrorIndex(reported_results, contest)
+    U = max_error_index.U
     if U.is_infinite():
         return len(reported_results)  # tied: full hand count
     p_mult = 1 - 1 / U
@@ -373,6 +518,7 @@ def get_sample_sizes(
         sample_results,
         ticket_numbers,
         combined_batches,
+        max_error_index,
     )
     if risk_attained is True:
         return 0
@@ -400,6 +546,7 @@ def compute_risk(
     sample_results: dict[BatchKey, BatchResults],
     sample_ticket_numbers: dict[str, BatchKey],
     combined_batches: list[set[BatchKey]],
+    max_error_index: MaxErrorIndex | None = None,
 ) -> tuple[float, bool]:
     """
     Computes the risk-value of <sample_results> based on results in <contest>.
@@ -428,6 +575,8 @@ def compute_risk(
         combined_batches - a list of combined batches, where each combined batch
                            is a set of the sub-batch keys (may include
                            non-sampled batches)
+        max_error_index  - optionally, a MaxErrorIndex already built for
+                           reported_results and contest
     Outputs:
         measurements    - the p-value of the hypotheses that the election
                           result is correct based on the sample for each
@@ -443,9 +592,10 @@ def compute_risk(
 
     p = Decimal(1.0)
 
-    U = compute_U(reported_results, contest)
-
-    unauditable_ballots = compute_unauditable_ballots(reported_results, contest)
+    if max_error_index is None:
+        max_error_index = MaxErrorIndex(reported_results, contest)
+    U = max_error_index.U
+    unauditable_ballots = max_error_index.unauditable_ballots
 
     for _, batch in sorted(
         sample_ticket_numbers.items(),
@@ -489,7 +639,7 @@ def compute_risk(
             error["weighted_error"] if error and error["counted_as"] > 0 else Decimal(0)
         )
 
-        u_p = compute_max_error(reported_results[batch], contest, unauditable_ballots)
+        u_p = max_error_index.max_error(batch)
 
         # If this happens, we need a full hand recount
         if e_p == Decimal("inf") or u_p == Decimal("inf"):
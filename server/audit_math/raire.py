@@ -6,6 +6,7 @@ from .sampler_contest import Contest
 from .raire_utils import (
     NEBAssertion,
     RaireAssertion,
+    RaireBallots,
     RaireFrontier,
     RaireNode,
     find_best_audit,
@@ -17,13 +18,13 @@ from .raire_utils import (
 NEBMatrix = dict[str, dict[str, NEBAssertion | None]]
 
 
-def make_neb_matrix(contest: Contest, cvrs: CVRS, asn_func) -> NEBMatrix:
+def make_neb_matrix(contest: Contest, ballots: RaireBallots, asn_func) -> NEBMatrix:
     """
     Builds the NEB matrix for use by find_best_audit.
 
     Input:
         contest     - the contest being audited
-        cvrs        - a list of CVRS to be audited
+        ballots     - the encoded ballots to be audited
         asn_func    - the asn function to find assertion difficulty
     Output:
         neb_matrix  - a dict of dicts mapping candidate pairs to assertions
@@ -39,12 +40,7 @@ def make_neb_matrix(contest: Contest, cvrs: CVRS, asn_func) -> NEBMatrix:
 
             asrn: NEBAssertion = NEBAssertion(contest.name, cand, other)
 
-            tally_cand: int = 0
-            tally_other: int = 0
-            for _, cvr in cvrs.items():
-                assert cvr is not None  # for type checker
-                tally_cand += asrn.is_vote_for_winner(cvr)
-                tally_other += asrn.is_vote_for_loser(cvr)
+            tally_cand, tally_other = ballots.neb_tallies(cand, other)
 
             if tally_cand > tally_other and other not in contest.winners:
                 margin = tally_cand - tally_other
@@ -57,7 +53,7 @@ def make_neb_matrix(contest: Contest, cvrs: CVRS, asn_func) -> NEBMatrix:
 
 def make_frontier(
     contest: Contest,
-    ballots: list[dict[str, int]],
+    ballots: RaireBallots,
     nebs: NEBMatrix,
     asn_func,
 ) -> RaireFrontier:
@@ -89,7 +85,7 @@ def make_frontier(
 
 def find_assertions(
     contest: Contest,
-    ballots: list[dict[str, int]],
+    ballots: RaireBallots,
     nebs: NEBMatrix,
     asn_func: Callable,
     frontier: RaireFrontier,
@@ -103,20 +99,20 @@ def find_assertions(
     audit_possible = True
     while audit_possible:
         # Check whether we can stop searching for assertions.
-        max_on_frontier = max(node.estimate for node in frontier.nodes)
+        max_on_frontier = frontier.max_estimate()
 
         if agap > 0 and lowerbound > 0 and max_on_frontier - lowerbound <= agap:
             # We can rule out all branches of the tree with assertions that
             # have a difficulty that is <= lowerbound.
             return True
 
-        to_expand = frontier.nodes[0]
+        to_expand = frontier.first_node()
 
         # We can also stop searching if all nodes on our frontier are leaves.
         if not to_expand.expandable:
             return True
 
-        frontier.nodes.pop(0)
+        frontier.pop_first_node()
 
         if to_expand.best_ancestor and to_expand.best_ancestor.estimate <= lowerbound:
             frontier.replace_descendents(to_expand.best_ancestor)
@@ -237,11 +233,15 @@ def compute_raire_assertions(
         assertions is found to hold, then all alternate outcomes, in which
         an alternate candidate to 'winner' wins, can be ruled out.
     """
+    # Encode the ballots once up front, grouping identical rankings, so
+    # that we can quickly compute tallies throughout the search.
+    ballots = RaireBallots.from_cvrs(contest, cvrs)
+
     # First look at all of the NEB assertions that could be formed for
     # this contest. We will refer to this matrix when examining the best
     # way to prune branches of the "alternate outcome space".
     nebs: dict[str, dict[str, NEBAssertion | None]] = make_neb_matrix(
-        contest, cvrs, asn_func
+        contest, ballots, asn_func
     )
 
     # The RAIRE algorithm progressively searches through the space of
@@ -253,9 +253,6 @@ def compute_raire_assertions(
     # already been eliminated.
 
     # Construct initial frontier.
-    ballots = [
-        blt[contest.name] for _, blt in cvrs.items() if blt and contest.name in blt
-    ]
     frontier = make_frontier(contest, ballots, nebs, asn_func)
 
     # This is a running lowerbound on the overall difficulty of the
@@ -1,4 +1,6 @@
 from __future__ import annotations
+from collections import Counter
+import heapq
 from typing import Type, Callable, Any, Literal, TypedDict
 import numpy as np
 
@@ -78,6 +80,97 @@ def vote_for_cand(
     return 1
 
 
+class RaireBallots:
+    """
+    The ballots for a contest, encoded once so that tallies can be computed
+    with array operations rather than by looping over every ballot.
+
+    Each row of 'ranks' is a distinct ranking, with one column per candidate
+    (0 meaning the candidate isn't ranked), and 'weights' holds the number of
+    ballots with that ranking. Any names ranked on ballots that aren't
+    candidates in the contest get their own columns, since they can still
+    block a vote for a candidate ranked below them.
+    """
+
+    def __init__(self, contest: Contest, ballots: list[dict[str, int]]):
+        rankings = Counter(tuple(sorted(ballot.items())) for ballot in ballots)
+
+        self.columns: dict[str, int] = {}
+        for cand in contest.candidates:
+            self.columns[cand] = len(self.columns)
+        for ranking in rankings:
+            for cand, _ in ranking:
+                if cand not in self.columns:
+                    self.columns[cand] = len(self.columns)
+
+        self.ranks = np.zeros((len(rankings), len(self.columns)), dtype=np.int64)
+        for row, ranking in enumerate(rankings):
+            for cand, rank in ranking:
+                self.ranks[row, self.columns[cand]] = rank
+        self.weights = np.array(list(rankings.values()), dtype=np.int64)
+
+        # Tallies computed so far, keyed by the bitmask of eliminated columns
+        self.tallies_memo: dict[int, dict[str, int]] = {}
+
+    @staticmethod
+    def from_cvrs(contest: Contest, cvrs: CVRS) -> RaireBallots:
+        return RaireBallots(
+            contest,
+            [cvr[contest.name] for cvr in cvrs.values() if cvr and contest.name in cvr],
+        )
+
+    def tallies(self, eliminated: set[str]) -> dict[str, int]:
+        """
+        Input:
+            eliminated : set  -   identifiers of eliminated candidates
+
+        Output:
+            Returns a mapping from each candidate to the number of ballots that
+            are a vote for that candidate (see vote_for_cand) in the context
+            where candidates in 'eliminated' have been eliminated.
+        """
+        mask = 0
+        for cand in eliminated:
+            if cand in self.columns:
+                mask |= 1 << self.columns[cand]
+
+        if mask not in self.tallies_memo:
+            is_eliminated = np.array(
+                [bool(mask & (1 << column)) for column in range(len(self.columns))]
+            )
+            # A ballot is a vote for each remaining candidate ranked highest
+            # (i.e. with the lowest rank) among the remaining candidates
+            unranked = np.iinfo(np.int64).max
+            remaining_ranks = np.where(
+                (self.ranks != 0) & ~is_eliminated, self.ranks, unranked
+            )
+            top_rank = remaining_ranks.min(axis=1, keepdims=True)
+            votes = (remaining_ranks == top_rank) & (top_rank != unranked)
+            column_tallies = self.weights @ votes
+            self.tallies_memo[mask] = {
+                cand: int(column_tallies[column])
+                for cand, column in self.columns.items()
+            }
+
+        return self.tallies_memo[mask]
+
+    def neb_tallies(self, winner: str, loser: str) -> tuple[int, int]:
+        """
+        Returns the tallies of 'winner' and 'loser' for an NEB assertion (see
+        NEBAssertion.is_vote_for_winner and NEBAssertion.is_vote_for_loser).
+        """
+        winner_ranks = self.ranks[:, self.columns[winner]]
+        loser_ranks = self.ranks[:, self.columns[loser]]
+        votes_for_winner = winner_ranks == 1
+        votes_for_loser = (loser_ranks != 0) & (
+            (winner_ranks == 0) | (loser_ranks < winner_ranks)
+        )
+        return (
+            int(self.weights @ votes_for_winner),
+            int(self.weights @ votes_for_loser),
+        )
+
+
 class RaireAssertion:
     def __init__(self, contest: str, winner: str, loser: str):
         """
@@ -357,9 +450,136 @@ class RaireNode:
         return f"tail: {self.tail}\nestimate: {self.estimate}\nbest_assertion: {self.best_assertion}\nbest_ancestor:\n\n{self.best_ancestor}"
 
 
+class TailTrie:
+    """
+    Index of the frontier's nodes by tail. Tails are stored in reverse, so the
+    descendents of a node (the nodes whose tails end with its tail) are all in
+    one subtree.
+    """
+
+    def __init__(self):
+        self.children: dict[str, TailTrie] = {}
+        self.entry_ids: set[int] = set()
+
+    def find(self, tail: list[str], create: bool = False) -> TailTrie | None:
+        trie = self
+        for cand in reversed(tail):
+            if cand not in trie.children:
+                if not create:
+                    return None
+                trie.children[cand] = TailTrie()
+            trie = trie.children[cand]
+        return trie
+
+    def add(self, tail: list[str], entry_id: int):
+        trie = self.find(tail, create=True)
+        assert trie is not None  # for the type checker
+        trie.entry_ids.add(entry_id)
+
+    def remove(self, tail: list[str], entry_id: int):
+        trie = self.find(tail)
+        assert trie is not None  # for the type checker
+        trie.entry_ids.remove(entry_id)
+
+    def pop_descendents(self, tail: list[str]) -> list[int]:
+        """
+        Removes and returns the entries for all nodes with tails that are
+        longer than and end with the given tail.
+        """
+        trie = self.find(tail)
+        if trie is None:
+            return []
+        entry_ids = []
+        subtries = list(trie.children.values())
+        trie.children = {}
+        while subtries:
+            subtrie = subtries.pop()
+            entry_ids.extend(subtrie.entry_ids)
+            subtries.extend(subtrie.children.values())
+        return entry_ids
+
+
 class RaireFrontier:
+    """
+    The frontier of nodes in the search for the best audit, ordered as
+    described in insert_node.
+
+    The nodes are kept in a heap, and nodes that have been removed are
+    skipped when they reach the top. Each node is assigned a sort key when it
+    is inserted, which places it relative to the nodes already in the
+    frontier:
+        - A leaf gets the next "leaf position", since it goes at the end.
+        - A node with an infinite estimate goes before everything else.
+        - Any other node goes before the first node (in frontier order) with
+          an estimate less than or equal to its own. Since these nodes are
+          ordered by estimate, it's sorted among them by estimate, and it goes
+          after the leaves before that node, which we find using a segment
+          tree of the minimum estimate at each leaf position.
+    Nodes are also indexed by tail (see TailTrie) so that we can quickly find
+    the descendents of a node.
+    """
+
     def __init__(self):
-        self.nodes = []
+        self.num_entries = 0
+        self.entry_nodes: dict[int, RaireNode] = {}
+        self.entry_keys: dict[int, tuple] = {}
+        self.entry_leaf_positions: dict[int, int] = {}
+        self.heap: list[tuple[tuple, int]] = []
+        self.estimates_heap: list[tuple[float, int]] = []
+        self.tails = TailTrie()
+
+        # Each leaf position holds a leaf and the nodes just before it
+        self.num_leaves = 0
+        self.leaf_position_estimates: list[list[tuple[float, int]]] = [[]]
+        self.min_estimate_tree = [np.inf, np.inf]
+
+    @property
+    def nodes(self) -> list[RaireNode]:
+        return [
+            self.entry_nodes[entry_id]
+            for _, entry_id in sorted(
+                (key, entry_id) for entry_id, key in self.entry_keys.items()
+            )
+        ]
+
+    def first_leaf_position_at_most(self, estimate: float) -> int:
+        """
+        Returns the first leaf position with a node with an estimate less
+        than or equal to the given estimate (or the position of the next
+        leaf if there is none).
+        """
+        tree = self.min_estimate_tree
+        if tree[1] > estimate:
+            return self.num_leaves
+        i = 1
+        while i < len(tree) // 2:
+            i = 2 * i if tree[2 * i] <= estimate else 2 * i + 1
+        return i - len(tree) // 2
+
+    def update_leaf_position(self, position: int):
+        estimates = self.leaf_position_estimates[position]
+        while estimates and estimates[0][1] not in self.entry_nodes:
+            heapq.heappop(estimates)
+
+        tree = self.min_estimate_tree
+        i = position + len(tree) // 2
+        tree[i] = estimates[0][0] if estimates else np.inf
+        while i > 1:
+            i //= 2
+            tree[i] = min(tree[2 * i], tree[2 * i + 1])
+
+    def add_leaf_position(self):
+        self.num_leaves += 1
+        self.leaf_position_estimates.append([])
+
+        size = len(self.min_estimate_tree) // 2
+        if self.num_leaves == size:
+            # Double the size of the segment tree
+            tree = [np.inf] * (4 * size)
+            tree[2 * size : 3 * size] = self.min_estimate_tree[size:]
+            for i in range(2 * size - 1, 0, -1):
+                tree[i] = min(tree[2 * i], tree[2 * i + 1])
+            self.min_estimate_tree = tree
 
     def insert_node(self, node: RaireNode):
         """
@@ -374,35 +594,66 @@ class RaireFrontier:
             node: RaireNode   - node, representing an alternate election
                                 outcome, to add to the frontier.
         """
+        entry_id = self.num_entries
+        self.num_entries += 1
+
+        position: int | None
         if not node.expandable:
-            self.nodes.append(node)
+            position = self.num_leaves
+            key: tuple = (position, 1)
+            self.add_leaf_position()
 
         elif node.estimate == np.inf:
-            self.nodes.insert(0, node)
+            position = None
+            key = (-1, 0, -node.estimate, -entry_id)
 
         else:
-            i = 0
-            while i < len(self.nodes):
-                n_est = self.nodes[i].estimate
-
-                if n_est <= node.estimate:
-                    break
-
-                i += 1
-
-            self.nodes.insert(i, node)
+            position = self.first_leaf_position_at_most(node.estimate)
+            key = (position, 0, -node.estimate, -entry_id)
+
+        self.entry_nodes[entry_id] = node
+        self.entry_keys[entry_id] = key
+        heapq.heappush(self.heap, (key, entry_id))
+        heapq.heappush(self.estimates_heap, (-node.estimate, entry_id))
+        self.tails.add(node.tail, entry_id)
+        if position is not None:
+            self.entry_leaf_positions[entry_id] = position
+            heapq.heappush(
+                self.leaf_position_estimates[position], (node.estimate, entry_id)
+            )
+            self.update_leaf_position(position)
+
+    def remove_entry(self, entry_id: int):
+        del self.entry_nodes[entry_id]
+        del self.entry_keys[entry_id]
+        position = self.entry_leaf_positions.pop(entry_id, None)
+        if position is not None:
+            self.update_leaf_position(position)
+
+    def first_node(self) -> RaireNode:
+        while self.heap[0][1] not in self.entry_nodes:
+            heapq.heappop(self.heap)
+        return self.entry_nodes[self.heap[0][1]]
+
+    def pop_first_node(self) -> RaireNode:
+        node = self.first_node()
+        _, entry_id = heapq.heappop(self.heap)
+        self.tails.remove(node.tail, entry_id)
+        self.remove_entry(entry_id)
+        return node
+
+    def max_estimate(self) -> float:
+        while self.estimates_heap[0][1] not in self.entry_nodes:
+            heapq.heappop(self.estimates_heap)
+        return -self.estimates_heap[0][0]
 
     def replace_descendents(self, node: RaireNode):
         """
         Remove all descendents of the input 'node' from the frontier, and
         insert 'node' to the frontier in the appropriate position.
         """
-
-        self.nodes = [
-            other_node
-            for other_node in self.nodes
-            if not other_node.is_descendent_of(node)
-        ]
+        for entry_id in self.tails.pop_descendents(node.tail):
+            self.remove_entry(entry_id)
         self.insert_node(node)
 
     def __eq__(self, other):
@@ -414,7 +665,7 @@ class RaireFrontier:
 
 def find_best_audit(
     contest: Contest,
-    ballots: list[dict[str, int]],
+    ballots: RaireBallots,
     neb_matrix,
     node: RaireNode,
     asn_func: Callable,
@@ -424,7 +675,7 @@ def find_best_audit(
 
     contest: Contest   -  Contest being audited.
 
-    cvrs: list of CVRs -  Details of reported ballots for this contest.
+    ballots: RaireBallots - Details of reported ballots for this contest.
 
     neb_matrix         -  |Candidates| x |Candidates| dictionary where
                           neb_matrix[c1][c2] returns a NEBAssertion stating
@@ -478,14 +729,11 @@ def find_best_audit(
     # remain, 'first_in_tail' is not the candidate with the least number
     # of votes. This means that 'first_in_tail' should not be eliminated next.
     # Tally of the candidate 'first_in_tail'
-    tally_first_in_tail = sum(
-        vote_for_cand(first_in_tail, eliminated, blt) for blt in ballots
-    )
+    tallies = ballots.tallies(eliminated)
+    tally_first_in_tail = tallies[first_in_tail]
 
     for later_cand in node.tail[1:]:
-        tally_later_cand = sum(
-            vote_for_cand(later_cand, eliminated, blt) for blt in ballots
-        )
+        tally_later_cand = tallies[later_cand]
 
         margin = tally_first_in_tail - tally_later_cand
 
@@ -513,7 +761,7 @@ def find_best_audit(
 def perform_dive(
     node: RaireNode,
     contest: Contest,
-    ballots: list[dict[str, int]],
+    ballots: RaireBallots,
     neb_matrix,
     asn_func: Callable,
 ):
@@ -524,7 +772,7 @@ def perform_dive(
 
     contest: Contest   -  Contest being audited.
 
-    cvrs: list of CVR  -  Details of reported ballots for this contest.
+    ballots: RaireBallots - Details of reported ballots for this contest.
 
     neb_matrix         -  |Candidates| x |Candidates| dictionary where
                           neb_matrix[c1][c2] returns a NEBAssertion stating
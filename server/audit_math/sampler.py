@@ -1,5 +1,8 @@
 # Handles generating sample sizes and taking samples
-from typing import cast, Any
+import hashlib
+import heapq
+import itertools
+from typing import cast, Any, Iterator, Sequence, TypedDict
 from numpy.random import default_rng
 import consistent_sampler
 
@@ -10,13 +13,211 @@ from .sampler_contest import Contest
 BatchKey = tuple[str, str]  # (jurisdiction name, batch name)
 
 
+def first_tickets(
+    seed_hash: str, batch: Any, ballot_positions: Sequence[int]
+) -> Iterator[tuple[str, tuple[Any, int]]]:
+    """
+    Computes the first (generation 1) ticket number that consistent_sampler
+    would assign to each ballot in a batch, i.e.
+    consistent_sampler.first_fraction((batch, ballot_position), seed).
+
+    Since every ballot id in the batch hashes the same prefix (the seed hash
+    plus the batch), we hash the prefix once and copy the hash state for each
+    ballot.
+    """
+    # str() of an id tuple uses the repr of its elements
+    prefix_hash = hashlib.sha256(f"{seed_hash}({batch!r}, ".encode("utf-8"))
+    for ballot_position in ballot_positions:
+        ballot_hash = prefix_hash.copy()
+        ballot_hash.update(f"{ballot_position!r})".encode("utf-8"))
+        # Matches consistent_sampler.sha256_uniform
+        ticket_number = (
+            "0." + f"{int.from_bytes(ballot_hash.digest(), 'big'):064d}"[::-1]
+        )
+        yield (ticket_number, (batch, ballot_position))
+
+
+SampleTicket = tuple[str, tuple[Any, int], int]  # (ticket number, id, generation)
+
+
+class SampleFrontier(TypedDict):
+    """
+    The state of the consistent sampler after drawing num_drawn tickets, so
+    that later draws can pick up where it left off.
+
+    Only a pool of the ballots with the smallest first tickets is tracked.
+    tickets is a heap of the current (untrimmed) ticket for each ballot in the
+    pool. max_first_ticket is the largest (ticket number, id) of the first
+    tickets in the pool - every ballot outside the pool has a larger first
+    ticket. It's None if the pool contains every ballot in the manifest.
+    """
+
+    num_drawn: int
+    tickets: list[SampleTicket]
+    max_first_ticket: tuple[str, tuple[Any, int]] | None
+
+
+# When building a frontier to save for later rounds, include this many times
+# as many ballots in the pool as we need to draw, so that we can likely draw
+# later rounds' samples from the pool as well.
+FRONTIER_POOL_SIZE_FACTOR = 2
+
+
+def build_frontier(
+    seed: str, manifest: dict[Any, Sequence[int]], pool_size: int
+) -> SampleFrontier:
+    # consistent_sampler draws tickets in increasing order, so the first k
+    # draws can only come from the ballots with the k smallest first tickets
+    # (any other ballot has at least k tickets drawn before its first
+    # ticket). So rather than passing every ballot in the manifest to
+    # consistent_sampler, we stream through the ballots' first tickets,
+    # keeping only the smallest ones.
+    pool_size = max(pool_size, 1)
+    seed_hash = consistent_sampler.sha256_hex(seed)  # type: ignore
+    pool = heapq.nsmallest(
+        pool_size,
+        itertools.chain.from_iterable(
+            first_tickets(seed_hash, batch, ballot_positions)
+            for batch, ballot_positions in manifest.items()
+        ),
+    )
+    return SampleFrontier(
+        num_drawn=0,
+        # Sorted, so already a heap
+        tickets=[(ticket_number, ballot, 1) for ticket_number, ballot in pool],
+        max_first_ticket=pool[-1] if len(pool) == pool_size else None,
+    )
+
+
+def draw_from_frontier(
+    frontier: SampleFrontier, num_tickets: int, with_replacement: bool
+) -> tuple[list[SampleTicket], SampleFrontier] | None:
+    """
+    Draws the next num_tickets tickets from the frontier, the same way
+    consistent_sampler.sampler would. Returns the drawn tickets (trimmed) and
+    the frontier after drawing them, or None if drawing would need a ballot
+    outside of the frontier's pool.
+    """
+    tickets = list(frontier["tickets"])
+    heapq.heapify(tickets)
+    max_first_ticket = frontier["max_first_ticket"]
+    drawn: list[SampleTicket] = []
+    while len(drawn) < num_tickets:
+        if not tickets:
+            # When sampling without replacement, we may run out of ballots
+            if max_first_ticket is None:
+                break
+            return None
+        ticket_number, ballot, generation = tickets[0]
+        if max_first_ticket is not None and (ticket_number, ballot) > max_first_ticket:
+            return None
+        heapq.heappop(tickets)
+        if with_replacement:
+            heapq.heappush(
+                tickets,
+                (
+                    consistent_sampler.next_fraction(ticket_number),  # type: ignore
+                    ballot,
+                    generation + 1,
+                ),
+            )
+        drawn.append(
+            (
+                consistent_sampler.trim(ticket_number, 18),  # type: ignore
+                ballot,
+                generation,
+            )
+        )
+    return (
+        drawn,
+        SampleFrontier(
+            num_drawn=frontier["num_drawn"] + len(drawn),
+            tickets=tickets,
+            max_first_ticket=max_first_ticket,
+        ),
+    )
+
+
+def draw_sample_from_frontier(
+    seed: str,
+    manifest: dict[Any, Sequence[int]],
+    sample_size: int,
+    num_sampled: int = 0,
+    with_replacement: bool = True,
+    frontier: SampleFrontier | None = None,
+) -> tuple[list[SampleTicket], SampleFrontier]:
+    """
+    Like draw_sample, but resumes from a frontier saved after previously drawing
+    num_sampled tickets (if given, and if it can draw the whole sample), rather
+    than drawing all num_sampled + sample_size tickets from scratch. The
+    frontier must have been built from the same seed and manifest. Returns the
+    sample and a frontier that can be used to draw the next sample.
+    """
+    if frontier is not None and frontier["num_drawn"] == num_sampled:
+        resumed = draw_from_frontier(frontier, sample_size, with_replacement)
+        if resumed is not None:
+            return resumed
+
+    num_tickets = sample_size + num_sampled
+    new_frontier = build_frontier(
+        seed, manifest, FRONTIER_POOL_SIZE_FACTOR * num_tickets
+    )
+    _, new_frontier = cast(
+        tuple[list[SampleTicket], SampleFrontier],
+        draw_from_frontier(new_frontier, num_sampled, with_replacement),
+    )
+    return cast(
+        tuple[list[SampleTicket], SampleFrontier],
+        draw_from_frontier(new_frontier, sample_size, with_replacement),
+    )
+
+
+def load_frontier(frontier_json: dict) -> SampleFrontier:
+    """
+    Converts a frontier that was stored as JSON back into a SampleFrontier.
+    JSON turns tuples into lists, so we turn them back (which means ballot ids
+    must be made of tuples, strings, numbers, and None).
+    """
+
+    def to_tuple(value):
+        return tuple(map(to_tuple, value)) if isinstance(value, list) else value
+
+    max_first_ticket = frontier_json["max_first_ticket"]
+    return SampleFrontier(
+        num_drawn=frontier_json["num_drawn"],
+        tickets=[to_tuple(ticket) for ticket in frontier_json["tickets"]],
+        max_first_ticket=max_first_ticket and to_tuple(max_first_ticket),
+    )
+
+
+def manifest_fingerprint(
+    seed: str, manifest: dict[Any, Sequence[int]], with_replacement: bool
+) -> str:
+    """
+    Hashes the inputs to the sampler that determine its frontier, so we can
+    tell whether a saved frontier is still valid.
+    """
+    fingerprint = hashlib.sha256(repr((seed, with_replacement)).encode("utf-8"))
+    for batch_repr, ballot_positions in sorted(
+        (
+            (repr(batch), ballot_positions)
+            for batch, ballot_positions in manifest.items()
+        ),
+        key=lambda item: item[0],
+    ):
+        fingerprint.update(
+            f"{batch_repr}: {list(ballot_positions)!r}\n".encode("utf-8")
+        )
+    return fingerprint.hexdigest()
+
+
 def draw_sample(
     seed: str,
-    manifest: dict[Any, list[int]],
+    manifest: dict[Any, Sequence[int]],
     sample_size: int,
     num_sampled: int = 0,
     with_replacement: bool = True,
-) -> list[tuple[str, tuple[Any, int], int]]:
+) -> list[SampleTicket]:
     """
     Draws uniform random sample with replacement of size <sample_size> from the
     provided ballot manifest.
@@ -25,8 +226,8 @@ def draw_sample(
         seed - random seed
         manifest - mapping of batches to the ballots they contain:
                     {
-                        batch1: num_balots,
-                        batch2: num_ballots,
+                        batch1: [ballot_position, ...],
+                        batch2: [ballot_position, ...],
                         ...
                     }
         sample_size - number of tickets to randomly draw
@@ -43,30 +244,12 @@ def draw_sample(
                     ...
                 ]
     """
-
-    # First build a list of ballots
-    ballots: list[tuple[Any, int]] = [
-        (batch, ballot_position)
-        for batch, ballot_positions in manifest.items()
-        for ballot_position in ballot_positions
-    ]
-
-    return cast(
-        # The signature of `consistent_sampler.sampler` can't be represented by
-        # mypy yet, so it is typed as a less specific version of what it really
-        # is. This casts it back to the more specific version.
-        list[tuple[str, tuple[Any, int], int]],
-        list(
-            consistent_sampler.sampler(
-                ballots,
-                seed=seed,
-                take=sample_size + num_sampled,
-                with_replacement=with_replacement,
-                output="tuple",
-                digits=18,
-            )
-        )[num_sampled:],
+    frontier = build_frontier(seed, manifest, sample_size + num_sampled)
+    sample, _ = cast(
+        tuple[list[SampleTicket], SampleFrontier],
+        draw_from_frontier(frontier, sample_size + num_sampled, with_replacement),
     )
+    return sample[num_sampled:]
 
 
 def draw_ppeb_sample(
@@ -75,6 +258,8 @@ def draw_ppeb_sample(
     sample_size: int,
     previously_sampled_batch_keys: list[BatchKey],
     batch_results: dict[BatchKey, dict[str, dict[str, int]]],
+    max_error_index: macro.MaxErrorIndex | None = None,
+    last_tickets: dict[BatchKey, str] | None = None,
 ) -> list[tuple[Any, BatchKey]]:
     """
     Draws sample with replacement of size <sample_size> from the
@@ -98,6 +283,11 @@ def draw_ppeb_sample(
                             }
                             ...
                         }
+        max_error_index - optionally, a macro.MaxErrorIndex already built for
+                          batch_results and contest
+        last_tickets - optionally, the last ticket number drawn for each
+                       previously sampled batch. If provided, tickets are only
+                       generated for the new sample.
 
     Outputs:
         sample - list of 'tickets', consisting of:
@@ -116,22 +306,13 @@ def draw_ppeb_sample(
     int_seed = int(consistent_sampler.sha256_hex(seed), 16)  # type: ignore
     generator = default_rng(int_seed)
 
-    U = macro.compute_U(batch_results, contest)
+    if max_error_index is None:
+        max_error_index = macro.MaxErrorIndex(batch_results, contest)
 
     # Should only be possible if the specified contest isn't in any batches
-    if U == 0:
+    if max_error_index.U == 0:
         return []
 
-    # Map each batch to its weighted probability of being picked
-    unauditable_ballots = macro.compute_unauditable_ballots(batch_results, contest)
-    weighted_errors = [
-        float(
-            macro.compute_max_error(batch_results[batch], contest, unauditable_ballots)
-            / U
-        )
-        for batch in batch_results
-    ]
-
     num_previously_sampled_batches = len(previously_sampled_batch_keys)
     cumulative_sample_size = num_previously_sampled_batches + sample_size
     is_full_hand_tally_needed = cumulative_sample_size >= len(batch_results)
@@ -144,55 +325,73 @@ def draw_ppeb_sample(
             + sorted(list(batch_results.keys() - previously_sampled_batch_keys))
         )
         if is_full_hand_tally_needed
-        # Otherwise, sample as usual
-        else cast(
-            list[BatchKey],
-            (
-                # For some reason, NumPy converts the tuple to a list in sampling, so we convert
-                # back to a tuple
-                tuple(sampled_batch_key)
-                for sampled_batch_key in generator.choice(
-                    list(batch_results.keys()),
-                    num_previously_sampled_batches + sample_size,
-                    p=weighted_errors,
-                    replace=True,
-                )
-            ),
-        )
+        # Otherwise, sample as usual. We sample batch indexes rather than the
+        # batch keys themselves, which draws the same batches without NumPy
+        # having to convert the keys into an array.
+        else [
+            max_error_index.batch_keys[index]
+            for index in generator.choice(
+                len(max_error_index.batch_keys),
+                num_previously_sampled_batches + sample_size,
+                p=max_error_index.weights,
+                replace=True,
+            ).tolist()
+        ]
     )
 
-    # Now create "ticket numbers" for each item in the sample
+    # Now create "ticket numbers" for each item in the sample. If we know the
+    # last ticket of each previously sampled batch, we only need to extend
+    # those ticket chains for the new sample. Otherwise, we regenerate the
+    # tickets for the previous samples as well, starting each chain over.
+    if last_tickets is not None:
+        return ppeb_tickets(
+            seed,
+            sampled_batch_keys_including_previously_sampled[
+                num_previously_sampled_batches:
+            ],
+            last_tickets,
+        )
 
-    # Map seen batches to counts
-    counts: dict[Any, int] = {}
-    tickets: dict[Any, list[str]] = {}
+    return ppeb_tickets(seed, sampled_batch_keys_including_previously_sampled, {})[
+        num_previously_sampled_batches:
+    ]
 
-    sampled_batch_keys_including_previously_sampled_with_ticket_numbers: list[
-        tuple[Any, BatchKey]
-    ] = []
 
-    for batch_key in sampled_batch_keys_including_previously_sampled:
-        count = counts.get(batch_key, 0) + 1
+def ppeb_tickets(
+    seed: str,
+    batch_keys: list[BatchKey],
+    last_tickets: dict[BatchKey, str],
+) -> list[tuple[str, BatchKey]]:
+    """
+    Assigns a ticket number to each draw in a PPEB sample. The first time a
+    batch is drawn, its ticket is its first fraction. Each subsequent draw of
+    the batch gets the next fraction after its previous ticket.
 
+    Inputs:
+        seed - the random seed used in sampling
+        batch_keys - the batches drawn, in order
+        last_tickets - the last ticket already assigned to each batch (e.g. in
+            previous rounds), from which to continue each batch's tickets
+
+    Outputs:
+        a list of (ticket number, batch key) for each draw
+    """
+    seed_hash = consistent_sampler.sha256_hex(seed)  # type: ignore
+    last_tickets = dict(last_tickets)
+
+    tickets: list[tuple[str, BatchKey]] = []
+    for batch_key in batch_keys:
+        last_ticket = last_tickets.get(batch_key)
         ticket = (
-            consistent_sampler.first_fraction(batch_key, seed)  # type: ignore
-            if count == 1
-            else consistent_sampler.next_fraction(tickets.get(batch_key)[-1])  # type: ignore
+            consistent_sampler.first_fraction(batch_key, seed, seed_hash)  # type: ignore
+            if last_ticket is None
+            else consistent_sampler.next_fraction(last_ticket)  # type: ignore
         )
 
         # Trim the ticket number
         ticket = consistent_sampler.trim(ticket, 18)  # type: ignore
 
-        sampled_batch_keys_including_previously_sampled_with_ticket_numbers.append(
-            (ticket, batch_key)
-        )
-        counts[batch_key] = count
-
-        if batch_key in tickets:
-            tickets[batch_key].append(ticket)
-        else:
-            tickets[batch_key] = [ticket]
+        tickets.append((ticket, batch_key))
+        last_tickets[batch_key] = ticket
 
-    return sampled_batch_keys_including_previously_sampled_with_ticket_numbers[
-        num_previously_sampled_batches:
-    ]
+    return tickets
@@ -8,9 +8,13 @@ This code borrows heavily from code already written by Stark and Ottoboni here:
 https://github.com/pbstark/CORLA18
 """
 
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache, partial
 from itertools import product
 import math
-from typing import TypedDict, NamedTuple
+import multiprocessing
+from typing import Callable, Optional, TypedDict, NamedTuple, TypeVar
 from collections import Counter
 
 from decimal import Decimal
@@ -20,6 +24,7 @@ import scipy as sp
 
 from .sampler_contest import Contest, CVRS, SAMPLECVRS
 from . import bravo, supersimple
+from .. import config
 
 
 class HybridPair(NamedTuple):
@@ -29,6 +34,40 @@ class HybridPair(NamedTuple):
 
 GAMMA = 1.03905  # This GAMMA is used in Stark's tool, AGI, and CORLA
 MIN_SAMPLE_SIZE = 5  # The smallest sample size we want to take
+# Number of stratum states to memoize p-values for. See pvalue_memo.
+PVALUE_MEMO_SIZE = 1000
+
+
+@lru_cache(maxsize=PVALUE_MEMO_SIZE)
+def pvalue_memo(stratum_state: tuple) -> dict[float, float]:
+    """
+    The memoized p-values for a stratum state (the stratum's type and all of
+    the counts its p-values depend on), keyed by null lambda. The grid search
+    in maximize_fisher_combined_pvalue revisits the same lambdas as it refines
+    the grid, and the risk and sample size computations revisit the same
+    strata.
+    """
+    return {}
+
+
+def memoized_pvalues(
+    stratum_state: tuple,
+    null_lambdas: np.ndarray,
+    compute_pvalues: Callable[[np.ndarray], np.ndarray],
+) -> np.ndarray:
+    """
+    Look up the p-values for each of the null lambdas in the memo for the
+    stratum state, calling compute_pvalues once with an array of the null
+    lambdas that haven't been computed yet.
+    """
+    memo = pvalue_memo(stratum_state)
+    lambdas = np.asarray(null_lambdas, dtype=float).tolist()
+    missing = [
+        null_lambda for null_lambda in dict.fromkeys(lambdas) if null_lambda not in memo
+    ]
+    if missing:
+        memo.update(zip(missing, compute_pvalues(np.array(missing)).tolist()))
+    return np.array([memo[null_lambda] for null_lambda in lambdas])
 
 
 class BallotPollingStratum:
@@ -99,9 +138,21 @@ class BallotPollingStratum:
         Outputs:
             pvalue: the pvalue from testing the hypothesis that null margin is not the acual margin
         """
+        return float(
+            self.compute_pvalues(
+                reported_margin, winner, loser, np.array([null_lambda])
+            )[0]
+        )
 
+    def compute_pvalues(
+        self, reported_margin: int, winner: str, loser: str, null_lambdas: np.ndarray
+    ) -> np.ndarray:
+        """
+        Compute the p-values for a winner-loser pair for this stratum for each
+        of the given null lambdas. See compute_pvalue.
+        """
         if self.sample_size == 0 or reported_margin == 0:
-            return 1.0
+            return np.ones(len(null_lambdas))
 
         sample = bravo.compute_cumulative_sample(self.sample)
         n_w = sample[winner]
@@ -110,67 +161,259 @@ class BallotPollingStratum:
 
         v_w = self.vote_totals[winner]
         v_l = self.vote_totals[loser]
-        v_u = self.num_ballots - v_w - v_l
 
-        null_margin = (v_w - v_l) - null_lambda * reported_margin
+        return memoized_pvalues(
+            ("polling", self.num_ballots, v_w, v_l, n_w, n_l, n_u, reported_margin),
+            null_lambdas,
+            lambda lambdas: ballot_polling_pvalues(
+                self.num_ballots, v_w, v_l, n_w, n_l, n_u, reported_margin, lambdas
+            ),
+        )
 
-        if not (v_w >= n_w and v_l >= n_l and v_u >= n_u):
-            return 1.0
 
-        alt_logLR = (
-            np.sum(np.log(v_w - np.arange(n_w)))
-            + np.sum(np.log(v_l - np.arange(n_l)))
-            + np.sum(np.log(v_u - np.arange(n_u)))
-        )
+def ballot_polling_pvalues(
+    num_ballots: int,
+    v_w: int,
+    v_l: int,
+    n_w: int,
+    n_l: int,
+    n_u: int,
+    reported_margin: int,
+    null_lambdas: np.ndarray,
+) -> np.ndarray:
+    """
+    Compute the ballot polling stratum p-values for an array of null lambdas
+    from the stratum's vote totals (v_w, v_l) and sample counts (n_w, n_l,
+    n_u). See BallotPollingStratum.compute_pvalue.
+
+    Each p-value is computed with the same floating point operations as if
+    the null lambdas were handled one at a time, so the results don't depend
+    on which other null lambdas are in the array.
+    """
+    v_u = num_ballots - v_w - v_l
+
+    if not (v_w >= n_w and v_l >= n_l and v_u >= n_u):
+        return np.ones(len(null_lambdas))
 
-        def null_logLR(Nw):
-            return (
-                (n_w > 0) * np.sum(np.log(Nw - np.arange(n_w)))
-                + (n_l > 0) * np.sum(np.log(Nw - null_margin - np.arange(n_l)))
-                + (n_u > 0)
-                * np.sum(
-                    np.log(self.num_ballots - 2 * Nw + null_margin - np.arange(n_u))
-                )
+    range_w, range_l, range_u = np.arange(n_w), np.arange(n_l), np.arange(n_u)
+
+    alt_logLR = (
+        np.sum(np.log(v_w - range_w))
+        + np.sum(np.log(v_l - range_l))
+        + np.sum(np.log(v_u - range_u))
+    )
+
+    # Each of these takes an array of Nw values and the corresponding null
+    # margins, and sums over the sample for each pair in a row of a matrix.
+    def null_logLR(Nw, null_margin):
+        return (
+            (n_w > 0) * np.log(Nw[:, None] - range_w).sum(axis=1)
+            + (n_l > 0) * np.log((Nw - null_margin)[:, None] - range_l).sum(axis=1)
+            + (n_u > 0)
+            * np.log((num_ballots - 2 * Nw + null_margin)[:, None] - range_u).sum(
+                axis=1
             )
+        )
 
-        upper_n_w_limit = (self.num_ballots - n_u + null_margin) / 2.0
-        lower_n_w_limit = np.max([n_w, n_l + null_margin])
-
-        # For extremely small or large null_margins, the limits do not
-        # make sense with the sample values.
-        if upper_n_w_limit < n_w or (upper_n_w_limit - null_margin) < n_l:
-            return 0
-
-        def LR_derivative(Nw):
-            return (
-                np.sum([1 / (Nw - i) for i in range(n_w)])
-                + np.sum([1 / (Nw - null_margin - i) for i in range(n_l)])
-                - 2
-                * np.sum(
-                    [
-                        1 / (self.num_ballots - 2 * Nw + null_margin - i)
-                        for i in range(n_u)
-                    ]
-                )
+    def LR_derivative(Nw, null_margin):
+        return (
+            (1 / (Nw[:, None] - range_w)).sum(axis=1)
+            + (1 / ((Nw - null_margin)[:, None] - range_l)).sum(axis=1)
+            - 2
+            * (1 / ((num_ballots - 2 * Nw + null_margin)[:, None] - range_u)).sum(
+                axis=1
             )
+        )
+
+    null_margins = (v_w - v_l) - null_lambdas * reported_margin
+    upper_n_w_limits = (num_ballots - n_u + null_margins) / 2.0
+    lower_n_w_limits = np.maximum(n_w, n_l + null_margins)
 
+    # For extremely small or large null_margins, the limits do not
+    # make sense with the sample values, so the p-value is 0.
+    pvalues = np.zeros(len(null_lambdas))
+    valid = ~((upper_n_w_limits < n_w) | ((upper_n_w_limits - null_margins) < n_l))
+    null_margins = null_margins[valid]
+    upper_n_w_limits = upper_n_w_limits[valid]
+    lower_n_w_limits = lower_n_w_limits[valid]
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
         # Check if the maximum occurs at an endpoint: deriv has no sign change
-        if LR_derivative(upper_n_w_limit) * LR_derivative(lower_n_w_limit) > 0:
-            nuisance_param = (
-                upper_n_w_limit
-                if null_logLR(upper_n_w_limit) >= null_logLR(lower_n_w_limit)
-                else lower_n_w_limit
-            )
-        # Otherwise, find the (unique) root of the derivative of the log likelihood ratio
-        else:
-            nuisance_param = sp.optimize.brentq(
-                LR_derivative, lower_n_w_limit, upper_n_w_limit
+        at_endpoint = (
+            LR_derivative(upper_n_w_limits, null_margins)
+            * LR_derivative(lower_n_w_limits, null_margins)
+            > 0
+        )
+        nuisance_params = np.where(
+            null_logLR(upper_n_w_limits, null_margins)
+            >= null_logLR(lower_n_w_limits, null_margins),
+            upper_n_w_limits,
+            lower_n_w_limits,
+        )
+
+        # Otherwise, find the (unique) root of the derivative of the log
+        # likelihood ratio
+        (root_indexes,) = np.nonzero(~at_endpoint)
+        roots, converged = brentq_vectorized(
+            lambda Nw, indexes: LR_derivative(Nw, null_margins[root_indexes[indexes]]),
+            lower_n_w_limits[root_indexes],
+            upper_n_w_limits[root_indexes],
+        )
+        nuisance_params[root_indexes] = roots
+
+        # Let brentq handle (or raise an error for) any cases that
+        # brentq_vectorized doesn't.
+        for i in root_indexes[~converged]:
+            nuisance_params[i] = sp.optimize.brentq(
+                lambda Nw: LR_derivative(np.array([Nw]), null_margins[i : i + 1])[0],
+                lower_n_w_limits[i],
+                upper_n_w_limits[i],
             )
-        logLR = alt_logLR - null_logLR(nuisance_param)
-        LR = float(np.exp(logLR))  # This value is always a float, but np.exp
-        # can return a vector. casting for the typechecker.
+
+        logLR = alt_logLR - null_logLR(nuisance_params, null_margins)
         # Note if this value overflows, the p-value becomes 0.
-        return min(1.0 / LR, 1.0)
+        LR = np.exp(logLR)
+        pvalues[valid] = np.minimum(1.0 / LR, 1.0)
+
+    return pvalues
+
+
+# These match the defaults of scipy.optimize.brentq
+BRENTQ_XTOL = 2e-12
+BRENTQ_RTOL = 4 * np.finfo(float).eps
+BRENTQ_MAXITER = 100
+
+
+def brentq_vectorized(
+    f: Callable[[np.ndarray, np.ndarray], np.ndarray],
+    xa: np.ndarray,
+    xb: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Find a root of a function in each of the intervals [xa[i], xb[i]] at
+    once, taking the same steps that scipy.optimize.brentq would take for each
+    interval one at a time, so the roots are identical.
+
+    Inputs:
+        f: a function f(x, indexes) that evaluates the function for each of
+           the given interval indexes at the corresponding points x
+        xa, xb: the endpoints of the intervals
+
+    Outputs:
+        roots: the root found for each interval
+        converged: whether a root was found for each interval. Intervals
+           where the function doesn't strictly change sign, is nan, or
+           doesn't converge within BRENTQ_MAXITER steps are not converged, and
+           should be handed to brentq for it to handle.
+    """
+    num_intervals = len(xa)
+    roots = np.zeros(num_intervals)
+    converged = np.zeros(num_intervals, dtype=bool)
+    indexes = np.arange(num_intervals)
+
+    xpre, xcur = xa.astype(float), xb.astype(float)
+    fpre, fcur = f(xpre, indexes), f(xcur, indexes)
+    active = (
+        (fpre != 0)
+        & (fcur != 0)
+        & (np.signbit(fpre) != np.signbit(fcur))
+        & ~np.isnan(fpre)
+        & ~np.isnan(fcur)
+    )
+    indexes, xpre, xcur, fpre, fcur = (
+        indexes[active],
+        xpre[active],
+        xcur[active],
+        fpre[active],
+        fcur[active],
+    )
+    xblk, fblk = np.zeros(len(indexes)), np.zeros(len(indexes))
+    spre, scur = np.zeros(len(indexes)), np.zeros(len(indexes))
+
+    for _ in range(BRENTQ_MAXITER):
+        if len(indexes) == 0:
+            break
+
+        sign_change = (fpre != 0) & (fcur != 0) & (np.signbit(fpre) != np.signbit(fcur))
+        xblk = np.where(sign_change, xpre, xblk)
+        fblk = np.where(sign_change, fpre, fblk)
+        spre = np.where(sign_change, xcur - xpre, spre)
+        scur = np.where(sign_change, xcur - xpre, scur)
+
+        swap = np.abs(fblk) < np.abs(fcur)
+        xpre, xcur, xblk = (
+            np.where(swap, xcur, xpre),
+            np.where(swap, xblk, xcur),
+            np.where(swap, xcur, xblk),
+        )
+        fpre, fcur, fblk = (
+            np.where(swap, fcur, fpre),
+            np.where(swap, fblk, fcur),
+            np.where(swap, fcur, fblk),
+        )
+
+        delta = (BRENTQ_XTOL + BRENTQ_RTOL * np.abs(xcur)) / 2
+        sbis = (xblk - xcur) / 2
+        done = (fcur == 0) | (np.abs(sbis) < delta)
+        roots[indexes[done]] = xcur[done]
+        converged[indexes[done]] = True
+
+        # Try interpolation (or extrapolation), falling back to bisection.
+        # Steps are computed for every interval and only used where valid.
+        interpolate = (np.abs(spre) > delta) & (np.abs(fcur) < np.abs(fpre))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            secant = -fcur * (xcur - xpre) / (fcur - fpre)
+            dpre = (fpre - fcur) / (xpre - xcur)
+            dblk = (fblk - fcur) / (xblk - xcur)
+            inverse_quadratic = (
+                -fcur * (fblk * dblk - fpre * dpre) / (dblk * dpre * (fblk - fpre))
+            )
+        stry = np.where(xpre == xblk, secant, inverse_quadratic)
+        good_step = interpolate & (
+            2 * np.abs(stry) < np.minimum(np.abs(spre), 3 * np.abs(sbis) - delta)
+        )
+        spre = np.where(good_step, scur, sbis)
+        scur = np.where(good_step, stry, sbis)
+
+        xpre, fpre = xcur, fcur
+        xcur = np.where(
+            np.abs(scur) > delta,
+            xcur + scur,
+            xcur + np.where(sbis > 0, delta, -delta),
+        )
+
+        remaining = ~done
+        indexes, xpre, xcur, xblk = (
+            indexes[remaining],
+            xpre[remaining],
+            xcur[remaining],
+            xblk[remaining],
+        )
+        fpre, fblk, spre, scur = (
+            fpre[remaining],
+            fblk[remaining],
+            spre[remaining],
+            scur[remaining],
+        )
+        fcur = f(xcur, indexes)
+
+        # brentq raises an error if the function is nan
+        not_nan = ~np.isnan(fcur)
+        indexes, xpre, xcur, xblk = (
+            indexes[not_nan],
+            xpre[not_nan],
+            xcur[not_nan],
+            xblk[not_nan],
+        )
+        fpre, fcur, fblk, spre, scur = (
+            fpre[not_nan],
+            fcur[not_nan],
+            fblk[not_nan],
+            spre[not_nan],
+            scur[not_nan],
+        )
+
+    return roots, converged
 
 
 class MisstatementCounts(TypedDict):
@@ -238,37 +481,86 @@ class BallotComparisonStratum:
         Outputs:
             pvalue - the pvalue for the hypothesis given the null_lambda
         """
+        return float(
+            self.compute_pvalues(
+                reported_margin, winner, loser, np.array([null_lambda])
+            )[0]
+        )
 
+    def compute_pvalues(
+        self, reported_margin: int, winner: str, loser: str, null_lambdas: np.ndarray
+    ) -> np.ndarray:
+        """
+        Compute the p-values for a winner-loser pair for this stratum for each
+        of the given null lambdas. See compute_pvalue.
+        """
         if self.sample_size == 0 or reported_margin == 0:
-            return 1.0
+            return np.ones(len(null_lambdas))
 
         if self.sample_size == self.num_ballots:
-            return 0.0
-
-        o1, o2, u1, u2 = (
-            self.misstatements[(winner, loser)]["o1"],
-            self.misstatements[(winner, loser)]["o2"],
-            self.misstatements[(winner, loser)]["u1"],
-            self.misstatements[(winner, loser)]["u2"],
+            return np.zeros(len(null_lambdas))
+
+        misstatements = self.misstatements[(winner, loser)]
+        state = (
+            self.num_ballots,
+            self.sample_size,
+            misstatements["o1"],
+            misstatements["o2"],
+            misstatements["u1"],
+            misstatements["u2"],
+            reported_margin,
+        )
+        return memoized_pvalues(
+            ("comparison", *state),
+            null_lambdas,
+            lambda lambdas: ballot_comparison_pvalues(*state, lambdas),
         )
 
-        U_s = Decimal(2 * self.num_ballots / reported_margin)
-        gamma = Decimal(GAMMA)
-        multiplier = 1 - Decimal(null_lambda) / (gamma * U_s)
+
+# The log terms for each kind of misstatement in the ballot comparison p-value,
+# which only depend on GAMMA
+LOG_O1 = (1 - 1 / (2 * Decimal(GAMMA))).ln()
+LOG_O2 = (1 - 1 / Decimal(GAMMA)).ln()
+LOG_U1 = (1 + 1 / (2 * Decimal(GAMMA))).ln()
+LOG_U2 = (1 + 1 / Decimal(GAMMA)).ln()
+
+
+def ballot_comparison_pvalues(
+    num_ballots: int,
+    sample_size: int,
+    o1: int,
+    o2: int,
+    u1: int,
+    u2: int,
+    reported_margin: int,
+    null_lambdas: np.ndarray,
+) -> np.ndarray:
+    """
+    Compute the ballot comparison stratum p-values for an array of null
+    lambdas from the stratum's sample size and misstatement counts. See
+    BallotComparisonStratum.compute_pvalue.
+    """
+    U_s = Decimal(2 * num_ballots / reported_margin)
+    gamma = Decimal(GAMMA)
+    gamma_U_s = gamma * U_s
+
+    def pvalue(null_lambda: float) -> float:
+        multiplier = 1 - Decimal(null_lambda) / gamma_U_s
 
         # This represents an invalid alternative, because lambda is too big.
         if multiplier <= 0:
             return 1.0
 
         log_pvalue = (
-            self.sample_size * multiplier.ln()
-            - o1 * (1 - 1 / (2 * gamma)).ln()
-            - o2 * (1 - 1 / gamma).ln()
-            - u1 * (1 + 1 / (2 * gamma)).ln()
-            - u2 * (1 + 1 / gamma).ln()
+            sample_size * multiplier.ln()
+            - o1 * LOG_O1
+            - o2 * LOG_O2
+            - u1 * LOG_U1
+            - u2 * LOG_U2
         )
-        pvalue = (log_pvalue).exp()
-        return float(np.min([float(pvalue), 1.0]))  # cast for the typechecker
+        return min(float(log_pvalue.exp()), 1.0)
+
+    return np.array([pvalue(null_lambda) for null_lambda in null_lambdas.tolist()])
 
 
 def maximize_fisher_combined_pvalue(
@@ -367,31 +659,25 @@ def maximize_fisher_combined_pvalue(
             stepsize = (lambda_upper + 1 - lambda_lower) / 5
             test_lambdas = np.arange(lambda_lower, lambda_upper + stepsize, stepsize)
 
-        fisher_pvalues = np.empty_like(test_lambdas)
-        for i, test_lambda in enumerate(test_lambdas):
-            pvalue1: float = np.min(
-                [
-                    1,
-                    cvr_stratum.compute_pvalue(
-                        reported_margin, winner, loser, test_lambda
-                    ),
-                ]
-            )
-            pvalue2: float = np.min(
-                [
-                    1,
-                    bp_stratum.compute_pvalue(
-                        reported_margin, winner, loser, 1 - test_lambda
-                    ),
-                ]
-            )
-
-            pvalues = [pvalue1, pvalue2]
-            if np.any(np.array(pvalues) == 0):
-                fisher_pvalues[i] = 0
-            else:
-                obs = -2 * np.sum(np.log(pvalues))
-                fisher_pvalues[i] = 1 - sp.stats.chi2.cdf(obs, df=2 * len(pvalues))
+        pvalues2 = np.minimum(
+            1,
+            bp_stratum.compute_pvalues(
+                reported_margin, winner, loser, 1 - test_lambdas
+            ),
+        )
+        # The combined p-value is 0 wherever either p-value is 0, so we only
+        # need the (slower to compute) ballot comparison p-values elsewhere.
+        pvalues1 = np.zeros_like(test_lambdas)
+        pvalues1[pvalues2 != 0] = np.minimum(
+            1,
+            cvr_stratum.compute_pvalues(
+                reported_margin, winner, loser, test_lambdas[pvalues2 != 0]
+            ),
+        )
+        zero_pvalues = (pvalues1 == 0) | (pvalues2 == 0)
+        with np.errstate(divide="ignore"):
+            obs = -2 * (np.log(pvalues1) + np.log(pvalues2))
+        fisher_pvalues = np.where(zero_pvalues, 0.0, 1 - sp.stats.chi2.cdf(obs, df=4))
 
         pvalue = np.max(fisher_pvalues)
         alloc_lambda: float = test_lambdas[np.argmax(fisher_pvalues)]  # type: ignore
@@ -413,9 +699,8 @@ def maximize_fisher_combined_pvalue(
             maximized_pvalue = pvalue
             break
 
-        # We haven't found a good enough max yet, keep looking
-        # TODO memoize the p-values we've already looked at
-        # to make it faster.
+        # We haven't found a good enough max yet, keep looking. The p-values
+        # we've already looked at are memoized, so revisiting them is cheap.
         lambda_lower = alloc_lambda - 2 * stepsize
         lambda_upper = alloc_lambda + 2 * stepsize
         stepsize /= 10
@@ -630,6 +915,63 @@ def get_sample_size_for_wl_pair(
     return (cvr_ballots_to_sample, bp_ballots_to_sample)
 
 
+# Minimum number of winner-loser pairs to evaluate in each worker process, so
+# that small contests don't pay the overhead of sending work to the pool
+MIN_WL_PAIRS_PER_WORKER = 2
+
+# Process pool shared by all of the contests evaluated in this process (e.g.
+# by a background task worker), so that we only pay to start the worker
+# processes once. Stored along with its number of workers.
+_wl_pair_pool: Optional[tuple[int, ProcessPoolExecutor]] = None
+
+T = TypeVar("T")
+
+
+def wl_pair_executor(num_workers: int) -> ProcessPoolExecutor:
+    global _wl_pair_pool
+    if _wl_pair_pool is None or _wl_pair_pool[0] != num_workers:
+        if _wl_pair_pool is not None:
+            _wl_pair_pool[1].shutdown()
+        # Use spawn rather than fork so that the worker processes don't inherit
+        # the background task's database connections
+        _wl_pair_pool = (
+            num_workers,
+            ProcessPoolExecutor(
+                max_workers=num_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            ),
+        )
+    return _wl_pair_pool[1]
+
+
+def map_wl_pairs(
+    func: Callable[..., T],
+    wl_pairs: list[tuple[str, str]],
+    *args,
+) -> list[T]:
+    """
+    Calls func(*args, winner, loser) for each winner-loser pair, returning the
+    results in the same order as the pairs. Each pair is independent, so
+    larger contests are split across a pool of worker processes (see
+    config.SUITE_WL_PAIR_WORKERS). func and args must be picklable.
+    """
+    num_workers = min(
+        config.SUITE_WL_PAIR_WORKERS, len(wl_pairs) // MIN_WL_PAIRS_PER_WORKER
+    )
+    if num_workers > 1:
+        winners, losers = zip(*wl_pairs)
+        try:
+            executor = wl_pair_executor(config.SUITE_WL_PAIR_WORKERS)
+            return list(executor.map(partial(func, *args), winners, losers))
+        # If a worker process died (e.g. it ran out of memory), start a new pool
+        # next time, and evaluate the pairs here for now
+        except BrokenProcessPool:
+            global _wl_pair_pool
+            _wl_pair_pool = None
+
+    return [func(*args, winner, loser) for winner, loser in wl_pairs]
+
+
 def get_sample_size(
     risk_limit: int,
     contest: Contest,
@@ -670,13 +1012,14 @@ def get_sample_size(
             alpha, contest, bp_stratum, cvr_stratum, worst_winner, best_loser
         )
     else:
-        sample_sizes: list[tuple[int, int]] = []
-        for winner, loser in product(contest.winners, contest.losers):
-            sample_sizes.append(
-                get_sample_size_for_wl_pair(
-                    alpha, contest, bp_stratum, cvr_stratum, winner, loser
-                )
-            )
+        sample_sizes = map_wl_pairs(
+            get_sample_size_for_wl_pair,
+            list(product(contest.winners, contest.losers)),
+            alpha,
+            contest,
+            bp_stratum,
+            cvr_stratum,
+        )
 
         sample_size = sorted(sample_sizes, key=sum, reverse=True)[0]
 
@@ -689,6 +1032,37 @@ def get_sample_size(
     return HybridPair(cvr=sample_size[0], non_cvr=sample_size[1])
 
 
+def compute_risk_for_wl_pair(
+    alpha: float,
+    contest: Contest,
+    bp_stratum: BallotPollingStratum,
+    cvr_stratum: BallotComparisonStratum,
+    winner: str,
+    loser: str,
+) -> tuple[float, bool]:
+    """
+    Computes the risk measurement for a winner-loser pair. Returns the p-value
+    and whether one or both strata have already been recounted.
+    """
+    if (
+        bp_stratum.sample_size >= bp_stratum.num_ballots
+        and cvr_stratum.sample_size >= cvr_stratum.num_ballots
+    ):
+        # We did a full recount already!
+        return 0.0, True
+    elif bp_stratum.sample_size >= bp_stratum.num_ballots:
+        return cvr_stratum.compute_pvalue(alpha, winner, loser, 1), True
+    elif cvr_stratum.sample_size >= cvr_stratum.num_ballots:
+        return bp_stratum.compute_pvalue(alpha, winner, loser, 1), True
+    else:
+        return (
+            maximize_fisher_combined_pvalue(
+                alpha, contest, bp_stratum, cvr_stratum, winner, loser
+            ),
+            False,
+        )
+
+
 def compute_risk(
     risk_limit: int, contest: Contest, bp_stratum, cvr_stratum
 ) -> tuple[float, bool]:
@@ -712,29 +1086,16 @@ def compute_risk(
     alpha = float(risk_limit) / 100
     assert alpha < 1
 
-    pvalues = []
-
-    exception = False
-    for winner, loser in product(contest.winners, contest.losers):
-        if (
-            bp_stratum.sample_size >= bp_stratum.num_ballots
-            and cvr_stratum.sample_size >= cvr_stratum.num_ballots
-        ):
-            # We did a full recount already!
-            exception = True
-            pvalues.append(0.0)
-        elif bp_stratum.sample_size >= bp_stratum.num_ballots:
-            exception = True
-            pvalues.append(cvr_stratum.compute_pvalue(alpha, winner, loser, 1))
-        elif cvr_stratum.sample_size >= cvr_stratum.num_ballots:
-            exception = True
-            pvalues.append(bp_stratum.compute_pvalue(alpha, winner, loser, 1))
-        else:
-            pvalues.append(
-                maximize_fisher_combined_pvalue(
-                    alpha, contest, bp_stratum, cvr_stratum, winner, loser
-                )
-            )
+    results = map_wl_pairs(
+        compute_risk_for_wl_pair,
+        list(product(contest.winners, contest.losers)),
+        alpha,
+        contest,
+        bp_stratum,
+        cvr_stratum,
+    )
+    pvalues = [pvalue for pvalue, _ in results]
+    exception = any(recounted for _, recounted in results)
 
     max_p = max(pvalues)
 
@@ -159,6 +159,39 @@ SENTRY_DSN = os.environ.get("SENTRY_DSN")
 
 SLACK_WEBHOOK_URL = os.environ.get("SLACK_WEBHOOK_URL")
 
+# Number of processes to use for parsing Hart CVR XML files. Set to 1 to parse
+# in the background task's process.
+HART_CVR_PARSE_WORKERS = int(
+    read_env_var(
+        "ARLO_HART_CVR_PARSE_WORKERS",
+        default=str(os.cpu_count() or 1),
+        env_defaults=dict(test="1"),
+    )
+)
+
+# Number of processes to use for evaluating the winner-loser pairs of a
+# hybrid (SUITE) contest in parallel. Set to 1 to evaluate them in the
+# calling process.
+SUITE_WL_PAIR_WORKERS = int(
+    read_env_var(
+        "ARLO_SUITE_WL_PAIR_WORKERS",
+        default=str(os.cpu_count() or 1),
+        env_defaults=dict(test="1"),
+    )
+)
+
+# Background task queues that each worker dyno serves, and how many tasks to
+# run at once from each queue (each in its own process), e.g. "files:2,default:2".
+WORKER_QUEUE_CONCURRENCY = {
+    queue: int(concurrency)
+    for queue, concurrency in (
+        queue_concurrency.split(":")
+        for queue_concurrency in read_env_var(
+            "ARLO_WORKER_QUEUE_CONCURRENCY", default="default:1,files:1"
+        ).split(",")
+    )
+}
+
 RUN_BACKGROUND_TASKS_IMMEDIATELY = parse_bool(
     read_env_var("RUN_BACKGROUND_TASKS_IMMEDIATELY", default="False")
 )
@@ -1,3 +1,4 @@
+import re
 import sys
 from logging.config import fileConfig
 
@@ -38,6 +39,15 @@ target_metadata = Base.metadata
 # ... etc.
 
 
+# CvrBallots are partitioned by jurisdiction, with partitions created on the fly
+# as CVRs are uploaded (see api/cvrs.py), so autogenerate shouldn't try to drop
+# them.
+def include_object(object, name, type_, reflected, compare_to):
+    if type_ == "table" and reflected and compare_to is None:
+        return not re.fullmatch(r"cvr_ballot_[0-9a-f]{32}", name)
+    return True
+
+
 def run_migrations_offline():  # pragma: no cover
     """Run migrations in 'offline' mode.
 
@@ -58,6 +68,7 @@ def run_migrations_offline():  # pragma: no cover
         compare_server_default=True,
         include_schemas=True,
         literal_binds=True,
+        include_object=include_object,
         dialect_opts={"paramstyle": "named"},
     )
 
@@ -82,7 +93,11 @@ def run_migrations_online():
         )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+        )
 
         with context.begin_transaction():
             context.run_migrations()
@@ -0,0 +1,57 @@
+"""SampledBatchLastTicket
+
+Revision ID: 2f8d6b1a4c37
+Revises: 5a7c3e9b0d12
+Create Date: 2026-10-18 19:48:13.602915+00:00
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "2f8d6b1a4c37"
+down_revision = "5a7c3e9b0d12"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "sampled_batch_last_ticket",
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("batch_id", sa.String(length=200), nullable=False),
+        sa.Column("round_id", sa.String(length=200), nullable=False),
+        sa.Column("contest_id", sa.String(length=200), nullable=False),
+        sa.Column("ticket_number", sa.String(length=200), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["batch_id"],
+            ["batch.id"],
+            name=op.f("sampled_batch_last_ticket_batch_id_fkey"),
+            ondelete="cascade",
+        ),
+        sa.ForeignKeyConstraint(
+            ["contest_id"],
+            ["contest.id"],
+            name=op.f("sampled_batch_last_ticket_contest_id_fkey"),
+            ondelete="cascade",
+        ),
+        sa.ForeignKeyConstraint(
+            ["round_id"],
+            ["round.id"],
+            name=op.f("sampled_batch_last_ticket_round_id_fkey"),
+            ondelete="cascade",
+        ),
+        sa.PrimaryKeyConstraint(
+            "batch_id",
+            "round_id",
+            "contest_id",
+            name=op.f("sampled_batch_last_ticket_pkey"),
+        ),
+    )
+
+
+def downgrade():  # pragma: no cover
+    op.drop_table("sampled_batch_last_ticket")
@@ -0,0 +1,55 @@
+"""CvrInterpretationMatrix
+
+Revision ID: 3c9e6f1d2a84
+Revises: fda464935ab0
+Create Date: 2026-10-18 16:02:41.318840+00:00
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "3c9e6f1d2a84"
+down_revision = "fda464935ab0"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "cvr_interpretation_matrix",
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("cvr_file_id", sa.String(length=200), nullable=False),
+        sa.Column("jurisdiction_id", sa.String(length=200), nullable=False),
+        sa.Column("num_ballots", sa.Integer(), nullable=False),
+        sa.Column("num_columns", sa.Integer(), nullable=False),
+        sa.Column("batch_ids", sa.JSON(), nullable=False),
+        sa.Column("batch_offsets", sa.LargeBinary(), nullable=False),
+        sa.Column("interpretations", sa.LargeBinary(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["cvr_file_id"],
+            ["file.id"],
+            name=op.f("cvr_interpretation_matrix_cvr_file_id_fkey"),
+            ondelete="cascade",
+        ),
+        sa.ForeignKeyConstraint(
+            ["jurisdiction_id"],
+            ["jurisdiction.id"],
+            name=op.f("cvr_interpretation_matrix_jurisdiction_id_fkey"),
+            ondelete="cascade",
+        ),
+        sa.PrimaryKeyConstraint(
+            "cvr_file_id", name=op.f("cvr_interpretation_matrix_pkey")
+        ),
+    )
+    op.execute(
+        "ALTER TABLE cvr_interpretation_matrix"
+        " ALTER COLUMN interpretations SET STORAGE EXTERNAL"
+    )
+
+
+def downgrade():  # pragma: no cover
+    op.drop_table("cvr_interpretation_matrix")
@@ -0,0 +1,48 @@
+"""SampleSizeCache
+
+Revision ID: 4e1a8c5d7b29
+Revises: 7b4e2d9c6a15
+Create Date: 2026-10-18 21:52:16.308417+00:00
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "4e1a8c5d7b29"
+down_revision = "7b4e2d9c6a15"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "sample_size_cache",
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("election_id", sa.String(length=200), nullable=False),
+        sa.Column("contest_id", sa.String(length=200), nullable=False),
+        sa.Column("fingerprint", sa.String(length=64), nullable=False),
+        sa.Column("sample_size_options", sa.JSON(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["contest_id"],
+            ["contest.id"],
+            name=op.f("sample_size_cache_contest_id_fkey"),
+            ondelete="cascade",
+        ),
+        sa.ForeignKeyConstraint(
+            ["election_id"],
+            ["election.id"],
+            name=op.f("sample_size_cache_election_id_fkey"),
+            ondelete="cascade",
+        ),
+        sa.PrimaryKeyConstraint(
+            "contest_id", "fingerprint", name=op.f("sample_size_cache_pkey")
+        ),
+    )
+
+
+def downgrade():  # pragma: no cover
+    op.drop_table("sample_size_cache")
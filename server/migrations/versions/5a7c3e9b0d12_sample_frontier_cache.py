@@ -0,0 +1,42 @@
+"""SampleFrontierCache
+
+Revision ID: 5a7c3e9b0d12
+Revises: 8d2b7e4c91f3
+Create Date: 2026-10-18 19:04:52.118406+00:00
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "5a7c3e9b0d12"
+down_revision = "8d2b7e4c91f3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "sample_frontier_cache",
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("contest_id", sa.String(length=200), nullable=False),
+        sa.Column("ballot_pool", sa.String(length=200), nullable=False),
+        sa.Column("fingerprint", sa.String(length=200), nullable=False),
+        sa.Column("frontier", sa.JSON(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["contest_id"],
+            ["contest.id"],
+            name=op.f("sample_frontier_cache_contest_id_fkey"),
+            ondelete="cascade",
+        ),
+        sa.PrimaryKeyConstraint(
+            "contest_id", "ballot_pool", name=op.f("sample_frontier_cache_pkey")
+        ),
+    )
+
+
+def downgrade():  # pragma: no cover
+    op.drop_table("sample_frontier_cache")
@@ -0,0 +1,48 @@
+"""CvrContestIndex
+
+Revision ID: 7b4e2d9c6a15
+Revises: 2f8d6b1a4c37
+Create Date: 2026-10-18 20:37:29.845120+00:00
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "7b4e2d9c6a15"
+down_revision = "2f8d6b1a4c37"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "cvr_contest_index",
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("cvr_file_id", sa.String(length=200), nullable=False),
+        sa.Column("jurisdiction_id", sa.String(length=200), nullable=False),
+        sa.Column("cvr_contest_name", sa.String(length=200), nullable=False),
+        sa.Column("has_contest", sa.LargeBinary(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["cvr_file_id"],
+            ["file.id"],
+            name=op.f("cvr_contest_index_cvr_file_id_fkey"),
+            ondelete="cascade",
+        ),
+        sa.ForeignKeyConstraint(
+            ["jurisdiction_id"],
+            ["jurisdiction.id"],
+            name=op.f("cvr_contest_index_jurisdiction_id_fkey"),
+            ondelete="cascade",
+        ),
+        sa.PrimaryKeyConstraint(
+            "cvr_file_id", "cvr_contest_name", name=op.f("cvr_contest_index_pkey")
+        ),
+    )
+
+
+def downgrade():  # pragma: no cover
+    op.drop_table("cvr_contest_index")
@@ -0,0 +1,105 @@
+"""Partition CvrBallot by jurisdiction
+
+Revision ID: 8d2b7e4c91f3
+Revises: 3c9e6f1d2a84
+Create Date: 2026-10-18 18:21:07.524113+00:00
+
+"""
+
+import hashlib
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "8d2b7e4c91f3"
+down_revision = "3c9e6f1d2a84"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.rename_table("cvr_ballot", "cvr_ballot_unpartitioned")
+    # Free up the constraint names for the new table
+    op.drop_constraint("cvr_ballot_pkey", "cvr_ballot_unpartitioned")
+    op.drop_constraint(
+        "cvr_ballot_batch_id_ballot_position_key", "cvr_ballot_unpartitioned"
+    )
+    op.drop_constraint("cvr_ballot_batch_id_fkey", "cvr_ballot_unpartitioned")
+
+    op.create_table(
+        "cvr_ballot",
+        sa.Column("jurisdiction_id", sa.String(length=200), nullable=False),
+        sa.Column("batch_id", sa.String(length=200), nullable=False),
+        sa.Column("record_id", sa.Integer(), nullable=False),
+        sa.Column("ballot_position", sa.Integer(), nullable=True),
+        sa.Column("imprinted_id", sa.String(length=200), nullable=False),
+        sa.Column("interpretations", sa.Text(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["batch_id"],
+            ["batch.id"],
+            name=op.f("cvr_ballot_batch_id_fkey"),
+            ondelete="cascade",
+        ),
+        sa.ForeignKeyConstraint(
+            ["jurisdiction_id"],
+            ["jurisdiction.id"],
+            name=op.f("cvr_ballot_jurisdiction_id_fkey"),
+            ondelete="cascade",
+        ),
+        sa.PrimaryKeyConstraint(
+            "batch_id", "record_id", "jurisdiction_id", name=op.f("cvr_ballot_pkey")
+        ),
+        sa.UniqueConstraint(
+            "batch_id",
+            "ballot_position",
+            "jurisdiction_id",
+            name=op.f("cvr_ballot_batch_id_ballot_position_jurisdiction_id_key"),
+        ),
+        postgresql_partition_by="LIST (jurisdiction_id)",
+    )
+
+    # Create a partition for each jurisdiction with CVRs, named the same way as
+    # api/cvrs.py:cvr_ballot_partition_name
+    connection = op.get_bind()
+    jurisdiction_ids = connection.execute(
+        """
+        SELECT DISTINCT batch.jurisdiction_id
+        FROM cvr_ballot_unpartitioned
+        JOIN batch ON batch.id = cvr_ballot_unpartitioned.batch_id
+        """
+    ).fetchall()
+    for (jurisdiction_id,) in jurisdiction_ids:
+        partition = f"cvr_ballot_{hashlib.md5(jurisdiction_id.encode()).hexdigest()}"
+        jurisdiction_id_literal = "'" + jurisdiction_id.replace("'", "''") + "'"
+        op.execute(
+            f"CREATE TABLE {partition} PARTITION OF cvr_ballot"
+            f" FOR VALUES IN ({jurisdiction_id_literal})"
+        )
+
+    op.execute(
+        """
+        INSERT INTO cvr_ballot (
+            jurisdiction_id,
+            batch_id,
+            record_id,
+            ballot_position,
+            imprinted_id,
+            interpretations
+        )
+        SELECT
+            batch.jurisdiction_id,
+            cvr_ballot_unpartitioned.batch_id,
+            cvr_ballot_unpartitioned.record_id,
+            cvr_ballot_unpartitioned.ballot_position,
+            cvr_ballot_unpartitioned.imprinted_id,
+            cvr_ballot_unpartitioned.interpretations
+        FROM cvr_ballot_unpartitioned
+        JOIN batch ON batch.id = cvr_ballot_unpartitioned.batch_id
+        """
+    )
+    op.drop_table("cvr_ballot_unpartitioned")
+
+
+def downgrade():  # pragma: no cover
+    pass
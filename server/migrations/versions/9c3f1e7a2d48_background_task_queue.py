@@ -0,0 +1,33 @@
+"""background_task_queue
+
+Revision ID: 9c3f1e7a2d48
+Revises: 4e1a8c5d7b29
+Create Date: 2026-10-18 23:14:37.529104+00:00
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "9c3f1e7a2d48"
+down_revision = "4e1a8c5d7b29"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "background_task",
+        sa.Column(
+            "queue",
+            sa.String(length=200),
+            nullable=False,
+            server_default="default",
+        ),
+    )
+
+
+def downgrade():  # pragma: no cover
+    pass
@@ -13,6 +13,7 @@ from sqlalchemy import (
     Integer,
     Float,
     JSON,
+    LargeBinary,
     Boolean,
     Enum,
     ForeignKey,
@@ -641,6 +642,24 @@ class SampleSizeOptions(BaseModel):
     __table_args__ = (PrimaryKeyConstraint("election_id", "round_num"),)
 
 
+# Sample size options computed for a contest, keyed by a fingerprint of all of
+# the inputs they were computed from (see
+# api/sample_sizes.py:sample_size_fingerprint), so we don't have to recompute
+# them until something changes. Cleared whenever files that feed into sample
+# sizes are (re)processed.
+class SampleSizeCache(BaseModel):
+    election_id = Column(
+        String(200), ForeignKey("election.id", ondelete="cascade"), nullable=False
+    )
+    contest_id = Column(
+        String(200), ForeignKey("contest.id", ondelete="cascade"), nullable=False
+    )
+    fingerprint = Column(String(64), nullable=False)
+    sample_size_options = Column(JSON, nullable=False)
+
+    __table_args__ = (PrimaryKeyConstraint("contest_id", "fingerprint"),)
+
+
 class Round(BaseModel):
     id = Column(String(200), primary_key=True)
     election_id = Column(
@@ -740,6 +759,24 @@ class SampledBallotDraw(BaseModel):
     )
 
 
+# Caches the state of the ballot sampler after the most recent round's draw for
+# a contest (see audit_math/sampler.py:SampleFrontier), so that the next round
+# can resume drawing where the last one left off instead of drawing all of the
+# previous rounds' tickets again. In hybrid audits, CVR and non-CVR ballots are
+# sampled separately, so ballot_pool is one of "ALL", "CVR", or "NON_CVR". The
+# fingerprint identifies the seed and manifest that the frontier was drawn
+# from, so that the frontier is ignored if any of those change.
+class SampleFrontierCache(BaseModel):
+    contest_id = Column(
+        String(200), ForeignKey("contest.id", ondelete="cascade"), nullable=False
+    )
+    ballot_pool = Column(String(200), nullable=False)
+    fingerprint = Column(String(200), nullable=False)
+    frontier = Column(JSON, nullable=False)
+
+    __table_args__ = (PrimaryKeyConstraint("contest_id", "ballot_pool"),)
+
+
 class Interpretation(str, enum.Enum):
     BLANK = "BLANK"
     CANT_AGREE = "CANT_AGREE"
@@ -942,6 +979,27 @@ class SampledBatchDraw(BaseModel):
     )
 
 
+# The last ticket number drawn for each batch sampled in a round of a batch
+# comparison audit. In the next round, the sampler continues each batch's
+# ticket numbers from its last ticket, rather than regenerating the tickets
+# for every batch sampled in previous rounds.
+class SampledBatchLastTicket(BaseModel):
+    batch_id = Column(
+        String(200),
+        ForeignKey("batch.id", ondelete="cascade"),
+        nullable=False,
+    )
+    round_id = Column(
+        String(200), ForeignKey("round.id", ondelete="cascade"), nullable=False
+    )
+    contest_id = Column(
+        String(200), ForeignKey("contest.id", ondelete="cascade"), nullable=False
+    )
+    ticket_number = Column(String(200), nullable=False)
+
+    __table_args__ = (PrimaryKeyConstraint("batch_id", "round_id", "contest_id"),)
+
+
 # (Experimental) To we add extra batches on top of the sample, give them a
 # special ticket number to flag them.
 EXTRA_TICKET_NUMBER = "EXTRA"
@@ -1004,7 +1062,16 @@ class BatchResultsFinalized(BaseModel):
 # Only used in ballot comparison audits, a CvrBallot stores one row from the
 # cast-vote record (CVR) uploaded by a jurisdiction. We compare this record to
 # the audit board's interpretation of the ballot.
+# CvrBallots are list-partitioned by jurisdiction, with one partition per
+# jurisdiction that has uploaded CVRs, so that clearing or replacing a
+# jurisdiction's CVRs is a matter of swapping out its partition rather than
+# deleting millions of rows (see api/cvrs.py).
 class CvrBallot(Base):
+    jurisdiction_id = Column(
+        String(200),
+        ForeignKey("jurisdiction.id", ondelete="cascade"),
+        nullable=False,
+    )
     batch_id = Column(
         String(200),
         ForeignKey("batch.id", ondelete="cascade"),
@@ -1024,10 +1091,71 @@ class CvrBallot(Base):
     # headers saved in Juridsiction.cvr_contests_metadata.
     interpretations = Column(Text, nullable=False)
 
+    # Postgres requires the partition key to be part of any unique constraint
     __table_args__ = (
-        PrimaryKeyConstraint("batch_id", "record_id"),
-        UniqueConstraint("batch_id", "ballot_position"),
+        PrimaryKeyConstraint("batch_id", "record_id", "jurisdiction_id"),
+        UniqueConstraint("batch_id", "ballot_position", "jurisdiction_id"),
+        dict(postgresql_partition_by="LIST (jurisdiction_id)"),
+    )
+
+
+# Only used in ballot comparison audits, a CvrInterpretationMatrix stores the
+# interpretations of all of the CvrBallots loaded from a jurisdiction's CVR file
+# as a packed int8 matrix (see util/cvr_matrix.py), so that the audit math can
+# read the interpretations for a contest without parsing each
+# CvrBallot.interpretations string.
+class CvrInterpretationMatrix(BaseModel):
+    cvr_file_id = Column(
+        String(200), ForeignKey("file.id", ondelete="cascade"), primary_key=True
+    )
+    jurisdiction_id = Column(
+        String(200),
+        ForeignKey("jurisdiction.id", ondelete="cascade"),
+        nullable=False,
+    )
+
+    num_ballots = Column(Integer, nullable=False)
+    num_columns = Column(Integer, nullable=False)
+    # Batch ids in the order their ballots appear in the matrix, along with the
+    # packed int32 row offset of each batch's first ballot
+    batch_ids = Column(JSON, nullable=False)
+    batch_offsets = Column(LargeBinary, nullable=False)
+    # Column-major, so that each contest's columns are a contiguous byte range
+    interpretations = Column(LargeBinary, nullable=False)
+
+
+# Store the matrix uncompressed so that Postgres can read a contest's byte
+# range with substring() without decompressing the whole value.
+sqlalchemy.event.listen(
+    CvrInterpretationMatrix.__table__,
+    "after_create",
+    DDL(
+        "ALTER TABLE cvr_interpretation_matrix"
+        " ALTER COLUMN interpretations SET STORAGE EXTERNAL"
+    ),
+)
+
+
+# Alongside the CvrInterpretationMatrix, a CvrContestIndex records which of
+# the matrix's ballots have each contest on them (i.e. have any interpretation
+# for the contest), as a packed bitmap over the matrix rows. This lets us find
+# the ballots with a contest (e.g. to build the sampling manifest in a card
+# style data audit) without reading the contest's interpretations.
+class CvrContestIndex(BaseModel):
+    cvr_file_id = Column(
+        String(200), ForeignKey("file.id", ondelete="cascade"), nullable=False
     )
+    jurisdiction_id = Column(
+        String(200),
+        ForeignKey("jurisdiction.id", ondelete="cascade"),
+        nullable=False,
+    )
+    # The contest name as it appears in the CVR file (i.e. before any contest
+    # name standardization)
+    cvr_contest_name = Column(String(200), nullable=False)
+    has_contest = Column(LargeBinary, nullable=False)
+
+    __table_args__ = (PrimaryKeyConstraint("cvr_file_id", "cvr_contest_name"),)
 
 
 class File(BaseModel):
@@ -1050,6 +1178,9 @@ class BackgroundTask(BaseModel):
     task_name = Column(String(200), nullable=False)
     payload = Column(JSON, nullable=False)
     lock_key = Column(String(200))
+    # Which queue the task is in, so that workers can be dedicated to
+    # particular kinds of tasks (see worker/tasks.py)
+    queue = Column(String(200), nullable=False, server_default="default")
 
     worker_id = Column(String(200))
     started_at = Column(UTCDateTime)
@@ -60,6 +60,8 @@ def test_rounds_create_one(
                     "startedAt": assert_is_date,
                     "completedAt": assert_is_date,
                     "error": None,
+                    "workProgress": 4,
+                    "workTotal": 4,
                 },
             }
         ]
@@ -140,6 +142,8 @@ def test_rounds_create_two(
                     "startedAt": assert_is_date,
                     "completedAt": assert_is_date,
                     "error": None,
+                    "workProgress": 4,
+                    "workTotal": 4,
                 },
             },
             {
@@ -155,6 +159,8 @@ def test_rounds_create_two(
                     "startedAt": assert_is_date,
                     "completedAt": assert_is_date,
                     "error": None,
+                    "workProgress": 4,
+                    "workTotal": 4,
                 },
             },
         ]
@@ -183,6 +189,14 @@ def test_rounds_create_two(
     }
     assert sorted(sampled_jurisdictions) == sorted(jurisdiction_ids[:2])
 
+    # The sampler's frontier is saved after each round's draw, so that the next
+    # round's draw can resume from it
+    frontier_cache = SampleFrontierCache.query.get((contest_ids[0], "ALL"))
+    assert (
+        frontier_cache.frontier["num_drawn"]
+        == SampledBallotDraw.query.filter_by(contest_id=contest_ids[0]).count()
+    )
+
 
 def test_rounds_complete_audit(
     client: FlaskClient,
@@ -209,6 +223,8 @@ def test_rounds_complete_audit(
                     "startedAt": assert_is_date,
                     "completedAt": assert_is_date,
                     "error": None,
+                    "workProgress": 4,
+                    "workTotal": 4,
                 },
             }
         ]
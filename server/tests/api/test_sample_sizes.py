@@ -1,5 +1,6 @@
 import json
 from datetime import datetime, timezone, timedelta
+from unittest.mock import patch
 from flask.testing import FlaskClient
 
 from ...models import *
@@ -63,6 +64,52 @@ def test_sample_sizes_round_1(
     assert response["selected"] is None
 
 
+def test_sample_sizes_cached(
+    client: FlaskClient,
+    election_id: str,
+    jurisdiction_ids: list[str],
+    contest_ids: list[str],
+    election_settings,
+    manifests,
+):
+    set_logged_in_user(client, UserType.AUDIT_ADMIN, DEFAULT_AA_EMAIL)
+    rv = client.get(f"/api/election/{election_id}/sample-sizes/1")
+    sample_sizes = json.loads(rv.data)["sampleSizes"]
+    assert sample_sizes is not None
+    assert SampleSizeCache.query.filter_by(election_id=election_id).count() == len(
+        sample_sizes
+    )
+
+    # Expire the previous results so that a new task runs
+    sample_size_options = SampleSizeOptions.query.filter_by(
+        election_id=election_id, round_num=1
+    ).one()
+    sample_size_options.task.completed_at = datetime.now(timezone.utc) - timedelta(
+        seconds=5
+    )
+    db_session.commit()
+
+    # Since none of the inputs have changed, the cached sample sizes are
+    # returned without recomputing them
+    with patch("server.api.sample_sizes.ballot_polling.get_sample_size") as mock:
+        rv = client.get(f"/api/election/{election_id}/sample-sizes/1")
+        assert json.loads(rv.data)["sampleSizes"] == sample_sizes
+        mock.assert_not_called()
+
+    # Uploading a new manifest clears the cache
+    set_logged_in_user(
+        client, UserType.JURISDICTION_ADMIN, default_ja_email(election_id)
+    )
+    rv = upload_ballot_manifest(
+        client,
+        io.BytesIO(b"Batch Name,Number of Ballots\n1,23\n2,101\n3,122\n4,400"),
+        election_id,
+        jurisdiction_ids[0],
+    )
+    assert_ok(rv)
+    assert SampleSizeCache.query.filter_by(election_id=election_id).count() == 0
+
+
 def test_sample_sizes_round_2(
     client: FlaskClient,
     election_id: str,
@@ -2,6 +2,7 @@ from decimal import Decimal
 import math
 from unittest.mock import patch
 import pytest
+from scipy import stats
 
 from ...audit_math import bravo
 from ...audit_math.sampler_contest import Contest
@@ -255,6 +256,38 @@ def test_bravo_sample_sizes_round1_incomplete():
     )
 
 
+def naive_first_size_reaching_threshold(
+    size, threshold, plus, minus, p_w2, p_completion, total_ballots
+):
+    # Checks each size one by one, like bravo_sample_sizes used to
+    test_stat = Decimal(0)
+    while test_stat.is_nan() or (test_stat < threshold and size < total_ballots):
+        x_c = Decimal(stats.binom.ppf(1.0 - p_completion, size, float(p_w2)))
+        test_stat = x_c * plus + (size - x_c) * minus
+        if test_stat.is_nan() or test_stat < threshold:
+            size += 1
+    return size
+
+
+@pytest.mark.parametrize("risk_limit", [5, 10])
+@pytest.mark.parametrize("p_w,p_r", [(0.4, 0.32), (0.36, 0.32), (0.6, 0.1)])
+def test_first_size_reaching_threshold(risk_limit, p_w, p_r):
+    alpha = Decimal(risk_limit) / 100
+    p_w2 = Decimal(p_w) / (Decimal(p_w) + Decimal(p_r))
+    plus = (p_w2 / Decimal(0.5)).ln()
+    minus = ((1 - p_w2) / Decimal(0.5)).ln()
+    threshold = (1 / alpha).ln()
+
+    for p_completion in [0.1, 0.5, 0.9]:
+        # Start far from the answer to check long searches, and stop short of
+        # it to check the total_ballots cutoff
+        for size, total_ballots in [(0, 2000), (0, 100), (500, 2000)]:
+            args = (size, threshold, plus, minus, p_w2, p_completion, total_ballots)
+            assert bravo.first_size_reaching_threshold(
+                *args
+            ) == naive_first_size_reaching_threshold(*args)
+
+
 def test_get_sample_size(contests):
     for contest in contests:
         if contest in ["test3", "test4", "test9"]:
@@ -1,4 +1,5 @@
 from decimal import Decimal
+import random
 from typing import Dict
 import pytest
 
@@ -1281,3 +1282,58 @@ def test_runoff_exact_tie_threshold_returns_infinite_max_error():
     )
 
     assert max_err == Decimal("inf")
+
+
+def test_max_error_index(contests, batches) -> None:
+    def assert_matches_compute_max_error(batches, contest):
+        index = macro.MaxErrorIndex(batches, contest)
+        unauditable_ballots = macro.compute_unauditable_ballots(batches, contest)
+        assert index.unauditable_ballots == unauditable_ballots
+
+        expected_U = Decimal(0.0)
+        for batch_key, batch_results in batches.items():
+            expected_max_error = macro.compute_max_error(
+                batch_results, contest, unauditable_ballots
+            )
+            assert index.max_error(batch_key) == expected_max_error
+            expected_U += expected_max_error
+
+        assert index.U == expected_U
+        assert index.U == macro.compute_U(batches, contest)
+        if expected_U.is_finite() and expected_U > 0:
+            assert index.weights.tolist() == [
+                float(
+                    macro.compute_max_error(batches[key], contest, unauditable_ballots)
+                    / expected_U
+                )
+                for key in index.batch_keys
+            ]
+
+    for contest in contests.values():
+        assert_matches_compute_max_error(batches, contest)
+
+    # Batches with different tallies, including some where the loser is ahead
+    rand = random.Random(12345)
+    for is_subject_to_runoff in [False, True]:
+        contest, runoff_batches = _runoff_fixtures(
+            {"alice": 45, "bob": 30, "carla": 15, "dan": 10},
+            is_subject_to_runoff=is_subject_to_runoff,
+        )
+        for batch_results in runoff_batches.values():
+            tallies = batch_results["runoff_contest"]
+            for candidate in ["alice", "bob", "carla", "dan"]:
+                tallies[candidate] = rand.randint(0, 60)
+            tallies["ballots"] = rand.randint(0, 60) + sum(
+                tallies[candidate] for candidate in ["alice", "bob", "carla", "dan"]
+            )
+        runoff_batches["Other-contest batch"] = {
+            "other_contest": {"x": 50, "y": 50, "ballots": 100},
+        }
+        assert_matches_compute_max_error(runoff_batches, contest)
+
+    # Tied threshold, so every batch has an infinite max error
+    contest, runoff_batches = _runoff_fixtures(
+        {"alice": 50, "bob": 30, "carla": 15, "dan": 5}, num_batches=3
+    )
+    assert_matches_compute_max_error(runoff_batches, contest)
+    assert macro.MaxErrorIndex(runoff_batches, contest).U == Decimal("inf")
@@ -1,6 +1,7 @@
 import pytest
 import numpy as np
 
+from ...audit_math import raire
 from ...audit_math.sampler_contest import Contest
 from ...audit_math.raire import (
     NEBMatrix,
@@ -16,15 +17,14 @@ from ...audit_math.raire_utils import (
     NEBAssertion,
     NENAssertion,
     RaireAssertion,
+    RaireBallots,
     CVRS,
 )
-from .test_raire_utils import make_neb_assertion
+from .test_raire_utils import ListRaireFrontier, make_neb_assertion
 
 RAIRE_INPUT_DIR = "server/tests/audit_math/raire_data/input/"
 RAIRE_OUTPUT_DIR = "server/tests/audit_math/raire_data/output/"
 
-BallotList = list[dict[str, int]]
-
 
 @pytest.fixture
 def contest() -> Contest:
@@ -57,7 +57,7 @@ def cvrs() -> CVRS:
 
 
 @pytest.fixture
-def ballots() -> list[dict[str, int]]:
+def ballots(contest: Contest) -> RaireBallots:
     ballots = []
     for _ in range(25000):
         ballots.append({"winner": 1, "loser": 2, "loser2": 3})
@@ -68,14 +68,14 @@ def ballots() -> list[dict[str, int]]:
     for _ in range(20000):
         ballots.append({"winner": 2, "loser": 3, "loser2": 1})
 
-    return ballots
+    return RaireBallots(contest, ballots)
 
 
 def asn_func(m):
     return 1 / m if m > 0 else np.inf
 
 
-def test_make_neb_matrix(contest: Contest, cvrs: CVRS):
+def test_make_neb_matrix(contest: Contest, cvrs: CVRS, ballots: RaireBallots):
     expected: NEBMatrix = {
         c: {
             d: make_neb_assertion(contest, cvrs, asn_func, c, d, set())
@@ -90,11 +90,11 @@ def test_make_neb_matrix(contest: Contest, cvrs: CVRS):
             if (cand, other) not in expected_pairs:
                 expected[cand][other] = None
 
-    assert make_neb_matrix(contest, cvrs, asn_func) == expected
+    assert make_neb_matrix(contest, ballots, asn_func) == expected
 
 
-def test_make_raire_frontier(contest: Contest, cvrs: CVRS, ballots: BallotList):
-    nebs = make_neb_matrix(contest, cvrs, asn_func)
+def test_make_raire_frontier(contest: Contest, cvrs: CVRS, ballots: RaireBallots):
+    nebs = make_neb_matrix(contest, ballots, asn_func)
     expected = RaireFrontier()
 
     # enumerate all possible nodes
@@ -115,9 +115,9 @@ def test_make_raire_frontier(contest: Contest, cvrs: CVRS, ballots: BallotList):
 
 
 def test_find_assertions_too_good_ancestor(
-    contest: Contest, ballots: BallotList, cvrs: CVRS
+    contest: Contest, ballots: RaireBallots, cvrs: CVRS
 ):
-    nebs = make_neb_matrix(contest, cvrs, asn_func)
+    nebs = make_neb_matrix(contest, ballots, asn_func)
     frontier = make_frontier(contest, ballots, nebs, asn_func)
 
     # Create a fake best ancestor
@@ -141,9 +141,9 @@ def test_find_assertions_too_good_ancestor(
 
 
 def test_find_assertions_infinite_to_expand(
-    contest: Contest, ballots: BallotList, cvrs: CVRS
+    contest: Contest, ballots: RaireBallots, cvrs: CVRS
 ):
-    nebs = make_neb_matrix(contest, cvrs, asn_func)
+    nebs = make_neb_matrix(contest, ballots, asn_func)
     frontier = make_frontier(contest, ballots, nebs, asn_func)
 
     lowerbound = -10.0
@@ -155,7 +155,7 @@ def test_find_assertions_infinite_to_expand(
     newn.estimate = np.inf
     newn.expandable = True
 
-    frontier.nodes.insert(0, newn)
+    frontier.insert_node(newn)
 
     assert not find_assertions(
         contest, ballots, nebs, asn_func, frontier, lowerbound, 0
@@ -163,9 +163,9 @@ def test_find_assertions_infinite_to_expand(
 
 
 def test_find_assertions_fake_ancestor(
-    contest: Contest, ballots: BallotList, cvrs: CVRS
+    contest: Contest, ballots: RaireBallots, cvrs: CVRS
 ):
-    nebs = make_neb_matrix(contest, cvrs, asn_func)
+    nebs = make_neb_matrix(contest, ballots, asn_func)
     frontier = make_frontier(contest, ballots, nebs, asn_func)
 
     lowerbound = -10.0
@@ -183,10 +183,10 @@ def test_find_assertions_fake_ancestor(
 
 
 def test_find_assertions_infinite_branch(
-    contest: Contest, ballots: BallotList, cvrs: CVRS
+    contest: Contest, ballots: RaireBallots, cvrs: CVRS
 ):
     # Fake neb_matrix into showing all assertions but one as infinite
-    nebs = make_neb_matrix(contest, cvrs, asn_func)
+    nebs = make_neb_matrix(contest, ballots, asn_func)
     nebs["loser"]["winner"] = make_neb_assertion(
         contest, cvrs, asn_func, "loser", "winner", set()
     )
@@ -210,7 +210,7 @@ def test_find_assertions_infinite_branch(
     newn.estimate = np.inf
     newn.expandable = True
 
-    frontier.nodes.insert(0, newn)
+    frontier.insert_node(newn)
 
     assert not find_assertions(
         contest, ballots, nebs, asn_func, frontier, lowerbound, 0
@@ -218,9 +218,9 @@ def test_find_assertions_infinite_branch(
 
 
 def test_find_assertions_many_children(
-    contest: Contest, ballots: BallotList, cvrs: CVRS
+    contest: Contest, ballots: RaireBallots, cvrs: CVRS
 ):
-    nebs = make_neb_matrix(contest, cvrs, asn_func)
+    nebs = make_neb_matrix(contest, ballots, asn_func)
     frontier = make_frontier(contest, ballots, nebs, asn_func)
 
     lowerbound = -10.0
@@ -232,7 +232,7 @@ def test_find_assertions_many_children(
     newn.estimate = 0.0006
     newn.expandable = True
 
-    frontier.nodes.insert(0, newn)
+    frontier.insert_node(newn)
     assert find_assertions(contest, ballots, nebs, asn_func, frontier, lowerbound, 0)
 
 
@@ -426,6 +426,74 @@ def test_raire_recount():
     assert res == []
 
 
+def random_irv_contest(seed: int) -> tuple[Contest, CVRS]:
+    rand = np.random.default_rng(seed)
+    num_candidates = int(rand.integers(3, 7))
+    candidates = [f"cand{i}" for i in range(num_candidates)]
+    popularity = rand.dirichlet(np.ones(num_candidates) * 2)
+    cvrs: CVRS = {}
+    for i in range(int(rand.integers(50, 300))):
+        num_ranked = rand.integers(1, num_candidates + 1)
+        ranked = rand.choice(
+            num_candidates, size=num_ranked, replace=False, p=popularity
+        )
+        cvrs[f"Ballot {i}"] = {
+            "Contest A": {
+                candidates[cand]: rank + 1 for rank, cand in enumerate(ranked)
+            }
+        }
+
+    contest = Contest(
+        "Contest A",
+        {
+            **{cand: 1 for cand in candidates},
+            "ballots": len(cvrs),
+            "numWinners": 1,
+            "votesAllowed": 1,
+        },
+    )
+
+    # Run the IRV tabulation to find the winner
+    ballots = RaireBallots.from_cvrs(contest, cvrs)
+    eliminated: set[str] = set()
+    while len(eliminated) < num_candidates - 1:
+        tallies = ballots.tallies(eliminated)
+        eliminated.add(
+            min(
+                (cand for cand in candidates if cand not in eliminated),
+                key=lambda cand: (tallies[cand], cand),
+            )
+        )
+    [winner] = [cand for cand in candidates if cand not in eliminated]
+    contest.winners = {winner: 1}
+    return contest, cvrs
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_raire_matches_list_frontier(seed: int, monkeypatch):
+    contest, cvrs = random_irv_contest(seed)
+
+    def run_raire():
+        # Record the order in which nodes are evaluated during the search
+        evaluated = []
+
+        def record_find_best_audit(contest, ballots, nebs, node, asn_func):
+            evaluated.append(node.tail)
+            find_best_audit(contest, ballots, nebs, node, asn_func)
+
+        with monkeypatch.context() as patch:
+            patch.setattr(raire, "find_best_audit", record_find_best_audit)
+            assertions = compute_raire_assertions(contest, cvrs, asn_func)
+        return evaluated, [(str(a), a.difficulty) for a in assertions]
+
+    evaluated, assertions = run_raire()
+    monkeypatch.setattr(raire, "RaireFrontier", ListRaireFrontier)
+    expected_evaluated, expected_assertions = run_raire()
+
+    assert evaluated == expected_evaluated
+    assert sorted(assertions) == sorted(expected_assertions)
+
+
 @pytest.mark.skip("Makes test coverage very slow")
 def test_aspen_wrong_winner():
     input_file = RAIRE_INPUT_DIR + "SpecialCases/Aspen_2009_wrong_winner.raire"
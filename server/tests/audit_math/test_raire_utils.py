@@ -1,4 +1,5 @@
 from typing import Callable
+import itertools
 import pytest
 import numpy as np
 
@@ -61,6 +62,84 @@ def test_vote_for_eliminated_cand():
     assert raire_utils.vote_for_cand(cand, eliminated, ballot) == 0
 
 
+def random_ballots(seed: int) -> tuple[Contest, list[dict[str, int]]]:
+    rand = np.random.default_rng(seed)
+    candidates = ["A", "B", "C", "D", "E"]
+    contest = Contest(
+        "Contest A",
+        {
+            **{cand: 200 for cand in candidates},
+            "ballots": 1000,
+            "numWinners": 1,
+            "votesAllowed": 1,
+        },
+    )
+    ballots = []
+    for _ in range(1000):
+        # Include partial rankings, tied rankings, and names that aren't
+        # candidates in the contest
+        names = candidates + ["Write-in"]
+        ranked = rand.permutation(names)[: rand.integers(0, len(names) + 1)]
+        ballots.append(
+            {
+                str(cand): int(rand.integers(0, 4)) if rand.random() < 0.2 else i + 1
+                for i, cand in enumerate(ranked)
+            }
+        )
+    return contest, ballots
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_raire_ballots_tallies(seed: int):
+    contest, ballots = random_ballots(seed)
+    raire_ballots = raire_utils.RaireBallots(contest, ballots)
+    assert raire_ballots.weights.sum() == len(ballots)
+    assert len(raire_ballots.weights) < len(ballots)
+
+    for num_eliminated in range(len(contest.candidates) + 1):
+        for eliminated in itertools.combinations(contest.candidates, num_eliminated):
+            tallies = raire_ballots.tallies(set(eliminated))
+            for cand in contest.candidates:
+                assert tallies[cand] == sum(
+                    raire_utils.vote_for_cand(cand, set(eliminated), ballot)
+                    for ballot in ballots
+                )
+            # Tallies are memoized by the set of eliminated candidates
+            assert raire_ballots.tallies(set(reversed(eliminated))) is tallies
+
+    for winner in contest.candidates:
+        for loser in contest.candidates:
+            if winner == loser:
+                continue
+            assertion = NEBAssertion(contest.name, winner, loser)
+            cvrs = [{contest.name: ballot} for ballot in ballots]
+            assert raire_ballots.neb_tallies(winner, loser) == (
+                sum(assertion.is_vote_for_winner(cvr) for cvr in cvrs),
+                sum(assertion.is_vote_for_loser(cvr) for cvr in cvrs),
+            )
+
+
+def test_raire_ballots_from_cvrs(contest: Contest, cvrs: CVRS):
+    cvrs = {
+        **cvrs,
+        "Ballot without contest": {"Contest B": {"winner": 1}},
+        "Ballot without CVR": None,
+    }
+    raire_ballots = raire_utils.RaireBallots.from_cvrs(contest, cvrs)
+    assert list(raire_ballots.columns) == ["winner", "loser", "loser2"]
+    assert raire_ballots.weights.tolist() == [25000, 25000, 30000, 20000]
+    assert raire_ballots.tallies(set()) == {
+        "winner": 50000,
+        "loser": 30000,
+        "loser2": 20000,
+    }
+    assert raire_ballots.tallies({"loser2"}) == {
+        "winner": 70000,
+        "loser": 30000,
+        "loser2": 0,
+    }
+
+
 def test_raire_assertion_comparator():
     contest = Contest(
         "Contest A",
@@ -321,6 +400,95 @@ def test_raire_frontier():
     assert str(other) == str([node3, node3])
 
 
+class ListRaireFrontier:
+    """
+    The original list-based frontier, which the heap-based RaireFrontier
+    should match exactly.
+    """
+
+    def __init__(self):
+        self.nodes: list[raire_utils.RaireNode] = []
+
+    def insert_node(self, node: raire_utils.RaireNode):
+        if not node.expandable:
+            self.nodes.append(node)
+
+        elif node.estimate == np.inf:
+            self.nodes.insert(0, node)
+
+        else:
+            i = 0
+            while i < len(self.nodes):
+                n_est = self.nodes[i].estimate
+
+                if n_est <= node.estimate:
+                    break
+
+                i += 1
+
+            self.nodes.insert(i, node)
+
+    def first_node(self) -> raire_utils.RaireNode:
+        return self.nodes[0]
+
+    def pop_first_node(self) -> raire_utils.RaireNode:
+        return self.nodes.pop(0)
+
+    def max_estimate(self) -> float:
+        return max(node.estimate for node in self.nodes)
+
+    def replace_descendents(self, node: raire_utils.RaireNode):
+        self.nodes = [
+            other_node
+            for other_node in self.nodes
+            if not other_node.is_descendent_of(node)
+        ]
+        self.insert_node(node)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_raire_frontier_matches_list_frontier(seed: int):
+    rand = np.random.default_rng(seed)
+    candidates = ["a", "b", "c", "d", "e"]
+    # Use a few distinct estimates so there are lots of ties
+    estimates = [np.inf, 1, 2, 3, 4, 5]
+
+    frontier = raire_utils.RaireFrontier()
+    expected = ListRaireFrontier()
+    inserted: list[raire_utils.RaireNode] = []
+    for _ in range(300):
+        op = rand.choice(["insert", "replace", "pop"], p=[0.6, 0.2, 0.2])
+        if op == "pop":
+            if not expected.nodes:
+                continue
+            assert frontier.pop_first_node() is expected.pop_first_node()
+            continue
+
+        if op == "replace" and inserted and rand.random() < 0.5:
+            node = inserted[rand.integers(len(inserted))]
+        else:
+            tail_length = rand.integers(1, len(candidates) + 1)
+            node = raire_utils.RaireNode(
+                [str(cand) for cand in rand.permutation(candidates)[:tail_length]]
+            )
+            node.expandable = bool(tail_length < len(candidates) or rand.random() < 0.1)
+            node.estimate = estimates[rand.integers(len(estimates))]
+            inserted.append(node)
+
+        if op == "insert":
+            frontier.insert_node(node)
+            expected.insert_node(node)
+        else:
+            frontier.replace_descendents(node)
+            expected.replace_descendents(node)
+
+        assert [id(node) for node in frontier.nodes] == [
+            id(node) for node in expected.nodes
+        ]
+        assert frontier.first_node() is expected.first_node()
+        assert frontier.max_estimate() == expected.max_estimate()
+
+
 def test_find_best_audit_simple():
     contest = Contest(
         "Contest A",
@@ -335,9 +503,9 @@ def test_find_best_audit_simple():
 
     ballots = []
     for _ in range(60000):
-        ballots.append({"Contest A": {"winner": 1, "loser": 2}})
+        ballots.append({"winner": 1, "loser": 2})
     for _ in range(40000):
-        ballots.append({"Contest A": {"winner": 2, "loser": 1}})
+        ballots.append({"winner": 2, "loser": 1})
 
     neb_matrix = {
         "winner": {"loser": raire_utils.NEBAssertion("Contest A", "winner", "loser")},
@@ -349,7 +517,9 @@ def test_find_best_audit_simple():
     def asn_func(m):
         return 1 / m if m > 0 else np.inf
 
-    raire_utils.find_best_audit(contest, ballots, neb_matrix, tree, asn_func)
+    raire_utils.find_best_audit(
+        contest, raire_utils.RaireBallots(contest, ballots), neb_matrix, tree, asn_func
+    )
 
     expected = raire_utils.NEBAssertion("Contest A", "winner", "loser")
 
@@ -442,7 +612,7 @@ def cvrs() -> CVRS:
 
 
 @pytest.fixture
-def ballots() -> list[dict[str, int]]:
+def ballots(contest: Contest) -> raire_utils.RaireBallots:
     ballots = []
     for _ in range(25000):
         ballots.append({"winner": 1, "loser": 2, "loser2": 3})
@@ -453,7 +623,7 @@ def ballots() -> list[dict[str, int]]:
     for _ in range(20000):
         ballots.append({"winner": 2, "loser": 3, "loser2": 1})
 
-    return ballots
+    return raire_utils.RaireBallots(contest, ballots)
 
 
 def asn_func(m):
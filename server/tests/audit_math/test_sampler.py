@@ -1,5 +1,7 @@
+import json
 import random
 import pytest
+import consistent_sampler
 from ...audit_math import sampler
 from ...audit_math.sampler_contest import Contest
 
@@ -235,6 +237,59 @@ def test_draw_macro_contest_not_in_any_batches(macro_batches):
     assert sample == []
 
 
+def test_draw_macro_sample_from_last_tickets():
+    rand = random.Random(12345)
+    batches = {}
+    for i in range(100):
+        winner_votes = rand.randint(0, 100)
+        batches[("Jx 1", f"pct {i}")] = {
+            CONTEST_NAME: {
+                "cand1": winner_votes,
+                "cand2": 100 - winner_votes,
+                "ballots": 100,
+            }
+        }
+    contest = Contest(
+        CONTEST_NAME,
+        {
+            "cand1": sum(batch[CONTEST_NAME]["cand1"] for batch in batches.values()),
+            "cand2": sum(batch[CONTEST_NAME]["cand2"] for batch in batches.values()),
+            "ballots": 100 * len(batches),
+            "numWinners": 1,
+            "votesAllowed": 1,
+        },
+    )
+
+    previously_sampled_batch_keys: list[sampler.BatchKey] = []
+    last_tickets: dict[sampler.BatchKey, str] = {}
+    # The last round's cumulative sample size requires a full hand tally
+    for sample_size in [10, 15, 20, 25, 100]:
+        sample = sampler.draw_ppeb_sample(
+            SEED,
+            contest,
+            sample_size,
+            previously_sampled_batch_keys,
+            batches,
+        )
+        sample_from_last_tickets = sampler.draw_ppeb_sample(
+            SEED,
+            contest,
+            sample_size,
+            previously_sampled_batch_keys,
+            batches,
+            last_tickets=last_tickets,
+        )
+        assert sample_from_last_tickets == sample
+
+        previously_sampled_batch_keys += [batch_key for _, batch_key in sample]
+        last_tickets.update(
+            {batch_key: ticket_number for ticket_number, batch_key in sample}
+        )
+
+    # Make sure we actually sampled some batches more than once
+    assert len(set(previously_sampled_batch_keys)) < len(previously_sampled_batch_keys)
+
+
 def random_manifest():
     rand = random.Random(12345)
     return {
@@ -249,3 +304,97 @@ def test_ballot_labels():
         sample = sampler.draw_sample(SEED, manifest, 100, 0)
         for _, (batch, ballot_number), _ in sample:
             assert 1 <= ballot_number <= max(manifest[batch])
+
+
+def test_draw_sample_matches_consistent_sampler():
+    # draw_sample only passes the ballots with the smallest tickets to
+    # consistent_sampler, so check that it draws exactly the same sample as
+    # passing consistent_sampler the full manifest.
+    rand = random.Random(314159)
+    for _ in range(200):
+        manifest = {
+            (
+                f"J{rand.randint(1, 3)}",
+                rand.choice([None, "TABULATOR1"]),
+                f"Batch {n} 😊",
+            ): rand.sample(range(1, 100), rand.randint(1, 20))
+            for n in range(rand.randint(1, 10))
+        }
+        ballots = [
+            (batch, ballot_position)
+            for batch, ballot_positions in manifest.items()
+            for ballot_position in ballot_positions
+        ]
+        seed = str(rand.getrandbits(64))
+        sample_size = rand.randint(0, len(ballots) + 5)
+        num_sampled = rand.randint(0, 20)
+        with_replacement = rand.choice([True, False])
+
+        expected_sample = list(
+            consistent_sampler.sampler(
+                ballots,
+                seed=seed,
+                take=sample_size + num_sampled,
+                with_replacement=with_replacement,
+                output="tuple",
+                digits=18,
+            )
+        )[num_sampled:]
+        assert (
+            sampler.draw_sample(
+                seed, manifest, sample_size, num_sampled, with_replacement
+            )
+            == expected_sample
+        )
+
+
+def test_draw_sample_with_range_manifest():
+    manifest = {"pct 1": list(range(1, 26)), "pct 2": list(range(1, 26))}
+    assert sampler.draw_sample(SEED, manifest, 20) == sampler.draw_sample(
+        SEED, {batch: range(1, 26) for batch in manifest}, 20
+    )
+
+
+@pytest.mark.parametrize("with_replacement", [True, False])
+def test_draw_sample_from_frontier(with_replacement):
+    manifest = {("J1", None, f"Batch {n}"): list(range(1, 101)) for n in range(1, 21)}
+    frontier = None
+    num_sampled = 0
+    # Later rounds sometimes need more ballots than the saved frontier's pool
+    # has, in which case the frontier is rebuilt
+    for sample_size in [10, 5, 30, 100, 0, 400]:
+        sample, frontier = sampler.draw_sample_from_frontier(
+            SEED,
+            manifest,
+            sample_size,
+            num_sampled,
+            with_replacement,
+            # Round trip through JSON, like when it's stored in the db
+            frontier=frontier
+            and sampler.load_frontier(json.loads(json.dumps(frontier))),
+        )
+        assert sample == sampler.draw_sample(
+            SEED, manifest, sample_size, num_sampled, with_replacement
+        )
+        num_sampled += sample_size
+        assert frontier["num_drawn"] == num_sampled
+
+    # A frontier that doesn't match the number of tickets previously drawn is
+    # ignored
+    sample, _ = sampler.draw_sample_from_frontier(
+        SEED, manifest, 10, 5, with_replacement, frontier=frontier
+    )
+    assert sample == sampler.draw_sample(SEED, manifest, 10, 5, with_replacement)
+
+
+def test_manifest_fingerprint():
+    manifest = {"pct 1": list(range(1, 26)), "pct 2": list(range(1, 26))}
+    fingerprint = sampler.manifest_fingerprint(SEED, manifest, True)
+    assert fingerprint == sampler.manifest_fingerprint(
+        SEED, {"pct 2": range(1, 26), "pct 1": range(1, 26)}, True
+    )
+    assert fingerprint != sampler.manifest_fingerprint(SEED, manifest, False)
+    assert fingerprint != sampler.manifest_fingerprint("1234", manifest, True)
+    assert fingerprint != sampler.manifest_fingerprint(
+        SEED, {"pct 1": list(range(1, 26)), "pct 2": list(range(1, 25))}, True
+    )
@@ -1,12 +1,15 @@
 from decimal import Decimal
 from itertools import product
+import numpy as np
 import pytest
+import scipy as sp
 
 
 from ...audit_math.sampler_contest import Contest
 from ...audit_math.suite import (
     BallotPollingStratum,
     BallotComparisonStratum,
+    brentq_vectorized,
     compute_risk,
     get_sample_size,
     HybridPair,
@@ -257,6 +260,76 @@ def test_fishers_combined():
     assert not res
 
 
+def test_brentq_vectorized():
+    rand = np.random.default_rng(12345)
+    roots = rand.uniform(-10, 10, 200)
+    scales = rand.uniform(0.1, 10, 200)
+    xa = roots - rand.uniform(0.001, 20, 200)
+    xb = roots + rand.uniform(0.001, 20, 200)
+
+    def f(x, indexes):
+        return scales[indexes] * (x - roots[indexes]) ** 3 + (x - roots[indexes])
+
+    vectorized_roots, converged = brentq_vectorized(f, xa, xb)
+    assert converged.all()
+    for i in range(len(roots)):
+        expected_root = sp.optimize.brentq(
+            lambda x: f(np.array([x]), np.array([i]))[0], xa[i], xb[i]
+        )
+        assert vectorized_roots[i] == expected_root
+
+    # Intervals without a sign change are left for brentq to handle
+    _, converged = brentq_vectorized(f, xb, xb + 1)
+    assert not converged.any()
+
+
+def test_vectorized_pvalues():
+    contest = Contest(
+        "ex1",
+        {
+            "winner": 5300,
+            "loser": 5100,
+            "ballots": 11000,
+            "numWinners": 1,
+            "votesAllowed": 1,
+        },
+    )
+    reported_margin = contest.candidates["winner"] - contest.candidates["loser"]
+    cvr_stratum = BallotComparisonStratum(
+        10000,
+        {"winner": 4550, "loser": 4950},
+        {("winner", "loser"): {"o1": 1, "o2": 0, "u1": 2, "u2": 0}},
+        sample_size=500,
+    )
+    bp_stratum = BallotPollingStratum(
+        1000,
+        {"winner": 750, "loser": 150},
+        {"ex1": {"winner": 187, "loser": 37}},
+        sample_size=250,
+    )
+
+    rand = np.random.default_rng(54321)
+    test_lambdas = np.arange(-3, 3, 0.01)
+    for stratum in [cvr_stratum, bp_stratum]:
+        pvalues = stratum.compute_pvalues(
+            reported_margin, "winner", "loser", test_lambdas
+        )
+        assert pvalues.shape == test_lambdas.shape
+        assert 0 <= pvalues.min() < pvalues.max() <= 1
+        # Each p-value is the same no matter which other lambdas it's
+        # computed with (or whether it's memoized)
+        for i in rand.choice(len(test_lambdas), 20, replace=False):
+            assert pvalues[i] == stratum.compute_pvalue(
+                reported_margin, "winner", "loser", test_lambdas[i]
+            )
+        assert (
+            stratum.compute_pvalues(
+                reported_margin, "winner", "loser", test_lambdas[::-7]
+            )
+            == pvalues[::-7]
+        ).all()
+
+
 def test_get_sample_size():
     contest_dict = {
         "winner": 1011000,
@@ -0,0 +1,109 @@
+import time
+import pytest
+
+from ... import config
+from ...audit_math import suite
+from ...audit_math.sampler_contest import Contest
+from ...audit_math.suite import (
+    BallotComparisonStratum,
+    BallotPollingStratum,
+    compute_risk,
+    get_sample_size,
+    HybridPair,
+)
+
+NUM_WINNERS = 3
+NUM_CANDIDATES = 10
+CVR_BALLOTS = 150_000
+NON_CVR_BALLOTS = 50_000
+
+
+def benchmark_contest() -> tuple[
+    Contest, BallotPollingStratum, BallotComparisonStratum
+]:
+    candidates = [f"candidate{i}" for i in range(NUM_CANDIDATES)]
+    # Give each winner and loser a bit fewer votes than the last, so that
+    # every winner-loser pair has a different margin
+    cvr_vote_totals = {
+        candidate: (
+            30_000 - 1_000 * i
+            if i < NUM_WINNERS
+            else 25_000 - 1_000 * (i - NUM_WINNERS)
+        )
+        for i, candidate in enumerate(candidates)
+    }
+    non_cvr_vote_totals = {
+        candidate: votes // 3 for candidate, votes in cvr_vote_totals.items()
+    }
+    contest = Contest(
+        "benchmark",
+        {
+            **{
+                candidate: cvr_vote_totals[candidate] + non_cvr_vote_totals[candidate]
+                for candidate in candidates
+            },
+            "ballots": CVR_BALLOTS + NON_CVR_BALLOTS,
+            "numWinners": NUM_WINNERS,
+            "votesAllowed": NUM_WINNERS,
+        },
+    )
+
+    # Set up strata as if we've already audited a first round, so that every
+    # winner-loser pair gets evaluated
+    bp_stratum = BallotPollingStratum(
+        NON_CVR_BALLOTS,
+        non_cvr_vote_totals,
+        {
+            "round1": {
+                candidate: votes * 100 // NON_CVR_BALLOTS
+                for candidate, votes in non_cvr_vote_totals.items()
+            }
+        },
+        sample_size=100,
+    )
+    cvr_stratum = BallotComparisonStratum(
+        CVR_BALLOTS,
+        cvr_vote_totals,
+        {
+            (winner, loser): {"o1": 1, "o2": 0, "u1": 0, "u2": 0}
+            for winner in contest.winners
+            for loser in contest.losers
+        },
+        sample_size=200,
+    )
+    return contest, bp_stratum, cvr_stratum
+
+
+def warm_up_worker(_):
+    # Importing this module in the worker process imports the suite module
+    time.sleep(0.5)
+
+
+# Benchmarks evaluating the winner-loser pairs of a multi-winner hybrid
+# contest with different numbers of worker processes, reporting the wall
+# clock time for each. Run with `pytest -s` to see the results.
+@pytest.mark.parametrize("num_workers", [1, 2, 4, 8])
+def test_suite_wl_pairs_benchmark(num_workers: int, monkeypatch):
+    contest, bp_stratum, cvr_stratum = benchmark_contest()
+
+    # Start up the pool before timing, since it's shared across contests
+    monkeypatch.setattr(config, "SUITE_WL_PAIR_WORKERS", num_workers)
+    if num_workers > 1:
+        executor = suite.wl_pair_executor(num_workers)
+        list(executor.map(warm_up_worker, range(num_workers)))
+
+    suite.pvalue_memo.cache_clear()
+    start = time.perf_counter()
+    risk = compute_risk(10, contest, bp_stratum, cvr_stratum)
+    sample_size = get_sample_size(10, contest, bp_stratum, cvr_stratum)
+    seconds = time.perf_counter() - start
+
+    # Results are the same no matter how many workers evaluate the pairs
+    assert risk == (0.9130752357160297, False)
+    assert sample_size == HybridPair(non_cvr=1121, cvr=3366)
+
+    num_pairs = len(contest.winners) * len(contest.losers)
+    print(
+        f"\n{num_workers} workers: evaluated {num_pairs} winner-loser pairs"
+        f" in {seconds:.3f}s"
+    )
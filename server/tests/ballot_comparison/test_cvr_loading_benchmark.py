@@ -0,0 +1,76 @@
+import io
+import pytest
+from flask.testing import FlaskClient
+
+from ...models import *
+from ..helpers import *
+from .conftest import TEST_CVRS
+from .test_cvrs import (
+    CLEARBALLOT_CVRS,
+    ESS_BALLOTS_1,
+    ESS_BALLOTS_2,
+    ESS_CVR,
+    HART_CVRS,
+)
+
+
+# Benchmarks loading each CVR fixture, reporting the rows/sec that
+# process_cvr_file achieved. Run with `pytest -s` to see the results.
+@pytest.mark.parametrize(
+    "cvr_file_type,manifests_fixture",
+    [
+        ("DOMINION", "manifests"),
+        ("CLEARBALLOT", "manifests"),
+        ("ESS", "ess_manifests"),
+        ("HART", "hart_manifests"),
+    ],
+)
+def test_cvr_loading_benchmark(
+    client: FlaskClient,
+    election_id: str,
+    jurisdiction_ids: list[str],
+    cvr_file_type: str,
+    manifests_fixture: str,
+    request,
+):
+    request.getfixturevalue(manifests_fixture)
+
+    cvr_files = {
+        "DOMINION": (io.BytesIO(TEST_CVRS.encode()), "text/csv"),
+        "CLEARBALLOT": (io.BytesIO(CLEARBALLOT_CVRS.encode()), "text/csv"),
+        "ESS": (
+            zip_cvrs(
+                [
+                    (io.BytesIO(ESS_CVR.encode()), "ess_cvr.csv"),
+                    (io.BytesIO(ESS_BALLOTS_1.encode()), "ess_ballots_1.csv"),
+                    (io.BytesIO(ESS_BALLOTS_2.encode()), "ess_ballots_2.csv"),
+                ]
+            ),
+            "application/zip",
+        ),
+        "HART": (zip_hart_cvrs(HART_CVRS), "application/zip"),
+    }
+    cvr_file, file_type = cvr_files[cvr_file_type]
+
+    set_logged_in_user(
+        client, UserType.JURISDICTION_ADMIN, default_ja_email(election_id)
+    )
+    rv = upload_cvrs(
+        client, cvr_file, election_id, jurisdiction_ids[0], cvr_file_type, file_type
+    )
+    assert_ok(rv)
+
+    jurisdiction = Jurisdiction.query.get(jurisdiction_ids[0])
+    task = jurisdiction.cvr_file.task
+    assert task.error is None
+    num_rows = (
+        CvrBallot.query.join(Batch).filter_by(jurisdiction_id=jurisdiction.id).count()
+    )
+    assert num_rows > 0
+
+    seconds = (task.completed_at - task.started_at).total_seconds()
+    rows_per_second = num_rows / seconds if seconds > 0 else float("inf")
+    print(
+        f"\n{cvr_file_type}: loaded {num_rows} rows in {seconds:.3f}s"
+        f" ({rows_per_second:.0f} rows/sec)"
+    )
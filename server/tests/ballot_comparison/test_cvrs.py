@@ -1,9 +1,15 @@
 import io
 import json
 from typing import TypedDict
+import pytest
 from flask.testing import FlaskClient
 
+from ... import config
+from ...api import cvrs as cvrs_api
+from ...api.cvrs import num_cvr_interpretation_columns, tally_cvr_interpretations
 from ...models import *
+from ...util.cvr_matrix import NOT_ON_BALLOT, CvrMatrixBuilder
+from ...worker.tasks import UserError
 from ..helpers import *
 from .conftest import TEST_CVRS
 
@@ -488,6 +494,117 @@ def test_cvrs_replace_as_audit_admin(
     assert json.loads(rv.data) == {"file": None, "processing": None}
 
 
+def test_cvrs_partition_swap(
+    client: FlaskClient,
+    election_id: str,
+    jurisdiction_ids: list[str],
+    manifests,
+):
+    def partition_row_counts():
+        return dict(
+            db_session.execute(
+                "SELECT tableoid::regclass::text, count(*) FROM cvr_ballot"
+                " GROUP BY tableoid"
+            ).fetchall()
+        )
+
+    partitions = [
+        cvrs_api.cvr_ballot_partition_name(jurisdiction_id)
+        for jurisdiction_id in jurisdiction_ids[:2]
+    ]
+    set_logged_in_user(client, UserType.AUDIT_ADMIN, DEFAULT_AA_EMAIL)
+    for jurisdiction_id in jurisdiction_ids[:2]:
+        rv = upload_cvrs(
+            client,
+            io.BytesIO(TEST_CVRS.encode()),
+            election_id,
+            jurisdiction_id,
+            "DOMINION",
+        )
+        assert_ok(rv)
+
+    num_cvr_ballots = len(TEST_CVRS.splitlines()) - 4
+    assert partition_row_counts() == {
+        partitions[0]: num_cvr_ballots,
+        partitions[1]: num_cvr_ballots,
+    }
+
+    # Replacing the CVRs swaps in a new partition, leaving other
+    # jurisdictions' partitions alone
+    rv = upload_cvrs(
+        client,
+        io.BytesIO("\n".join(TEST_CVRS.splitlines()[:-2]).encode()),
+        election_id,
+        jurisdiction_ids[0],
+        "DOMINION",
+    )
+    assert_ok(rv)
+    assert partition_row_counts() == {
+        partitions[0]: num_cvr_ballots - 2,
+        partitions[1]: num_cvr_ballots,
+    }
+
+    # Clearing the CVRs drops the partition
+    rv = client.delete(
+        f"/api/election/{election_id}/jurisdiction/{jurisdiction_ids[0]}/cvrs",
+    )
+    assert_ok(rv)
+    assert partition_row_counts() == {partitions[1]: num_cvr_ballots}
+    assert (
+        db_session.execute(
+            "SELECT to_regclass(:partition)", dict(partition=partitions[0])
+        ).scalar()
+        is None
+    )
+
+
+def test_cvrs_contest_index(
+    client: FlaskClient,
+    election_id: str,
+    jurisdiction_ids: list[str],
+    manifests,
+):
+    set_logged_in_user(client, UserType.AUDIT_ADMIN, DEFAULT_AA_EMAIL)
+    rv = upload_cvrs(
+        client,
+        io.BytesIO(TEST_CVRS.encode()),
+        election_id,
+        jurisdiction_ids[0],
+        "DOMINION",
+    )
+    assert_ok(rv)
+
+    jurisdiction = Jurisdiction.query.get(jurisdiction_ids[0])
+    contest_names = list(jurisdiction.cvr_contests_metadata.keys())
+    assert sorted(
+        index.cvr_contest_name
+        for index in CvrContestIndex.query.filter_by(
+            cvr_file_id=jurisdiction.cvr_file_id
+        )
+    ) == sorted(contest_names)
+
+    # The index should match which ballots have interpretations for each contest
+    for contest_name in contest_names:
+        presence = cvrs_api.cvr_contest_presence(jurisdiction, contest_name)
+        _, matrix = cvrs_api.cvr_contest_interpretations(jurisdiction, contest_name)
+        assert presence.batch_ids == matrix.batch_ids
+        assert presence.has_contest.tolist() == (
+            (matrix.interpretations != NOT_ON_BALLOT).any(axis=1).tolist()
+        )
+
+    assert cvrs_api.num_cvr_ballots(jurisdiction) == len(TEST_CVRS.splitlines()) - 4
+
+    # Clearing the CVRs clears the index
+    rv = client.delete(
+        f"/api/election/{election_id}/jurisdiction/{jurisdiction_ids[0]}/cvrs",
+    )
+    assert_ok(rv)
+    assert (
+        CvrContestIndex.query.filter_by(jurisdiction_id=jurisdiction_ids[0]).count()
+        == 0
+    )
+
+
 def test_cvrs_upload_missing_file(
     client: FlaskClient,
     election_id: str,
@@ -2238,6 +2355,53 @@ def test_hart_cvr_upload(
     )
 
 
+def test_hart_cvr_upload_parallel_parsing(
+    client: FlaskClient,
+    election_id: str,
+    jurisdiction_ids: list[str],
+    hart_manifests,
+    monkeypatch,
+):
+    # Parse the first jurisdiction's CVRs serially and the second's in parallel
+    for jurisdiction_id, num_workers in zip(jurisdiction_ids[:2], [1, 2]):
+        monkeypatch.setattr(config, "HART_CVR_PARSE_WORKERS", num_workers)
+        monkeypatch.setattr(cvrs_api, "MIN_HART_CVR_FILES_PER_WORKER", 1)
+        rv = upload_cvrs(
+            client,
+            zip_hart_cvrs(HART_CVRS),
+            election_id,
+            jurisdiction_id,
+            "HART",
+            "application/zip",
+        )
+        assert_ok(rv)
+
+    def cvr_data(jurisdiction_id: str):
+        jurisdiction = Jurisdiction.query.get(jurisdiction_id)
+        cvr_ballots = (
+            CvrBallot.query.join(Batch)
+            .filter_by(jurisdiction_id=jurisdiction_id)
+            .order_by(CvrBallot.imprinted_id)
+            .all()
+        )
+        return jurisdiction.cvr_contests_metadata, [
+            (
+                cvr.batch.name,
+                cvr.ballot_position,
+                cvr.record_id,
+                cvr.imprinted_id,
+                cvr.interpretations,
+            )
+            for cvr in cvr_ballots
+        ]
+
+    serial_metadata, serial_cvr_ballots = cvr_data(jurisdiction_ids[0])
+    parallel_metadata, parallel_cvr_ballots = cvr_data(jurisdiction_ids[1])
+    assert len(serial_cvr_ballots) == len(HART_CVRS)
+    assert parallel_metadata == serial_metadata
+    assert parallel_cvr_ballots == serial_cvr_ballots
+
+
 def test_hart_cvr_upload_with_scanned_ballot_information(
     client: FlaskClient,
     election_id: str,
@@ -3179,3 +3343,150 @@ def test_remove_ballot_manifest_fails_while_processing_cvr_file(
                 }
             ]
         }
+
+
+# The original row-by-row tally from process_cvr_file, which we keep around to
+# check that the vectorized tally produces identical results.
+def tally_cvr_interpretations_row_by_row(
+    contests_metadata: dict, interpretation_strs: list[str]
+):
+    for interpretations_str in interpretation_strs:
+        interpretations = interpretations_str.split(",")
+        contests_on_ballot = set()
+        for contest_name, contest_metadata in contests_metadata.items():
+            contest_interpretations = {
+                choice_name: interpretations[choice_metadata["column"]]
+                for choice_name, choice_metadata in contest_metadata["choices"].items()
+            }
+            if any(
+                interpretation == ""
+                for interpretation in contest_interpretations.values()
+            ):
+                continue
+            contests_on_ballot.add(contest_name)
+            if any(
+                interpretation in ["o", "u"]
+                for interpretation in contest_interpretations.values()
+            ):
+                continue
+            parsed_contest_interpretations = {
+                choice_name: int(interpretation)
+                for choice_name, interpretation in contest_interpretations.items()
+            }
+            votes = sum(parsed_contest_interpretations.values())
+            if votes > contest_metadata["votes_allowed"]:
+                continue
+            for (
+                choice_name,
+                parsed_interpretation,
+            ) in parsed_contest_interpretations.items():
+                contest_metadata["choices"][choice_name]["num_votes"] += (
+                    parsed_interpretation
+                )
+        for contest_name in contests_on_ballot:
+            contests_metadata[contest_name]["total_ballots_cast"] += 1
+
+
+def zeroed_contests_metadata(contests_metadata: dict) -> dict:
+    return {
+        contest_name: {
+            **contest_metadata,
+            "total_ballots_cast": 0,
+            "choices": {
+                choice_name: {**choice_metadata, "num_votes": 0}
+                for choice_name, choice_metadata in contest_metadata["choices"].items()
+            },
+        }
+        for contest_name, contest_metadata in contests_metadata.items()
+    }
+
+
+def vectorized_tally(
+    contests_metadata: dict, interpretation_strs: list[str], chunk_size: int
+):
+    builder = CvrMatrixBuilder(
+        num_cvr_interpretation_columns(contests_metadata),
+        chunk_size=chunk_size,
+        on_chunk=lambda interpretations, invalid_rows: tally_cvr_interpretations(
+            contests_metadata, interpretations, invalid_rows
+        ),
+    )
+    for record_id, interpretations_str in enumerate(interpretation_strs):
+        builder.add("batch", record_id, interpretations_str.split(","))
+    builder.build()
+
+
+def test_cvr_tally_matches_row_by_row_tally(
+    election_id: str,
+    jurisdiction_ids: list[str],
+    cvrs,
+):
+    for jurisdiction_id in jurisdiction_ids[:2]:
+        jurisdiction = Jurisdiction.query.get(jurisdiction_id)
+        interpretation_strs = [
+            cvr_ballot.interpretations
+            for cvr_ballot in CvrBallot.query.join(Batch)
+            .filter_by(jurisdiction_id=jurisdiction_id)
+            .order_by(CvrBallot.imprinted_id)
+        ]
+
+        expected_metadata = zeroed_contests_metadata(jurisdiction.cvr_contests_metadata)
+        tally_cvr_interpretations_row_by_row(expected_metadata, interpretation_strs)
+        assert expected_metadata == jurisdiction.cvr_contests_metadata
+
+        for chunk_size in [1, 2, 50_000]:
+            metadata = zeroed_contests_metadata(jurisdiction.cvr_contests_metadata)
+            vectorized_tally(metadata, interpretation_strs, chunk_size)
+            assert metadata == expected_metadata
+
+
+def test_cvr_tally_edge_cases():
+    contests_metadata = {
+        "Contest 1": {
+            "votes_allowed": 1,
+            "total_ballots_cast": 0,
+            "choices": {
+                "Choice 1-1": {"column": 0, "num_votes": 0},
+                "Choice 1-2": {"column": 1, "num_votes": 0},
+            },
+        },
+        "Contest 2": {
+            "votes_allowed": 2,
+            "total_ballots_cast": 0,
+            "choices": {
+                "Choice 2-1": {"column": 3, "num_votes": 0},
+                "Choice 2-2": {"column": 2, "num_votes": 0},
+                "Choice 2-3": {"column": 4, "num_votes": 0},
+            },
+        },
+    }
+    interpretation_strs = [
+        "0,1,1,1,0",
+        "1,1,1,0,0",  # Overvote in contest 1
+        ",,1,1,1",  # Contest 1 not on ballot, overvote in contest 2
+        "0,,0,0,1",  # Contest 1 partially blank
+        "o,0,u,0,0",  # ES&S overvote/undervote
+        "0,200,0,1,1",  # Out of range for the matrix
+        "1,-1,0,0,0",
+        " 1,0,0,2,0",
+        "0,1,0,0,o",
+        "1,0,,,",
+    ]
+    expected_metadata = zeroed_contests_metadata(contests_metadata)
+    tally_cvr_interpretations_row_by_row(expected_metadata, interpretation_strs)
+    for chunk_size in [1, 3, 50_000]:
+        metadata = zeroed_contests_metadata(contests_metadata)
+        vectorized_tally(metadata, interpretation_strs, chunk_size)
+        assert metadata == expected_metadata
+
+    # Invalid values are reported in row order, then contest order
+    for chunk_size in [1, 50_000]:
+        with pytest.raises(
+            UserError,
+            match="Unable to parse 'x' as an integer. Please export the CVR file with plain integer values.",
+        ):
+            vectorized_tally(
+                zeroed_contests_metadata(contests_metadata),
+                ["0,1,1,1,0", "o,y,0,x,0", "x,0,0,0,y", "z,0,0,0,0"],
+                chunk_size,
+            )
@@ -467,6 +467,20 @@ def test_batch_comparison_round_2(
     sampled_jurisdictions = {draw.batch.jurisdiction_id for draw in batch_draws}
     assert sampled_jurisdictions == set(jurisdiction_ids[:2])
 
+    # Check that we recorded the last ticket drawn for each sampled batch
+    last_tickets = SampledBatchLastTicket.query.filter_by(
+        round_id=rounds[1]["id"]
+    ).all()
+    assert {last_ticket.batch_id for last_ticket in last_tickets} == {
+        draw.batch_id for draw in batch_draws
+    }
+    for last_ticket in last_tickets:
+        assert last_ticket.ticket_number == max(
+            draw.ticket_number
+            for draw in batch_draws
+            if draw.batch_id == last_ticket.batch_id
+        )
+
     # Test the retrieval list correctly marks ballots that were sampled last round
     rv = client.get(
         f"/api/election/{election_id}/jurisdiction/{jurisdiction_ids[0]}/round/{rounds[1]['id']}/batches/retrieval-list"
@@ -21,6 +21,8 @@ from .helpers import (
     find_log,
 )
 from ..worker.tasks import (
+    DEFAULT_QUEUE,
+    FILE_PROCESSING_QUEUE,
     claim_next_task,
     create_background_task,
     background_task,
@@ -547,6 +549,94 @@ def test_lock_key(db_session):
     assert next_task_3.id == task1b.id
 
 
+def test_queues(db_session):
+    @background_task
+    def default_queue_task(election_id):
+        pass
+
+    @background_task(queue=FILE_PROCESSING_QUEUE)
+    def file_queue_task(election_id):
+        pass
+
+    default_task = create_background_task(
+        default_queue_task, dict(election_id="1"), db_session
+    )
+    file_task = create_background_task(
+        file_queue_task, dict(election_id="2"), db_session
+    )
+    assert default_task.queue == DEFAULT_QUEUE
+    assert file_task.queue == FILE_PROCESSING_QUEUE
+
+    # Workers only claim tasks from their own queues
+    next_task = claim_next_task("test_worker", db_session, [FILE_PROCESSING_QUEUE])
+    assert next_task.id == file_task.id
+    assert claim_next_task("test_worker", db_session, [FILE_PROCESSING_QUEUE]) is None
+
+    next_task = claim_next_task("test_worker", db_session, [DEFAULT_QUEUE])
+    assert next_task.id == default_task.id
+
+
+def test_claim_skips_locked_tasks(db_session):
+    @background_task
+    def skip_locked_task(election_id):
+        pass
+
+    task1 = create_background_task(skip_locked_task, dict(election_id="1"), db_session)
+    task2 = create_background_task(skip_locked_task, dict(election_id="2"), db_session)
+    db_session.commit()
+
+    # Simulate another worker in the middle of claiming task1
+    other_session = scoped_session(sessionmaker(bind=db_session.bind))
+    other_session.execute(
+        "SELECT * FROM background_task WHERE id = :id FOR UPDATE", dict(id=task1.id)
+    )
+
+    # Rather than waiting for the other worker, we claim the next task
+    next_task = claim_next_task("test_worker", db_session)
+    assert next_task.id == task2.id
+    assert claim_next_task("test_worker", db_session) is None
+
+    other_session.rollback()
+    next_task = claim_next_task("test_worker", db_session)
+    assert next_task.id == task1.id
+    other_session.close()
+
+
+def test_worker_notified_of_new_tasks(db_session):
+    context = multiprocessing.get_context()
+
+    @background_task
+    def notify_task(election_id):
+        pass
+
+    db_url = db_session.bind.url
+
+    def run_test_worker():
+        engine = sqlalchemy.create_engine(db_url)
+        db_session = scoped_session(
+            sessionmaker(autocommit=False, autoflush=True, bind=engine)
+        )
+        run_worker("test_worker", db_session, pause_between_tasks_seconds=60)
+
+    worker = context.Process(target=run_test_worker)
+    worker.start()
+    # Give the worker time to start waiting for tasks
+    time.sleep(1)
+
+    task = create_background_task(notify_task, dict(election_id="1"), db_session)
+    db_session.commit()
+
+    # The worker should pick up the task as soon as it's created, rather than
+    # waiting out its pause
+    start = time.time()
+    while db_session.query(BackgroundTask).get(task.id).completed_at is None:
+        assert time.time() - start < 10
+        time.sleep(0.1)
+        db_session.rollback()
+
+    worker.terminate()
+
+
 # The idea of this test is to create race conditions by having multiple tasks
 # per election that try to increment a counter in the database. If only one task
 # per election can run at a time, then the counter should end up equal to the
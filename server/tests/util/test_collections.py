@@ -1,4 +1,5 @@
 from ...util.collections import (
+    chunked,
     diff_file_lists_ignoring_order_and_case,
     find_first_duplicate,
     group_by,
@@ -20,6 +21,13 @@ def test_group_by():
     ) == {1: [{"a": 1, "b": 1}, {"a": 1, "b": 3}], 2: [{"a": 2, "b": 2}]}
 
 
+def test_chunked():
+    assert chunked([], 2) == []
+    assert chunked([1], 2) == [[1]]
+    assert chunked([1, 2], 2) == [[1, 2]]
+    assert chunked([1, 2, 3, 4, 5], 2) == [[1, 2], [3, 4], [5]]
+
+
 def test_find_first_duplicate():
     assert find_first_duplicate([]) is None
     assert find_first_duplicate([1]) is None
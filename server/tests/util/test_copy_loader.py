@@ -0,0 +1,74 @@
+import pytest
+from psycopg2.errors import UniqueViolation
+
+from ...database import engine
+from ...util.copy_loader import PipelinedCopyLoader
+
+COPY_SQL = "COPY copy_loader_test (id, name) FROM STDIN WITH (FORMAT CSV)"
+
+
+@pytest.fixture
+def connection():
+    connection = engine.raw_connection()
+    cursor = connection.cursor()
+    cursor.execute(
+        "CREATE TEMPORARY TABLE copy_loader_test (id INTEGER PRIMARY KEY, name TEXT)"
+    )
+    cursor.close()
+    yield connection
+    connection.rollback()
+    connection.close()
+
+
+def select_rows(connection):
+    cursor = connection.cursor()
+    cursor.execute("SELECT id, name FROM copy_loader_test ORDER BY id")
+    rows = cursor.fetchall()
+    cursor.close()
+    return rows
+
+
+def test_copy_loader(connection):
+    rows = [(i, f"name, with a comma {i}") for i in range(25)]
+    cursor = connection.cursor()
+    with PipelinedCopyLoader(cursor, COPY_SQL, chunk_size=7) as loader:
+        for row in rows:
+            loader.write_row(row)
+        loader.finish()
+    cursor.close()
+
+    assert loader.num_rows == 25
+    assert select_rows(connection) == rows
+
+
+def test_copy_loader_no_rows(connection):
+    cursor = connection.cursor()
+    with PipelinedCopyLoader(cursor, COPY_SQL) as loader:
+        loader.finish()
+    cursor.close()
+
+    assert select_rows(connection) == []
+
+
+def test_copy_loader_copy_error(connection):
+    cursor = connection.cursor()
+    with pytest.raises(UniqueViolation):
+        with PipelinedCopyLoader(cursor, COPY_SQL, chunk_size=2) as loader:
+            for row in [(1, "a"), (1, "b"), (2, "c"), (3, "d"), (4, "e")]:
+                loader.write_row(row)
+            loader.finish()
+    cursor.close()
+
+
+def test_copy_loader_producer_error(connection):
+    cursor = connection.cursor()
+    with pytest.raises(Exception, match="parse error"):
+        with PipelinedCopyLoader(cursor, COPY_SQL, chunk_size=2) as loader:
+            for row in [(1, "a"), (2, "b"), (3, "c")]:
+                loader.write_row(row)
+            raise Exception("parse error")
+    cursor.close()
+
+    # The copy thread should have stopped without copying the unfinished chunk
+    assert not loader.thread.is_alive()
+    assert select_rows(connection) == [(1, "a"), (2, "b")]
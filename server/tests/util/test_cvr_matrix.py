@@ -0,0 +1,149 @@
+import numpy as np
+
+from ...util.cvr_matrix import (
+    INVALID,
+    NOT_ON_BALLOT,
+    OVERVOTE,
+    UNDERVOTE,
+    ContestPresence,
+    CvrMatrixBuilder,
+    batch_offsets_from_bytes,
+    contest_column_range,
+    contest_presence,
+    contest_presence_bytes,
+    contest_presence_from_bytes,
+    decode_interpretation,
+    encode_interpretation,
+    interpretations_from_bytes,
+)
+
+
+def test_encode_decode_interpretation():
+    assert encode_interpretation("") == NOT_ON_BALLOT
+    assert encode_interpretation("o") == OVERVOTE
+    assert encode_interpretation("u") == UNDERVOTE
+    assert encode_interpretation("0") == 0
+    assert encode_interpretation("1") == 1
+    assert encode_interpretation("127") == 127
+    assert encode_interpretation("128") == INVALID
+    assert encode_interpretation("-1") == INVALID
+    assert encode_interpretation("1.0") == INVALID
+    assert encode_interpretation("x") == INVALID
+
+    for interpretation in ["", "o", "u", "0", "1", "127"]:
+        assert decode_interpretation(encode_interpretation(interpretation)) == (
+            interpretation
+        )
+
+
+def test_build_matrix():
+    builder = CvrMatrixBuilder(num_columns=3, chunk_size=2)
+    builder.add("batch-2", 2, ["0", "1", ""])
+    builder.add("batch-1", 10, ["1", "0", "u"])
+    builder.add("batch-2", 1, ["", "", "1"])
+    builder.add("batch-1", 3, ["o", "o", "0"])
+    # Short rows are padded, long rows are truncated
+    builder.add("batch-3", 5, ["1"])
+    builder.add("batch-3", 4, ["0", "0", "0", "1"])
+    matrix = builder.build()
+
+    assert matrix.batch_ids == ["batch-1", "batch-2", "batch-3"]
+    assert matrix.batch_offsets.tolist() == [0, 2, 4, 6]
+    assert matrix.num_ballots == 6
+    assert matrix.num_columns == 3
+    assert matrix.interpretations.flags.f_contiguous
+    assert matrix.interpretations.tolist() == [
+        [OVERVOTE, OVERVOTE, 0],
+        [1, 0, UNDERVOTE],
+        [NOT_ON_BALLOT, NOT_ON_BALLOT, 1],
+        [0, 1, NOT_ON_BALLOT],
+        [0, 0, 0],
+        [1, NOT_ON_BALLOT, NOT_ON_BALLOT],
+    ]
+
+    assert matrix.rows(
+        [("batch-2", 1), ("batch-1", 2), ("batch-1", 3), ("batch-4", 1)]
+    ).tolist() == [2, 1, -1, -1]
+
+
+def test_serialize_matrix():
+    builder = CvrMatrixBuilder(num_columns=4)
+    for record_id in range(5):
+        builder.add("batch-1", record_id, [str(record_id), "", "o", "1"])
+    matrix = builder.build()
+
+    data = bytes(matrix.interpretations_bytes())
+    assert len(data) == 5 * 4
+    assert np.array_equal(
+        interpretations_from_bytes(data, matrix.num_ballots, matrix.num_columns),
+        matrix.interpretations,
+    )
+    assert batch_offsets_from_bytes(matrix.batch_offsets_bytes()).tolist() == [0, 5]
+
+    # Columns for a single contest can be loaded from a byte range
+    start, end = contest_column_range([2, 1])
+    assert (start, end) == (1, 3)
+    contest_data = data[start * matrix.num_ballots : end * matrix.num_ballots]
+    assert np.array_equal(
+        interpretations_from_bytes(contest_data, matrix.num_ballots, end - start),
+        matrix.interpretations[:, start:end],
+    )
+
+
+def test_contest_presence():
+    builder = CvrMatrixBuilder(num_columns=4)
+    builder.add("batch-1", 1, ["1", "0", "", ""])
+    builder.add("batch-1", 2, ["", "", "0", "0"])
+    builder.add("batch-1", 3, ["u", "", "", ""])
+    for record_id in range(10):
+        builder.add("batch-2", record_id, ["0", "1", "1", "0"])
+    matrix = builder.build()
+
+    has_contest_1 = contest_presence(matrix.interpretations[:, [0, 1]])
+    assert has_contest_1.tolist() == [True, False, True] + [True] * 10
+    has_contest_2 = contest_presence(matrix.interpretations[:, [2, 3]])
+    assert has_contest_2.tolist() == [False, True, False] + [True] * 10
+
+    # Packed into one bit per ballot
+    data = contest_presence_bytes(has_contest_1)
+    assert len(data) == 2
+    assert np.array_equal(
+        contest_presence_from_bytes(data, matrix.num_ballots), has_contest_1
+    )
+
+    presence = ContestPresence(matrix.batch_ids, matrix.batch_offsets, has_contest_1)
+    assert presence.ballot_positions(0).tolist() == [1, 3]
+    assert presence.ballot_positions(1).tolist() == list(range(1, 11))
+
+    # No ballots
+    empty = np.zeros(0, dtype=bool)
+    assert contest_presence_from_bytes(contest_presence_bytes(empty), 0).tolist() == []
+
+
+def test_build_empty_matrix():
+    matrix = CvrMatrixBuilder(num_columns=2).build()
+    assert matrix.batch_ids == []
+    assert matrix.batch_offsets.tolist() == [0]
+    assert matrix.interpretations.shape == (0, 2)
+    assert matrix.rows([("batch-1", 1)]).tolist() == [-1]
+
+
+def test_build_matrix_in_chunks():
+    chunks = []
+    builder = CvrMatrixBuilder(
+        num_columns=2,
+        chunk_size=2,
+        on_chunk=lambda interpretations, invalid_rows: chunks.append(
+            (interpretations.tolist(), dict(invalid_rows))
+        ),
+    )
+    builder.add("batch-1", 1, ["1", "0"])
+    builder.add("batch-1", 2, ["x", "0"])
+    assert len(chunks) == 1
+    builder.add("batch-1", 3, ["0", "200"])
+    builder.build()
+
+    assert chunks == [
+        ([[1, 0], [INVALID, 0]], {1: ["x", "0"]}),
+        ([[0, INVALID]], {0: ["0", "200"]}),
+    ]
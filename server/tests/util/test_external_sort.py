@@ -0,0 +1,30 @@
+import random
+
+from ...util.external_sort import ExternalSorter
+
+
+def test_external_sort_spills_runs():
+    rng = random.Random(7)
+    items = [(rng.randrange(50), i) for i in range(2345)]
+    sorter = ExternalSorter(key=lambda item: item[0], run_size=100)
+    for item in items:
+        sorter.add(item)
+
+    assert len(sorter.run_files) == 23
+    # Items with equal keys stay in the order they were added
+    assert list(sorter.sorted()) == sorted(items, key=lambda item: item[0])
+    assert all(run_file.closed for run_file in sorter.run_files)
+
+
+def test_external_sort_in_memory():
+    sorter = ExternalSorter(key=lambda item: item)
+    for item in ["b", "c", "a"]:
+        sorter.add(item)
+
+    assert sorter.run_files == []
+    assert list(sorter.sorted()) == ["a", "b", "c"]
+
+
+def test_external_sort_empty():
+    sorter: ExternalSorter[int] = ExternalSorter(key=lambda item: item, run_size=1)
+    assert list(sorter.sorted()) == []
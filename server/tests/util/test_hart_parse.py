@@ -1,11 +1,18 @@
+import io
 from xml.etree.ElementTree import Element, ElementTree
+from zipfile import ZipFile
 import pytest
+from defusedxml.ElementTree import parse as parse_xml
 from ...util.hart_parse import (
+    HartCvr,
     find_text_xml,
     find_xml,
     findall_xml,
     parse_contest_results,
+    parse_cvr,
+    parse_cvr_zip_members,
 )
+from ...util.zip_archive import ZipMember
 
 
 @pytest.fixture
@@ -61,3 +68,105 @@ def test_parse_contest_results(namespace):
     results = parse_contest_results(cvr_xml)
     assert "Contest1" in results
     assert "Choice1" in results["Contest1"]
+
+
+CVR_XML = b"""<?xml version="1.0" encoding="utf-8"?>
+<Cvr xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xmlns="http://tempuri.org/CVRDesign.xsd">
+    <Contests>
+        <Contest>
+            <Name>Contest 1</Name>
+            <Id>contest-1</Id>
+            <Options>
+                <Option>
+                    <Name>Choice 1-1</Name>
+                    <Id>choice-1-1</Id>
+                    <Value>1</Value>
+                </Option>
+            </Options>
+        </Contest>
+        <Contest>
+            <Name>Contest 2</Name>
+            <Options>
+                <Option>
+                    <Name>Choice 2-1</Name>
+                    <Value>1</Value>
+                </Option>
+                <Option>
+                    <WriteInData>
+                        <Text /><ImageId>image-id</ImageId>
+                    </WriteInData>
+                    <Value>1</Value>
+                </Option>
+                <Option>
+                    <Name>Choice 2-2</Name>
+                    <WriteInData />
+                    <Value>1</Value>
+                </Option>
+            </Options>
+        </Contest>
+        <Contest>
+            <Name>Contest 3</Name>
+            <Options />
+        </Contest>
+    </Contests>
+    <BatchSequence>3</BatchSequence>
+    <SheetNumber>1</SheetNumber>
+    <PrecinctSplit>
+        <Name>100</Name>
+    </PrecinctSplit>
+    <BatchNumber>BATCH1</BatchNumber>
+    <CvrGuid>cvr-guid</CvrGuid>
+</Cvr>
+"""
+
+
+def test_parse_cvr():
+    expected = HartCvr(
+        cvr_guid="cvr-guid",
+        batch_number="BATCH1",
+        batch_sequence="3",
+        contest_results={
+            "Contest 1": {"Choice 1-1"},
+            "Contest 2": {"Choice 2-1", "Write-In", "Choice 2-2"},
+        },
+    )
+    assert parse_cvr(io.BytesIO(CVR_XML)) == expected
+
+    # Should match parsing the full tree
+    cvr_xml = parse_xml(io.BytesIO(CVR_XML))
+    assert expected == HartCvr(
+        cvr_guid=find_xml(cvr_xml, "CvrGuid").text,
+        batch_number=find_xml(cvr_xml, "BatchNumber").text,
+        batch_sequence=find_xml(cvr_xml, "BatchSequence").text,
+        contest_results=dict(parse_contest_results(cvr_xml)),
+    )
+
+
+def test_parse_cvr_zip_members(tmp_path):
+    wrapper_zip_file_path = str(tmp_path / "wrapper.zip")
+    with ZipFile(wrapper_zip_file_path, "w") as wrapper_zip_file:
+        for tabulator in ["tabulator-1", "tabulator-2"]:
+            zip_file = io.BytesIO()
+            with ZipFile(zip_file, "w") as tabulator_zip_file:
+                tabulator_zip_file.writestr("cvr-1.xml", CVR_XML)
+                tabulator_zip_file.writestr(
+                    "cvr-2.xml",
+                    CVR_XML.replace(b"cvr-guid", f"{tabulator}-cvr-guid".encode()),
+                )
+            wrapper_zip_file.writestr(f"{tabulator}.zip", zip_file.getvalue())
+        wrapper_zip_file.writestr("cvr-3.xml", CVR_XML)
+
+    hart_cvrs = parse_cvr_zip_members(
+        [
+            ZipMember(wrapper_zip_file_path, ("tabulator-1.zip",), "cvr-2.xml"),
+            ZipMember(wrapper_zip_file_path, ("tabulator-1.zip",), "cvr-1.xml"),
+            ZipMember(wrapper_zip_file_path, ("tabulator-2.zip",), "cvr-2.xml"),
+            ZipMember(wrapper_zip_file_path, (), "cvr-3.xml"),
+        ]
+    )
+    assert [hart_cvr.cvr_guid for hart_cvr in hart_cvrs] == [
+        "tabulator-1-cvr-guid",
+        "cvr-guid",
+        "tabulator-2-cvr-guid",
+        "cvr-guid",
+    ]
@@ -0,0 +1,78 @@
+import io
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
+import pytest
+
+from ...util.zip_archive import (
+    FileSlice,
+    open_zip_archive,
+    zip_file_names,
+)
+
+
+def build_zip(files: dict[str, bytes], compression=ZIP_DEFLATED) -> bytes:
+    buffer = io.BytesIO()
+    with ZipFile(buffer, "w", compression=compression) as zip_file:
+        for file_name, contents in files.items():
+            zip_file.writestr(file_name, contents)
+    return buffer.getvalue()
+
+
+def test_zip_file_names():
+    zip_file = build_zip(
+        {"a.xml": b"a", "__MACOSX/a.xml": b"", ".DS_Store": b"", "dir/b.xml": b"b"}
+    )
+    with ZipFile(io.BytesIO(zip_file)) as zip_archive:
+        assert zip_file_names(zip_archive) == ["a.xml", "dir/b.xml"]
+
+
+def test_file_slice():
+    file = io.BytesIO(b"0123456789")
+    file_slice = FileSlice(file, 2, 5)
+    assert file_slice.read() == b"23456"
+    assert file_slice.read() == b""
+    assert file_slice.seek(-2, io.SEEK_END) == 3
+    assert file_slice.read(10) == b"56"
+    file_slice.seek(1)
+    # Reads from the underlying file don't affect the slice's position
+    file.seek(0)
+    assert file_slice.read(2) == b"34"
+    assert file_slice.seek(1, io.SEEK_CUR) == 4
+    assert file_slice.read(1) == b"6"
+    with pytest.raises(ValueError):
+        file_slice.seek(-1)
+
+
+@pytest.mark.parametrize("nested_compression", [ZIP_STORED, ZIP_DEFLATED])
+def test_open_nested_zip_archive(tmp_path, nested_compression):
+    tabulator_1 = build_zip({"cvr-1.xml": b"cvr 1", "cvr-2.xml": b"cvr 2"})
+    tabulator_2 = build_zip({"cvr-3.xml": b"cvr 3"})
+    wrapper = tmp_path / "wrapper.zip"
+    with ZipFile(wrapper, "w") as wrapper_zip:
+        wrapper_zip.writestr("info.csv", b"a,b,c", compress_type=ZIP_DEFLATED)
+        wrapper_zip.writestr(
+            "tabulator-1.zip", tabulator_1, compress_type=nested_compression
+        )
+        wrapper_zip.writestr(
+            "tabulator-2.zip", tabulator_2, compress_type=nested_compression
+        )
+
+    with open_zip_archive(str(wrapper)) as zip_archive:
+        assert zip_file_names(zip_archive) == [
+            "info.csv",
+            "tabulator-1.zip",
+            "tabulator-2.zip",
+        ]
+
+    with open_zip_archive(str(wrapper), ("tabulator-1.zip",)) as zip_archive:
+        assert zip_file_names(zip_archive) == ["cvr-1.xml", "cvr-2.xml"]
+        # Members of the nested ZIP can be read in any order, interleaved
+        with (
+            zip_archive.open("cvr-2.xml") as cvr_2,
+            zip_archive.open("cvr-1.xml") as cvr_1,
+        ):
+            assert cvr_2.read(3) == b"cvr"
+            assert cvr_1.read() == b"cvr 1"
+            assert cvr_2.read() == b" 2"
+
+    with open_zip_archive(str(wrapper), ("tabulator-2.zip",)) as zip_archive:
+        assert zip_archive.read("cvr-3.xml") == b"cvr 3"
@@ -14,6 +14,11 @@ def group_by(items: Iterable[T], key=None):
     return {k: list(vs) for k, vs in group_by_iter(items, key=key)}
 
 
+# chunked splits a list into consecutive lists of at most chunk_size items.
+def chunked(items: list[T], chunk_size: int) -> list[list[T]]:
+    return [items[i : i + chunk_size] for i in range(0, len(items), chunk_size)]
+
+
 # find_first_duplicate returns the first item in a collection that is a duplicate.
 def find_first_duplicate(list: Iterable[T]) -> T | None:
     seen = set()
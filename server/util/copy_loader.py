@@ -0,0 +1,107 @@
+import csv
+import io
+import queue
+import threading
+from typing import Any, Sequence
+
+# Number of rows to buffer before sending them to the database
+COPY_CHUNK_SIZE = 100_000
+# Number of full chunks that can be waiting to be copied before write_row
+# blocks, which bounds how much memory the loader uses if parsing outpaces
+# loading
+MAX_PENDING_CHUNKS = 2
+
+
+class PipelinedCopyLoader:
+    """
+    Loads rows into the database using the COPY command, in chunks, while the
+    caller continues producing rows.
+
+    Rows are buffered as CSV in memory. Each time a chunk fills up, it's handed
+    off to a background thread that runs COPY ... FROM STDIN for that chunk,
+    so parsing the next chunk overlaps with loading the previous one. All
+    chunks are copied using the given DB-API cursor, so they are part of the
+    cursor's transaction. The caller must not use the cursor's connection
+    until finish() returns.
+
+    Usage:
+        with PipelinedCopyLoader(cursor, copy_sql) as loader:
+            for row in rows:
+                loader.write_row(row)
+            loader.finish()
+    """
+
+    def __init__(
+        self,
+        cursor,
+        copy_sql: str,
+        chunk_size: int = COPY_CHUNK_SIZE,
+        max_pending_chunks: int = MAX_PENDING_CHUNKS,
+    ):
+        self.cursor = cursor
+        self.copy_sql = copy_sql
+        self.chunk_size = chunk_size
+        self.num_rows = 0
+        self.chunks: queue.Queue[io.StringIO | None] = queue.Queue(
+            maxsize=max_pending_chunks
+        )
+        self.error: Exception | None = None
+        self.thread = threading.Thread(target=self._copy_chunks, daemon=True)
+        self._start_chunk()
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # If the caller errored before finishing, stop the copy thread
+        if self.thread.is_alive():
+            self.chunks.put(None)
+            self.thread.join()
+
+    def _start_chunk(self):
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+        self.num_rows_in_chunk = 0
+
+    def _copy_chunks(self):
+        while True:
+            chunk = self.chunks.get()
+            if chunk is None:
+                return
+            # Once a chunk fails, the transaction is aborted, so we just drain
+            # the queue until the producer notices the error
+            if self.error is not None:
+                continue
+            try:
+                chunk.seek(0)
+                self.cursor.copy_expert(self.copy_sql, chunk)
+            except Exception as error:
+                self.error = error
+
+    def _raise_if_errored(self):
+        if self.error is not None:
+            raise self.error
+
+    def _flush(self):
+        if self.num_rows_in_chunk > 0:
+            self.chunks.put(self.buffer)
+            self._start_chunk()
+
+    def write_row(self, row: Sequence[Any]):
+        self._raise_if_errored()
+        self.writer.writerow(row)
+        self.num_rows += 1
+        self.num_rows_in_chunk += 1
+        if self.num_rows_in_chunk >= self.chunk_size:
+            self._flush()
+
+    def finish(self):
+        """
+        Copies any remaining buffered rows and waits for all chunks to be
+        copied, raising the first error that occurred while copying.
+        """
+        self._flush()
+        self.chunks.put(None)
+        self.thread.join()
+        self._raise_if_errored()
@@ -0,0 +1,267 @@
+"""
+Columnar storage for CVR interpretations.
+
+Each row of a CVR file records an interpretation for every contest choice
+column (e.g. "1,0,,0,1"). Rather than re-splitting that string every time the
+audit math needs it, we encode all of a jurisdiction's ballots once, at upload
+time, into a packed int8 matrix with one row per ballot and one column per
+contest choice.
+
+The matrix is stored column-major (i.e. all ballots' values for column 0, then
+all ballots' values for column 1, ...) so that the columns for a single
+contest are a contiguous byte range that can be read without loading the rest
+of the matrix. Rows are ordered by batch and then by record id, which means
+that a ballot's row is simply its batch's row offset plus its
+ballot_position - 1.
+"""
+
+from typing import Callable, Iterable, NamedTuple
+import numpy as np
+
+# Interpretation values are stored as int8s. Non-negative values are the parsed
+# vote counts from the CVR; negative values are sentinels for the special cases
+# we see in CVRs.
+NOT_ON_BALLOT = -1  # Empty string - the contest wasn't on the ballot
+OVERVOTE = -2  # "o" - ES&S overvote
+UNDERVOTE = -3  # "u" - ES&S undervote
+INVALID = -128  # A value that couldn't be parsed as a small integer
+
+MAX_INTERPRETATION_VALUE = 127
+
+INTERPRETATION_DTYPE = np.int8
+BATCH_OFFSET_DTYPE = np.int32
+
+# Number of ballots to buffer in each chunk while building the matrix
+CHUNK_SIZE = 50_000
+
+_ENCODED_VALUES = {
+    "": NOT_ON_BALLOT,
+    "o": OVERVOTE,
+    "u": UNDERVOTE,
+    **{str(value): value for value in range(MAX_INTERPRETATION_VALUE + 1)},
+}
+
+_DECODED_VALUES = {
+    NOT_ON_BALLOT: "",
+    OVERVOTE: "o",
+    UNDERVOTE: "u",
+}
+
+
+def encode_interpretation(interpretation: str) -> int:
+    encoded = _ENCODED_VALUES.get(interpretation)
+    if encoded is not None:
+        return encoded
+    try:
+        value = int(interpretation)
+    except ValueError:
+        return INVALID
+    return value if 0 <= value <= MAX_INTERPRETATION_VALUE else INVALID
+
+
+def decode_interpretation(value: int) -> str:
+    assert value != INVALID, "Can't decode an invalid interpretation"
+    return _DECODED_VALUES.get(value, str(value))
+
+
+class CvrMatrix(NamedTuple):
+    # Batch ids, in the order their rows appear in the matrix
+    batch_ids: list[str]
+    # Row index of the first ballot of each batch, plus a final entry with the
+    # total number of ballots (so batch i spans rows offsets[i]:offsets[i+1])
+    batch_offsets: np.ndarray
+    # Shape (num_ballots, num_columns), laid out column-major in memory
+    interpretations: np.ndarray
+
+    @property
+    def num_ballots(self) -> int:
+        return int(self.interpretations.shape[0])
+
+    @property
+    def num_columns(self) -> int:
+        return int(self.interpretations.shape[1])
+
+    def interpretations_bytes(self) -> memoryview:
+        # The transpose of a column-major matrix is row-major, so we can
+        # serialize it without copying
+        return np.ascontiguousarray(self.interpretations.T).data
+
+    def batch_offsets_bytes(self) -> bytes:
+        return self.batch_offsets.astype(BATCH_OFFSET_DTYPE).tobytes()
+
+    def rows(self, ballots: Iterable[tuple[str, int]]) -> np.ndarray:
+        """
+        Returns the row index for each (batch_id, ballot_position) pair, or -1
+        if there is no ballot at that position in the CVR.
+        """
+        batch_indexes = {batch_id: i for i, batch_id in enumerate(self.batch_ids)}
+        rows = []
+        for batch_id, ballot_position in ballots:
+            batch_index = batch_indexes.get(batch_id)
+            if batch_index is None:
+                rows.append(-1)
+                continue
+            start, end = self.batch_offsets[batch_index : batch_index + 2]
+            row = start + ballot_position - 1
+            rows.append(int(row) if start <= row < end else -1)
+        return np.array(rows, dtype=np.int64)
+
+
+class CvrMatrixBuilder:
+    """
+    Accumulates encoded CVR rows in fixed-size chunks and sorts them into a
+    CvrMatrix once all rows have been added.
+
+    If on_chunk is provided, it's called with each chunk of rows (in the order
+    they were added) once the chunk is complete, along with the raw
+    interpretations of any rows in the chunk that had INVALID values, keyed by
+    row index within the chunk.
+    """
+
+    def __init__(
+        self,
+        num_columns: int,
+        chunk_size: int = CHUNK_SIZE,
+        on_chunk: Callable[[np.ndarray, dict[int, list[str]]], None] | None = None,
+    ):
+        self.num_columns = num_columns
+        self.chunk_size = chunk_size
+        self.on_chunk = on_chunk
+        self.batch_ids: dict[str, int] = {}
+        self.chunks: list[np.ndarray] = []
+        self.batch_indexes: list[np.ndarray] = []
+        self.record_ids: list[np.ndarray] = []
+        self.invalid_rows: dict[int, list[str]] = {}
+        self.num_rows_in_chunk = chunk_size  # Start a new chunk on first add
+
+    def _start_chunk(self):
+        self.chunks.append(
+            np.empty((self.chunk_size, self.num_columns), dtype=INTERPRETATION_DTYPE)
+        )
+        self.batch_indexes.append(np.empty(self.chunk_size, dtype=np.int64))
+        self.record_ids.append(np.empty(self.chunk_size, dtype=np.int64))
+        self.invalid_rows = {}
+        self.num_rows_in_chunk = 0
+
+    def _finish_chunk(self):
+        if self.on_chunk is not None and self.num_rows_in_chunk > 0:
+            self.on_chunk(self.chunks[-1][: self.num_rows_in_chunk], self.invalid_rows)
+
+    def add(self, batch_id: str, record_id: int, interpretations: list[str]):
+        if self.num_rows_in_chunk == self.chunk_size:
+            self._start_chunk()
+        i = self.num_rows_in_chunk
+        row = self.chunks[-1][i]
+        encoded = [
+            encode_interpretation(interpretation)
+            for interpretation in interpretations[: self.num_columns]
+        ]
+        if INVALID in encoded:
+            self.invalid_rows[i] = interpretations
+        # Pad rows that are missing trailing columns as not on ballot
+        row[len(encoded) :] = NOT_ON_BALLOT
+        row[: len(encoded)] = encoded
+        self.batch_indexes[-1][i] = self.batch_ids.setdefault(
+            batch_id, len(self.batch_ids)
+        )
+        self.record_ids[-1][i] = record_id
+        self.num_rows_in_chunk += 1
+        if self.num_rows_in_chunk == self.chunk_size:
+            self._finish_chunk()
+
+    def build(self) -> CvrMatrix:
+        if len(self.chunks) > 0 and self.num_rows_in_chunk < self.chunk_size:
+            self._finish_chunk()
+            self.chunks[-1] = self.chunks[-1][: self.num_rows_in_chunk]
+            self.batch_indexes[-1] = self.batch_indexes[-1][: self.num_rows_in_chunk]
+            self.record_ids[-1] = self.record_ids[-1][: self.num_rows_in_chunk]
+
+        rows = (
+            np.concatenate(self.chunks)
+            if self.chunks
+            else np.empty((0, self.num_columns), dtype=INTERPRETATION_DTYPE)
+        )
+        self.chunks = []
+        batch_indexes = np.concatenate(self.batch_indexes or [np.empty(0, np.int64)])
+        record_ids = np.concatenate(self.record_ids or [np.empty(0, np.int64)])
+
+        # Order batches by id so the matrix layout is deterministic, then order
+        # ballots within each batch by record id (matching how we assign
+        # CvrBallot.ballot_position).
+        batch_ids = sorted(self.batch_ids)
+        batch_order = np.empty(len(batch_ids), dtype=np.int64)
+        for sorted_index, batch_id in enumerate(batch_ids):
+            batch_order[self.batch_ids[batch_id]] = sorted_index
+        sorted_batch_indexes = batch_order[batch_indexes]
+        row_order = np.lexsort((record_ids, sorted_batch_indexes))
+
+        batch_counts = np.bincount(sorted_batch_indexes, minlength=len(batch_ids))
+        batch_offsets = np.zeros(len(batch_ids) + 1, dtype=BATCH_OFFSET_DTYPE)
+        np.cumsum(batch_counts, out=batch_offsets[1:])
+
+        # Reorder the rows, copying them into column-major order as we go
+        interpretations = np.ascontiguousarray(rows.T[:, row_order]).T
+        return CvrMatrix(batch_ids, batch_offsets, interpretations)
+
+
+def contest_column_range(columns: Iterable[int]) -> tuple[int, int]:
+    """
+    Returns the (start, end) range of matrix columns that spans all of the
+    given choice columns.
+    """
+    columns = list(columns)
+    return min(columns), max(columns) + 1
+
+
+def interpretations_from_bytes(
+    data: bytes, num_ballots: int, num_columns: int
+) -> np.ndarray:
+    """
+    Returns a (num_ballots, num_columns) view of a column-major serialized
+    interpretations matrix (or a contiguous range of its columns).
+    """
+    return (
+        np.frombuffer(data, dtype=INTERPRETATION_DTYPE)
+        .reshape((num_columns, num_ballots))
+        .T
+    )
+
+
+def batch_offsets_from_bytes(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype=BATCH_OFFSET_DTYPE)
+
+
+class ContestPresence(NamedTuple):
+    # Batch ids and row offsets, as in the CvrMatrix the presence was computed
+    # from
+    batch_ids: list[str]
+    batch_offsets: np.ndarray
+    # Shape (num_ballots,), whether each ballot has the contest on it
+    has_contest: np.ndarray
+
+    def ballot_positions(self, batch_index: int) -> np.ndarray:
+        """
+        Returns the (1-indexed) ballot positions of the ballots in a batch that
+        have the contest on them.
+        """
+        start, end = self.batch_offsets[batch_index : batch_index + 2]
+        return np.flatnonzero(self.has_contest[start:end]) + 1
+
+
+def contest_presence(contest_interpretations: np.ndarray) -> np.ndarray:
+    """
+    Given the interpretations for a contest's columns, returns whether each
+    ballot has the contest on it. If a ballot's interpretations for the contest
+    are all empty, it means the contest wasn't on the ballot.
+    """
+    return (contest_interpretations != NOT_ON_BALLOT).any(axis=1)
+
+
+def contest_presence_bytes(has_contest: np.ndarray) -> bytes:
+    return np.packbits(has_contest).tobytes()
+
+
+def contest_presence_from_bytes(data: bytes, num_ballots: int) -> np.ndarray:
+    return np.unpackbits(np.frombuffer(data, dtype=np.uint8), count=num_ballots).view(
+        bool
+    )
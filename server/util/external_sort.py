@@ -0,0 +1,71 @@
+import heapq
+import pickle
+import tempfile
+from typing import IO, Any, Callable, Generic, Iterator, TypeVar
+
+T = TypeVar("T")
+
+# Number of items to sort in memory before spilling them to a temp file
+RUN_SIZE = 200_000
+# Number of items to pickle together when writing a run to a temp file
+BLOCK_SIZE = 1000
+
+
+class ExternalSorter(Generic[T]):
+    """
+    Sorts a stream of items that may be too large to fit in memory.
+
+    Items are collected into runs of run_size items. Each full run is sorted
+    and spilled to a temp file. sorted() then merges the runs, so only one
+    block of each run needs to be in memory at a time. Items must be
+    picklable.
+    """
+
+    def __init__(self, key: Callable[[T], Any], run_size: int = RUN_SIZE):
+        self.key = key
+        self.run_size = run_size
+        self.run: list[T] = []
+        self.run_files: list[IO[bytes]] = []
+
+    def add(self, item: T):
+        self.run.append(item)
+        if len(self.run) >= self.run_size:
+            self._spill_run()
+
+    def _spill_run(self):
+        self.run.sort(key=self.key)
+        run_file = tempfile.TemporaryFile()
+        for start in range(0, len(self.run), BLOCK_SIZE):
+            pickle.dump(
+                self.run[start : start + BLOCK_SIZE],
+                run_file,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        run_file.seek(0)
+        self.run_files.append(run_file)
+        self.run = []
+
+    @staticmethod
+    def _read_run(run_file: IO[bytes]) -> Iterator[T]:
+        try:
+            while True:
+                try:
+                    block = pickle.load(run_file)
+                except EOFError:
+                    return
+                yield from block
+        finally:
+            run_file.close()
+
+    def sorted(self) -> Iterator[T]:
+        """
+        Returns an iterator over all of the added items in sorted order. Like
+        the built-in sorted, items with equal keys keep the order they were
+        added in. Should only be called once, after all items are added.
+        """
+        self.run.sort(key=self.key)
+        return heapq.merge(
+            *(self._read_run(run_file) for run_file in self.run_files),
+            self.run,
+            key=self.key,
+        )
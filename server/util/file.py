@@ -18,6 +18,7 @@ from ..worker.tasks import serialize_background_task
 from ..util.isoformat import isoformat
 from ..util.jsonschema import JSONDict
 from ..util.csv_parse import is_filetype_csv_mimetype
+from ..util.zip_archive import zip_file_names
 
 
 class FileType(str, enum.Enum):
@@ -138,12 +139,7 @@ def read_zip_filenames(zip_file: BinaryIO) -> list[str]:
 def unzip_files(zip_file: BinaryIO, directory_to_extract_to: str) -> list[str]:
     with ZipFile(zip_file, "r") as zip_archive:
         zip_archive.extractall(directory_to_extract_to)
-        return [
-            entry_name
-            for entry_name in zip_archive.namelist()
-            # ZIP files created on Macs include a hidden __MACOSX folder
-            if not entry_name.startswith("__") and not entry_name.startswith(".")
-        ]
+        return zip_file_names(zip_archive)
 
 
 def get_full_storage_path(file_path: str) -> str:
@@ -1,5 +1,9 @@
 from collections import defaultdict
+import itertools
+from typing import IO, NamedTuple, cast as typing_cast
 from xml.etree.ElementTree import Element, ElementTree
+from defusedxml.ElementTree import iterparse
+from .zip_archive import ZipMember, open_zip_archive
 
 NAMESPACE = "http://tempuri.org/CVRDesign.xsd"
 
@@ -37,3 +41,110 @@ def parse_contest_results(cvr_xml: ElementTree):
             results[contest_name].add(choice_name)
 
     return results
+
+
+class HartCvr(NamedTuple):
+    cvr_guid: str
+    batch_number: str
+    batch_sequence: str
+    # { contest_name: voted_for_choices }
+    contest_results: dict[str, set[str]]
+
+
+def _tag(tag: str):
+    return f"{{{NAMESPACE}}}{tag}"
+
+
+CVR_FIELD_TAGS = {
+    _tag("CvrGuid"): "cvr_guid",
+    _tag("BatchNumber"): "batch_number",
+    _tag("BatchSequence"): "batch_sequence",
+}
+CONTEST_PATH = [_tag("Contests"), _tag("Contest")]
+OPTION_PATH = [*CONTEST_PATH, _tag("Options"), _tag("Option")]
+
+
+def parse_cvr(cvr_file: str | IO[bytes]) -> HartCvr:
+    """
+    Parses a single ballot's CVR XML file (either a path or a file-like object,
+    e.g. a ZIP file member).
+
+    Rather than building an ElementTree for the whole file, we stream through
+    the elements, pulling out only the fields we need and clearing each
+    element once we're done with it. Matches the results of using find_xml and
+    parse_contest_results on the parsed tree.
+    """
+    fields: dict[str, str] = {}
+    # { contest_name: voted_for_choices }
+    results: dict[str, set[str]] = defaultdict(set)
+    contest_name: str | None = None
+    contest_choice_names: list[str] = []
+    option_name: str | None = None
+    option_has_write_in: bool | None = None
+
+    # Tags of the ancestors of the current element, excluding the root
+    path: list[str] = []
+    depth = 0
+    for event, element in iterparse(cvr_file, events=("start", "end")):
+        if event == "start":
+            if depth > 0:
+                path.append(element.tag)
+            depth += 1
+            continue
+
+        depth -= 1
+        if depth == 0:
+            break
+        path.pop()
+        tag = element.tag
+
+        if not path:
+            if tag in CVR_FIELD_TAGS:
+                fields.setdefault(CVR_FIELD_TAGS[tag], element.text)
+        elif path == CONTEST_PATH:
+            if tag == _tag("Name") and contest_name is None:
+                contest_name = element.text
+        elif path == OPTION_PATH:
+            if tag == _tag("Name") and option_name is None:
+                option_name = element.text
+            elif tag == _tag("WriteInData") and option_has_write_in is None:
+                # Match the truthiness of the WriteInData element, which is
+                # based on whether it has any children
+                option_has_write_in = len(element) > 0
+        elif path == OPTION_PATH[:-1] and tag == _tag("Option"):
+            # From what we've seen so far with Hart CVRs, the only choices
+            # listed are the ones with votes (i.e. with "Value" = 1), so if we
+            # see a choice, we can count it as a vote.
+            contest_choice_names.append(
+                "Write-In" if option_has_write_in else typing_cast(str, option_name)
+            )
+            option_name, option_has_write_in = None, None
+        elif path == CONTEST_PATH[:-1] and tag == _tag("Contest"):
+            for choice_name in contest_choice_names:
+                results[typing_cast(str, contest_name)].add(choice_name)
+            contest_name, contest_choice_names = None, []
+
+        element.clear()
+
+    return HartCvr(
+        cvr_guid=fields["cvr_guid"],
+        batch_number=fields["batch_number"],
+        batch_sequence=fields["batch_sequence"],
+        contest_results=dict(results),
+    )
+
+
+# Parses a list of CVR XML files stored in (possibly nested) ZIP files,
+# returning the results in the same order. This is the unit of work for parsing
+# CVR files in parallel, so it needs to be a top-level function that can be
+# pickled.
+def parse_cvr_zip_members(cvr_zip_members: list[ZipMember]) -> list[HartCvr]:
+    hart_cvrs = []
+    for (zip_file_path, nested_zip_names), members in itertools.groupby(
+        cvr_zip_members, key=lambda member: member[:2]
+    ):
+        with open_zip_archive(zip_file_path, nested_zip_names) as zip_archive:
+            for member in members:
+                with zip_archive.open(member.name) as cvr_file:
+                    hart_cvrs.append(parse_cvr(cvr_file))
+    return hart_cvrs
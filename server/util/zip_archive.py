@@ -0,0 +1,148 @@
+"""
+Helpers for reading files out of ZIP archives (including ZIP files nested
+inside other ZIP files) in place, without extracting them to disk.
+"""
+
+from contextlib import ExitStack, contextmanager
+import io
+import shutil
+import struct
+import tempfile
+from typing import IO, Iterator, NamedTuple, Sequence
+from zipfile import ZIP_STORED, ZipFile
+
+# Layout of the local file header that precedes each member's data in a ZIP
+# file. See section 4.3.7 of https://pkware.cachefly.net/webdocs/casestudies/APPNOTE.TXT
+LOCAL_FILE_HEADER_STRUCT = struct.Struct("<4s2B4HL2L2H")
+LOCAL_FILE_HEADER_SIGNATURE = b"PK\003\004"
+LOCAL_FILE_HEADER_FILE_NAME_LENGTH_INDEX = 10
+LOCAL_FILE_HEADER_EXTRA_FIELD_LENGTH_INDEX = 11
+
+
+class ZipMember(NamedTuple):
+    # Path to the outermost ZIP file on disk
+    zip_file_path: str
+    # Names of the ZIP files nested within it that contain the member, if any
+    nested_zip_names: tuple[str, ...]
+    name: str
+
+
+def zip_file_names(zip_archive: ZipFile) -> list[str]:
+    return [
+        entry_name
+        for entry_name in zip_archive.namelist()
+        # ZIP files created on Macs include a hidden __MACOSX folder
+        if not entry_name.startswith("__") and not entry_name.startswith(".")
+    ]
+
+
+class FileSlice(io.RawIOBase):
+    """
+    A read-only, seekable view of a byte range of another file.
+
+    The underlying file may be shared (e.g. with the ZipFile that contains the
+    slice), so we seek to our own position before every read.
+    """
+
+    def __init__(self, file: IO[bytes], start: int, size: int):
+        super().__init__()
+        self.file = file
+        self.start = start
+        self.size = size
+        self.position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self.position + offset
+        elif whence == io.SEEK_END:
+            position = self.size + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")  # pragma: no cover
+        if position < 0:
+            raise ValueError(f"Negative seek position: {position}")
+        self.position = position
+        return self.position
+
+    def readinto(self, buffer) -> int:
+        num_bytes = max(0, min(len(buffer), self.size - self.position))
+        if num_bytes == 0:
+            return 0
+        self.file.seek(self.start + self.position)
+        num_bytes_read = self.file.readinto(memoryview(buffer)[:num_bytes])
+        self.position += num_bytes_read
+        return num_bytes_read
+
+
+def stored_member_data_offset(zip_archive: ZipFile, member_name: str) -> int:
+    info = zip_archive.getinfo(member_name)
+    assert zip_archive.fp is not None
+    zip_archive.fp.seek(info.header_offset)
+    header = LOCAL_FILE_HEADER_STRUCT.unpack(
+        zip_archive.fp.read(LOCAL_FILE_HEADER_STRUCT.size)
+    )
+    if header[0] != LOCAL_FILE_HEADER_SIGNATURE:
+        raise ValueError(f"Invalid ZIP file header for {member_name}")
+    return (
+        info.header_offset
+        + LOCAL_FILE_HEADER_STRUCT.size
+        + header[LOCAL_FILE_HEADER_FILE_NAME_LENGTH_INDEX]
+        + header[LOCAL_FILE_HEADER_EXTRA_FIELD_LENGTH_INDEX]
+    )
+
+
+@contextmanager
+def open_nested_zip(zip_archive: ZipFile, member_name: str) -> Iterator[ZipFile]:
+    """
+    Opens a ZIP file that is a member of another ZIP file.
+
+    ZipFile needs to be able to seek around in the file, and seeking backwards
+    in a compressed member means decompressing it again from the start. So if
+    the nested ZIP file was stored without compression, we read it directly
+    from its byte range in the outer file. Otherwise, we decompress it to an
+    anonymous temp file.
+    """
+    info = zip_archive.getinfo(member_name)
+    with ExitStack() as stack:
+        if info.compress_type == ZIP_STORED:
+            assert zip_archive.fp is not None
+            nested_file: IO[bytes] = io.BufferedReader(
+                FileSlice(
+                    zip_archive.fp,
+                    stored_member_data_offset(zip_archive, member_name),
+                    info.file_size,
+                )
+            )
+        else:
+            nested_file = stack.enter_context(tempfile.TemporaryFile())
+            with zip_archive.open(member_name) as member:
+                shutil.copyfileobj(member, nested_file)
+            nested_file.seek(0)
+        yield stack.enter_context(ZipFile(nested_file, "r"))
+
+
+@contextmanager
+def open_zip_archive(
+    zip_file: str | IO[bytes], nested_zip_names: Sequence[str] = ()
+) -> Iterator[ZipFile]:
+    """
+    Opens a ZIP file, or, if nested_zip_names are given, the ZIP file found by
+    following that path of ZIP files nested within it.
+    """
+    with ExitStack() as stack:
+        zip_archive = stack.enter_context(ZipFile(zip_file, "r"))
+        for nested_zip_name in nested_zip_names:
+            zip_archive = stack.enter_context(
+                open_nested_zip(zip_archive, nested_zip_name)
+            )
+        yield zip_archive
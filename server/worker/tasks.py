@@ -4,6 +4,7 @@ import logging
 from inspect import signature
 from datetime import datetime
 from typing import Callable
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 import sentry_sdk
 
@@ -24,17 +25,51 @@ class UserError(Exception):
     pass
 
 
+# Tasks are routed to queues so that workers can be dedicated to each queue.
+# This keeps quick tasks (e.g. drawing a sample) from getting stuck behind
+# long-running file processing tasks when lots of files are uploaded at once.
+DEFAULT_QUEUE = "default"
+FILE_PROCESSING_QUEUE = "files"
+
+# Workers listen on this Postgres channel to be notified when tasks may be
+# ready to claim. The payload is the task's queue (or empty for all queues).
+TASK_NOTIFY_CHANNEL = "background_task"
+
+# Namespace for the Postgres advisory locks that workers take on task lock keys
+# while claiming a task.
+TASK_LOCK_KEY_ADVISORY_LOCK_NAMESPACE = 1838212661
+
+# How many of the oldest claimable tasks to consider when claiming a task
+CLAIM_NEXT_TASK_CANDIDATES = 10
+
 task_dispatch: dict[str, Callable] = {}
+task_queues: dict[str, str] = {}
 
 
 # Decorator to register background task handlers. We use the handler's function
-# name as the key.
-def background_task(task_handler: Callable):
-    task_dispatch[task_handler.__name__] = task_handler
-    assert "election_id" in signature(task_handler).parameters, (
-        f"Payload for task {task_handler.__name__} must include 'election_id' to easily identify all task logs for a single audit."
+# name as the key. Use @background_task(queue=...) to route a handler's tasks to
+# a queue other than the default queue.
+def background_task(task_handler: Callable | None = None, *, queue=DEFAULT_QUEUE):
+    def register(task_handler: Callable):
+        task_dispatch[task_handler.__name__] = task_handler
+        task_queues[task_handler.__name__] = queue
+        assert "election_id" in signature(task_handler).parameters, (
+            f"Payload for task {task_handler.__name__} must include 'election_id' to easily identify all task logs for a single audit."
+        )
+        return task_handler
+
+    if task_handler is None:
+        return register
+    return register(task_handler)
+
+
+def notify_workers(db_session, queue: str | None = None):
+    # Postgres delivers the notification when the transaction commits, so
+    # workers won't try to claim a task before it's visible to them.
+    db_session.execute(
+        text("SELECT pg_notify(:channel, :queue)"),
+        dict(channel=TASK_NOTIFY_CHANNEL, queue=queue or ""),
     )
-    return task_handler
 
 
 def create_background_task(
@@ -64,6 +99,7 @@ def create_background_task(
         # Only allow one task per audit to run at a time. This ensures that
         # tasks won't try to access the same db resources at the same time.
         lock_key=f"election_id:{payload['election_id']}",
+        queue=task_queues[task_handler.__name__],
     )
     db_session.add(task)
 
@@ -72,6 +108,8 @@ def create_background_task(
         task.started_at = datetime.now(timezone.utc)
         db_session.commit()
         run_task(task, db_session)
+    else:
+        notify_workers(db_session, task.queue)
 
     return task
 
@@ -120,6 +158,8 @@ def run_task(task: BackgroundTask, db_session):
 
         task.completed_at = datetime.now(timezone.utc)
 
+        # Other tasks with the same lock key may be waiting for this one
+        notify_workers(db_session)
         db_session.commit()
 
         logger.info(f"TASK_COMPLETE {task_log_data(task)}")
@@ -133,6 +173,7 @@ def run_task(task: BackgroundTask, db_session):
         # we just print the exception class name.
         task.error = str(error) or str(error.__class__.__name__)
 
+        notify_workers(db_session)
         db_session.commit()
 
         log_data = {
@@ -148,45 +189,10 @@ def run_task(task: BackgroundTask, db_session):
             sentry_sdk.capture_exception(error)
 
 
-def claim_next_task(worker_id: str, db_session) -> BackgroundTask | None:
-    # Use SELECT ... FOR UPDATE to lock all queued tasks, ensuring that only a
-    # single worker can claim a single task at a time. This ensures that we get
-    # an accurate view of which tasks are available to claim. If another worker has
-    # already locked the queued task, this query will block (though it shouldn't
-    # take long to claim a task, so this shouldn't cause problems).
-    #
-    # If new tasks are added after we lock the queued tasks, they won't be
-    # accessible by this worker, but another worker also won't be able to claim
-    # them (since it will also be trying to lock _all_ queued tasks, including
-    # the ones we already locked).
-    #
-    # Importantly, this also ensures that we get a safe view of which lock_keys
-    # are currently in use by in-progress tasks.  Importantly, this also ensures
-    # that we get a safe view of which lock_keys are currently in use by
-    # in-progress tasks. If this worker has successfully locked all queued
-    # tasks, then it's the only worker that can claim a task right now, so no
-    # additional tasks can be started. That means the current set of in-progress
-    # lock_keys won't change until this worker releases the lock on the queued
-    # tasks.
-    #
-    # It is possible for another worker to finish an in-progress task and
-    # release a lock_key while we're running this query, but that's fine because
-    # even if we don't see that change and wanted to claim that lock_key, we'll
-    # just fail and try again later.
-    #
-    # Another approach to this would be to lock the entire table, but that would
-    # also prevent in-progress tasks from completing.
-    #
-    # We don't actually need to load the queued tasks into the app, so we just
-    # execute the query.
-    (
-        db_session.execute(
-            db_session.query(BackgroundTask)
-            .filter_by(started_at=None)
-            .with_for_update()
-            .with_entities(BackgroundTask.id)
-        )
-    )
+def claim_next_task(
+    worker_id: str, db_session, queues: list[str] | None = None
+) -> BackgroundTask | None:
+    # Only allow one task per lock key to run at a time.
     in_progress_task_lock_keys = (
         db_session.query(BackgroundTask)
         .filter(BackgroundTask.started_at.isnot(None))
@@ -194,22 +200,61 @@ def claim_next_task(worker_id: str, db_session) -> BackgroundTask | None:
         .with_entities(BackgroundTask.lock_key)
         .subquery()
     )
-    task: BackgroundTask | None = (
+    query = (
         db_session.query(BackgroundTask)
         .filter_by(started_at=None)
-        # Only allow one task per lock key to run at a time.
         .filter(BackgroundTask.lock_key.notin_(in_progress_task_lock_keys))
-        .order_by(BackgroundTask.created_at)
-        .limit(1)
-        .one_or_none()
     )
-    if task:
+    if queues is not None:
+        query = query.filter(BackgroundTask.queue.in_(queues))
+    # Use SELECT ... FOR UPDATE SKIP LOCKED to lock the oldest queued tasks,
+    # skipping any that other workers have locked while claiming them, so that
+    # workers can claim tasks at the same time without waiting on each other.
+    # We look at a few candidates in case some of them have lock keys that
+    # another worker is claiming a task for right now.
+    candidates: list[BackgroundTask] = (
+        query.order_by(BackgroundTask.created_at)
+        .limit(CLAIM_NEXT_TASK_CANDIDATES)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+
+    claimed_task = None
+    for task in candidates:
+        # Since other workers can't see a task we've claimed until we commit,
+        # two workers could claim tasks with the same lock key at the same
+        # time. To prevent that, we take an advisory lock on the lock key, which
+        # Postgres releases when our transaction ends. Once we have it, we check
+        # again that no task with the lock key has been started, since another
+        # worker may have claimed one (and committed) since our query above.
+        if task.lock_key is not None:
+            locked = db_session.execute(
+                text("SELECT pg_try_advisory_xact_lock(:namespace, hashtext(:key))"),
+                dict(
+                    namespace=TASK_LOCK_KEY_ADVISORY_LOCK_NAMESPACE,
+                    key=task.lock_key,
+                ),
+            ).scalar()
+            if not locked:
+                continue
+            lock_key_in_progress = db_session.query(
+                db_session.query(BackgroundTask)
+                .filter(BackgroundTask.started_at.isnot(None))
+                .filter_by(completed_at=None, lock_key=task.lock_key)
+                .exists()
+            ).scalar()
+            if lock_key_in_progress:
+                continue
+
         task.worker_id = worker_id
         task.started_at = datetime.now(timezone.utc)
-    # Commit the transaction to release the table lock, regardless of whether we
+        claimed_task = task
+        break
+
+    # Commit the transaction to release the locks, regardless of whether we
     # claimed a task.
     db_session.commit()
-    return task
+    return claimed_task
 
 
 def reset_task(task: BackgroundTask, db_session):
@@ -227,6 +272,7 @@ def reset_task(task: BackgroundTask, db_session):
     logger.info(f"TASK_RESET {task_log_data(task)}")
     task.worker_id = None
     task.started_at = None
+    notify_workers(db_session, task.queue)
     db_session.commit()
 
 
@@ -1,10 +1,14 @@
+import multiprocessing
 import os
+import select
 import signal
 import sys
 import time
 
+from server import config
 from server.database import db_session
 from server.worker.tasks import (
+    TASK_NOTIFY_CHANNEL,
     claim_next_task,
     reset_task,
     run_task,
@@ -17,7 +21,44 @@ from server.websession import cleanup_sessions
 from server import api  # noqa
 
 
-def run_worker(worker_id: str, db_session, pause_between_tasks_seconds):
+def listen_for_tasks(db_session):
+    # Use a dedicated connection to listen for notifications that tasks may be
+    # ready to claim, since notifications are only delivered between
+    # transactions.
+    connection = db_session.bind.raw_connection().connection
+    connection.autocommit = True
+    with connection.cursor() as cursor:
+        cursor.execute(f"LISTEN {TASK_NOTIFY_CHANNEL}")
+    return connection
+
+
+def wait_for_tasks(listener, queues: list[str] | None, timeout_seconds: float):
+    # Wait until we're notified that a task in one of our queues may be ready,
+    # or until the timeout (in case we missed a notification, e.g. while
+    # reconnecting).
+    deadline = time.monotonic() + timeout_seconds
+    while True:
+        notifies = listener.notifies
+        listener.notifies = []
+        if any(
+            queues is None or notify.payload in ["", *queues] for notify in notifies
+        ):
+            return
+
+        remaining_seconds = deadline - time.monotonic()
+        if remaining_seconds <= 0:
+            return
+        readable, _, _ = select.select([listener], [], [], remaining_seconds)
+        if readable:
+            listener.poll()
+
+
+def run_worker(
+    worker_id: str,
+    db_session,
+    pause_between_tasks_seconds,
+    queues: list[str] | None = None,
+):
     task = None
 
     # Heroku dynos are sent one or more SIGTERM signals when they are shut down,
@@ -34,9 +75,11 @@ def run_worker(worker_id: str, db_session, pause_between_tasks_seconds):
     # Also handle SIGINT for local development
     signal.signal(signal.SIGINT, interrupt_handler)
 
+    listener = listen_for_tasks(db_session)
+
     # If the database connection is closed due to sys.exit above, stop working.
     while db_session.is_active:
-        task = claim_next_task(worker_id, db_session)
+        task = claim_next_task(worker_id, db_session, queues)
         if task:
             run_task(task, db_session)
 
@@ -44,14 +87,72 @@ def run_worker(worker_id: str, db_session, pause_between_tasks_seconds):
         # sessions, since it's a convenient place to essentially run a cron job.
         cleanup_sessions(db_session)
 
-        # Before sleeping, we need to commit the current transaction, otherwise
+        # Before waiting, we need to commit the current transaction, otherwise
         # we will have "idle in transaction" queries that will lock the
         # database, which gets in the way of migrations.
         db_session.commit()
-        time.sleep(pause_between_tasks_seconds)
+
+        # If we just ran a task, there may be more waiting, so check again
+        # right away. Otherwise, wait until a task is ready.
+        if not task:
+            wait_for_tasks(listener, queues, pause_between_tasks_seconds)
+
+
+def run_worker_process(worker_id: str, queues: list[str]):
+    configure_sentry()
+    run_worker(worker_id, db_session, pause_between_tasks_seconds=2, queues=queues)
+
+
+def run_worker_pool(worker_id: str, queue_concurrency: dict[str, int]):
+    # Run a pool of worker processes, each claiming tasks from one queue, so
+    # that we can run multiple tasks at once. We restart any worker process
+    # that exits unexpectedly (e.g. if it runs out of memory).
+    context = multiprocessing.get_context("spawn")
+    worker_queues = {
+        f"{worker_id}.{queue}.{i}": queue
+        for queue, concurrency in queue_concurrency.items()
+        for i in range(concurrency)
+    }
+    processes: dict[str, multiprocessing.process.BaseProcess] = {}
+
+    def start_worker_process(process_worker_id: str):
+        process = context.Process(
+            target=run_worker_process,
+            args=(process_worker_id, [worker_queues[process_worker_id]]),
+            name=process_worker_id,
+        )
+        process.start()
+        processes[process_worker_id] = process
+
+    for process_worker_id in worker_queues:
+        start_worker_process(process_worker_id)
+
+    shutting_down = False
+
+    # The worker processes handle shutdown signals themselves (resetting their
+    # in-progress tasks), so we just pass them along and wait for them to exit.
+    def interrupt_handler(*_args):
+        nonlocal shutting_down
+        shutting_down = True
+        for process in processes.values():
+            if process.is_alive():
+                process.terminate()
+
+    signal.signal(signal.SIGTERM, interrupt_handler)
+    signal.signal(signal.SIGINT, interrupt_handler)
+
+    while not shutting_down:
+        for process_worker_id, process in list(processes.items()):
+            if not process.is_alive() and not shutting_down:
+                start_worker_process(process_worker_id)
+        time.sleep(1)
+
+    for process in processes.values():
+        process.join()
+    sys.exit(1)
 
 
 if __name__ == "__main__":
     worker_id = os.environ.get("HEROKU_DYNO_ID", str(os.getpid()))
     configure_sentry()
-    run_worker(worker_id, db_session, pause_between_tasks_seconds=2)
+    run_worker_pool(worker_id, config.WORKER_QUEUE_CONCURRENCY)